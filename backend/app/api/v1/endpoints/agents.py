@@ -5,21 +5,127 @@ This module contains all AI agent-related API endpoints including content genera
 agent orchestration, and job management.
 """
 
-from fastapi import APIRouter, HTTPException, status
+from typing import Optional
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_read_db
+from app.core.shutdown import drain_controller, reconnect_delay_ms
+from app.services.ai import job_history_service
+from app.services.ai.job_history_service import InvalidCursorError
+from app.services.ai.job_status_service import job_status_hub
+from app.services.ai.memory_service import conversation_memory
 
 router = APIRouter()
 
+
 @router.post("/generate")
 async def generate_content():
     """TODO: Implement AI content generation"""
     raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED)
 
+
 @router.get("/status/{job_id}")
-async def get_generation_status():
-    """TODO: Implement job status tracking"""
-    raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED)
+async def get_generation_status(
+    job_id: str,
+    wait: Optional[float] = Query(None, gt=0, le=settings.JOB_STATUS_MAX_WAIT_SECONDS),
+    since: int = Query(0, ge=0),
+):
+    """
+    Get status of a content generation job.
+
+    With `wait`, the request is held (long-poll) until the job moves past
+    sequence number `since` or `wait` seconds elapse.
+    """
+    if wait:
+        snapshot = await job_status_hub.wait(job_id, since, wait)
+    else:
+        snapshot = await job_status_hub.get(job_id)
+
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
+        )
+    return {"success": True, "data": snapshot}
+
+
+@router.get("/status/{job_id}/stream")
+async def stream_generation_status(job_id: str, request: Request):
+    """
+    Stream status updates of a content generation job as Server-Sent Events.
+
+    Each update is sent as a `status` event carrying the full job snapshot with
+    per-agent progress; the stream ends once the job finishes, or with a
+    jittered `retry` hint when the worker shuts down.
+    """
+    if await job_status_hub.get(job_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found"
+        )
+
+    async def events():
+        async for snapshot in job_status_hub.stream(job_id):
+            if await request.is_disconnected():
+                break
+            if snapshot is None:
+                yield b": keep-alive\n\n"
+                continue
+            yield b"id: %d\nevent: status\ndata: %s\n\n" % (
+                snapshot["seq"],
+                orjson.dumps(snapshot),
+            )
+
+        if drain_controller.draining:
+            # Spread the reconnects of EventSource clients cut off by the drain
+            yield b"retry: %d\n\n" % reconnect_delay_ms()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 @router.get("/history")
-async def get_generation_history():
-    """TODO: Implement generation history"""
-    raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED)
+async def get_generation_history(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    job_status: Optional[str] = Query(None, alias="status"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Get history of AI agent jobs, newest first.
+
+    Pages are addressed with the opaque `cursor` returned as `next_cursor`.
+    """
+    try:
+        jobs, next_cursor = await job_history_service.get_job_history(
+            db, limit, cursor, job_status
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return {
+        "success": True,
+        "data": {
+            "jobs": jobs,
+            "pagination": {"limit": limit, "next_cursor": next_cursor},
+        },
+    }
+
+
+@router.get("/memory/{session_id}")
+async def get_memory_usage(session_id: str):
+    """
+    Get the Redis footprint of an agent session's conversation memory.
+    """
+    (usage,) = await conversation_memory.sizes([session_id])
+    if usage["bytes"] is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Session not found"
+        )
+    return {"success": True, "data": {"memory": usage}}
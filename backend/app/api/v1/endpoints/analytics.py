@@ -9,11 +9,13 @@ from fastapi import APIRouter, HTTPException, status
 
 router = APIRouter()
 
+
 @router.get("/overview")
 async def get_analytics_overview():
     """TODO: Implement analytics overview"""
     raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED)
 
+
 @router.get("/content/{content_id}")
 async def get_content_analytics():
     """TODO: Implement content-specific analytics"""
@@ -6,7 +6,7 @@ login, logout, and token management.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 # TODO: Implement authentication endpoints
 # - POST /register - User registration
@@ -21,74 +21,80 @@ router = APIRouter()
 # Security scheme for JWT tokens
 security = HTTPBearer()
 
+
 @router.post("/register")
 async def register():
     """
     Register a new user account.
-    
+
     TODO: Implement user registration with email verification
     """
     raise HTTPException(
         status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Registration endpoint not yet implemented"
+        detail="Registration endpoint not yet implemented",
     )
 
+
 @router.post("/login")
 async def login():
     """
     Authenticate user and receive access tokens.
-    
+
     TODO: Implement user login with JWT token generation
     """
     raise HTTPException(
         status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Login endpoint not yet implemented"
+        detail="Login endpoint not yet implemented",
     )
 
+
 @router.post("/refresh")
 async def refresh_token():
     """
     Refresh access token using refresh token.
-    
+
     TODO: Implement token refresh logic
     """
     raise HTTPException(
         status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Token refresh endpoint not yet implemented"
+        detail="Token refresh endpoint not yet implemented",
     )
 
+
 @router.post("/logout")
 async def logout():
     """
     Logout user and invalidate tokens.
-    
+
     TODO: Implement logout with token invalidation
     """
     raise HTTPException(
         status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Logout endpoint not yet implemented"
+        detail="Logout endpoint not yet implemented",
     )
 
+
 @router.get("/me")
 async def get_current_user():
     """
     Get current user profile.
-    
+
     TODO: Implement current user profile retrieval
     """
     raise HTTPException(
         status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Current user endpoint not yet implemented"
+        detail="Current user endpoint not yet implemented",
     )
 
+
 @router.put("/me")
 async def update_current_user():
     """
     Update current user profile.
-    
+
     TODO: Implement user profile update
     """
     raise HTTPException(
         status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="User profile update endpoint not yet implemented"
+        detail="User profile update endpoint not yet implemented",
     )
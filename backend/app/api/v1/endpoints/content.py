@@ -5,7 +5,29 @@ This module contains all content-related API endpoints including creation, retri
 updates, and deletion of content items.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.schemas.content import (
+    BulkContentCreate,
+    BulkStatusChange,
+    ContentCreate,
+    ContentUpdate,
+)
+from app.services.content import content_service
+from app.services.content.content_service import ContentError
+from app.services.storage.file_service import UploadError, stream_upload
 
 # TODO: Implement content management endpoints
 # - GET / - List all content with pagination and filtering
@@ -20,86 +42,226 @@ from fastapi import APIRouter, Depends, HTTPException, status
 
 router = APIRouter()
 
+
 @router.get("/")
 async def list_content():
     """
     Get paginated list of content items.
-    
+
     TODO: Implement content listing with pagination and filtering
     """
     raise HTTPException(
         status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Content listing endpoint not yet implemented"
+        detail="Content listing endpoint not yet implemented",
     )
 
-@router.post("/")
-async def create_content():
+
+@router.post("/", status_code=status.HTTP_201_CREATED)
+async def create_content(
+    data: ContentCreate,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+):
     """
     Create new content item.
-    
-    TODO: Implement content creation with validation
     """
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Content creation endpoint not yet implemented"
+    content = await content_service.create_content(db, data)
+    if content.body:
+        background_tasks.add_task(content_service.score_content_batch, [content.id])
+
+    return {
+        "success": True,
+        "data": {"content": content_service.serialize_content(content)},
+        "message": "Content created successfully",
+    }
+
+
+@router.post("/bulk", status_code=status.HTTP_201_CREATED)
+async def bulk_create_content(
+    data: BulkContentCreate,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Create many content items in a single transaction.
+
+    All items are validated before anything is written; the response carries
+    one result per item in request order.
+    """
+    results = await content_service.bulk_create_content(db, data.items)
+
+    scored_ids = [
+        result["id"] for item, result in zip(data.items, results) if item.content
+    ]
+    if scored_ids:
+        background_tasks.add_task(content_service.score_content_batch, scored_ids)
+
+    return {
+        "success": True,
+        "data": {"results": results},
+        "message": f"{len(results)} content items created successfully",
+    }
+
+
+@router.post("/bulk/status")
+async def bulk_change_status(
+    data: BulkStatusChange,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Publish or archive many content items in a single transaction.
+
+    Items that cannot make the transition are reported per item without
+    failing the rest of the batch.
+    """
+    results = await content_service.bulk_change_status(
+        db, data.content_ids, data.status
     )
 
+    failed = sum(1 for result in results if not result["ok"])
+    return {
+        "success": failed == 0,
+        "data": {"results": results},
+        "message": f"{len(results) - failed} of {len(results)} content items updated",
+    }
+
+
 @router.get("/{content_id}")
-async def get_content():
+async def get_content(
+    content_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+):
     """
     Get specific content item by ID.
-    
-    TODO: Implement content retrieval with versioning
+
+    Supports conditional requests: a matching `If-None-Match` is answered with
+    304 from the cached ETag without querying the database.
     """
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Content retrieval endpoint not yet implemented"
-    )
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        cached_etag = await content_service.get_cached_etag(content_id)
+        if cached_etag and content_service.etag_matches(if_none_match, cached_etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": cached_etag}
+            )
+
+    try:
+        body, etag = await content_service.get_content_response(db, content_id)
+    except ContentError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if content_service.etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
 @router.put("/{content_id}")
-async def update_content():
+async def update_content(
+    content_id: str,
+    data: ContentUpdate,
+    db: AsyncSession = Depends(get_db),
+):
     """
     Update content item.
-    
-    TODO: Implement content update with version control
+
+    Each update bumps the content version, which changes its ETag.
     """
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Content update endpoint not yet implemented"
-    )
+    try:
+        content = await content_service.update_content(db, content_id, data)
+    except ContentError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    return {
+        "success": True,
+        "data": {"content": content_service.serialize_content(content)},
+        "message": "Content updated successfully",
+    }
+
 
 @router.delete("/{content_id}")
 async def delete_content():
     """
     Delete content item.
-    
+
     TODO: Implement soft delete for content
     """
     raise HTTPException(
         status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Content deletion endpoint not yet implemented"
+        detail="Content deletion endpoint not yet implemented",
     )
 
+
 @router.post("/{content_id}/publish")
-async def publish_content():
+async def publish_content(
+    content_id: str,
+    db: AsyncSession = Depends(get_db),
+):
     """
     Publish content item.
-    
-    TODO: Implement content publishing workflow
     """
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Content publishing endpoint not yet implemented"
-    )
+    try:
+        content = await content_service.publish_content(db, content_id)
+    except ContentError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    return {
+        "success": True,
+        "data": {"content": content_service.serialize_content(content)},
+        "message": "Content published successfully",
+    }
+
 
 @router.post("/{content_id}/archive")
-async def archive_content():
+async def archive_content(
+    content_id: str,
+    db: AsyncSession = Depends(get_db),
+):
     """
     Archive content item.
-    
-    TODO: Implement content archiving
     """
-    raise HTTPException(
-        status_code=status.HTTP_501_NOT_IMPLEMENTED,
-        detail="Content archiving endpoint not yet implemented"
-    )
+    try:
+        content = await content_service.archive_content(db, content_id)
+    except ContentError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    return {
+        "success": True,
+        "data": {"content": content_service.serialize_content(content)},
+        "message": "Content archived successfully",
+    }
+
+
+@router.post("/upload", status_code=status.HTTP_201_CREATED)
+async def upload_file(
+    request: Request,
+    filename: str = Query(..., max_length=255),
+):
+    """
+    Upload a media asset to cloud storage.
+
+    The raw request body is streamed to S3 in parts; the file type is detected
+    from its first bytes and the size limit is enforced while streaming.
+    """
+    content_length = request.headers.get("content-length")
+    if (
+        content_length
+        and content_length.isdigit()
+        and int(content_length) > settings.MAX_FILE_SIZE
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds the {settings.MAX_FILE_SIZE} byte limit",
+        )
+
+    try:
+        stored = await stream_upload(request.stream(), filename)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    return {
+        "success": True,
+        "data": {"file": stored},
+        "message": "File uploaded successfully",
+    }
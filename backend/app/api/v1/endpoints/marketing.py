@@ -5,19 +5,59 @@ This module contains all marketing-related API endpoints including campaign mana
 content distribution, and automation workflows.
 """
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, status
+
+from app.schemas.marketing import CampaignCreate
+from app.services.marketing import campaign_service
+from app.services.marketing.campaign_service import CampaignError
 
 router = APIRouter()
 
-@router.post("/campaigns")
-async def create_campaign():
-    """TODO: Implement campaign creation"""
-    raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED)
+
+@router.post("/campaigns", status_code=status.HTTP_201_CREATED)
+async def create_campaign(data: CampaignCreate):
+    """
+    Create a marketing campaign.
+
+    The campaign's publishes and channel sends are handed to the scheduler,
+    which runs each one at its due time.
+    """
+    try:
+        campaign = await campaign_service.create_campaign(data)
+    except CampaignError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    return {
+        "success": True,
+        "data": {"campaign": campaign},
+        "message": "Campaign created successfully",
+    }
+
 
 @router.get("/campaigns")
-async def list_campaigns():
-    """TODO: Implement campaign listing"""
-    raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED)
+async def list_campaigns(
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    """Get list of marketing campaigns, newest first."""
+    campaigns = await campaign_service.list_campaigns(limit=limit, offset=offset)
+    return {"success": True, "data": {"campaigns": campaigns}}
+
+
+@router.post("/campaigns/{campaign_id}/cancel")
+async def cancel_campaign(campaign_id: str):
+    """Cancel the pending publishes and sends of a campaign."""
+    try:
+        cancelled = await campaign_service.cancel_campaign(campaign_id)
+    except CampaignError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    return {
+        "success": True,
+        "data": {"campaign_id": campaign_id, "cancelled_actions": cancelled},
+        "message": "Campaign cancelled",
+    }
+
 
 @router.post("/distribute")
 async def distribute_content():
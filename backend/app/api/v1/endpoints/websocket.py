@@ -5,10 +5,18 @@ This module contains all WebSocket-related endpoints for real-time features incl
 live collaboration, content generation updates, and campaign monitoring.
 """
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from typing import Optional
+
+import orjson
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect, status
+
+from app.core.security import AuthenticationError, can_edit_content, decode_access_token
+from app.services.content.collaboration_service import collaboration_manager
+from app.services.content.content_service import ContentNotFoundError
 
 router = APIRouter()
 
+
 @router.websocket("/")
 async def websocket_endpoint(websocket: WebSocket):
     """TODO: Implement WebSocket connection handling"""
@@ -19,3 +27,59 @@ async def websocket_endpoint(websocket: WebSocket):
             await websocket.send_text(f"Message received: {data}")
     except WebSocketDisconnect:
         pass
+
+
+@router.websocket("/collaboration/{content_id}")
+async def collaboration_endpoint(
+    websocket: WebSocket,
+    content_id: str,
+    token: Optional[str] = Query(None),
+):
+    """
+    Real-time collaborative editing of a content item.
+
+    Clients authenticate with an access token allowed to edit the content item,
+    passed as `?token=` (browsers cannot set WebSocket headers) or as an
+    `Authorization: Bearer` header; the editor is the token's subject.
+
+    Clients send `collaboration_update` messages (`typing` presence updates and
+    `insert`/`delete` operations tagged with the revision they were based on) and
+    receive one `collaboration_batch` frame per tick.
+    """
+    if token is None:
+        scheme, _, credentials = websocket.headers.get("authorization", "").partition(
+            " "
+        )
+        if scheme.lower() == "bearer":
+            token = credentials
+    try:
+        claims = decode_access_token(token)
+    except AuthenticationError:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if not can_edit_content(claims, content_id):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    try:
+        session = await collaboration_manager.join(content_id, websocket, claims["sub"])
+    except ContentNotFoundError:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    try:
+        while True:
+            try:
+                message = orjson.loads(await websocket.receive_text())
+            except orjson.JSONDecodeError:
+                continue
+            if (
+                isinstance(message, dict)
+                and message.get("type") == "collaboration_update"
+            ):
+                await collaboration_manager.handle_message(session, websocket, message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await collaboration_manager.leave(session, websocket)
@@ -0,0 +1,172 @@
+"""
+Cache value codec for the AI Multi-Agent Content Creation & Marketing System.
+
+Values stored through the typed cache helpers are encoded as
+
+    version (1 byte) | format (1 byte) | payload
+
+The low nibble of the format byte names the serializer (msgpack for
+structured values, raw for bytes and text) and the high nibble the compressor
+applied to the payload. Payloads of at least `CACHE_COMPRESS_MIN_BYTES` are
+compressed with `CACHE_COMPRESSION` (zstd or lz4 when installed, zlib
+otherwise); smaller ones are stored as is. Decoding reads the header, so
+values written with any compressor stay readable, and a new version byte can
+introduce a new layout without invalidating old entries. Dates, decimals and
+UUIDs inside structured values come back as strings, as they would from JSON.
+"""
+
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
+
+import msgpack
+
+from app.core.config import settings
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:  # pragma: no cover - optional dependency
+    lz4 = None
+
+VERSION = 1
+
+# Serializers (low nibble)
+SERIALIZER_MSGPACK = 0x01
+SERIALIZER_BYTES = 0x02
+SERIALIZER_TEXT = 0x03
+
+# Compressors (high nibble)
+COMPRESSION_NONE = 0x00
+COMPRESSION_ZLIB = 0x10
+COMPRESSION_ZSTD = 0x20
+COMPRESSION_LZ4 = 0x30
+
+
+class CodecError(ValueError):
+    """Raised when a cached value cannot be decoded."""
+
+
+@dataclass(frozen=True)
+class Compressor:
+    """A compression algorithm usable by the codec."""
+
+    name: str
+    flag: int
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+compressors: Dict[int, Compressor] = {
+    COMPRESSION_ZLIB: Compressor(
+        "zlib", COMPRESSION_ZLIB, lambda data: zlib.compress(data, 6), zlib.decompress
+    ),
+}
+if zstandard is not None:
+    _zstd_compressor = zstandard.ZstdCompressor(level=3)
+    _zstd_decompressor = zstandard.ZstdDecompressor()
+    compressors[COMPRESSION_ZSTD] = Compressor(
+        "zstd",
+        COMPRESSION_ZSTD,
+        _zstd_compressor.compress,
+        _zstd_decompressor.decompress,
+    )
+if lz4 is not None:
+    compressors[COMPRESSION_LZ4] = Compressor(
+        "lz4", COMPRESSION_LZ4, lz4.frame.compress, lz4.frame.decompress
+    )
+
+
+def register_compressor(compressor: Compressor) -> None:
+    """Make another compressor available for encoding and decoding."""
+    compressors[compressor.flag] = compressor
+
+
+def default_compressor() -> Compressor:
+    """The configured compressor, falling back to zlib when it is not installed."""
+    for compressor in compressors.values():
+        if compressor.name == settings.CACHE_COMPRESSION:
+            return compressor
+    return compressors[COMPRESSION_ZLIB]
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def encode(
+    value: Any,
+    compressor: Optional[Compressor] = None,
+    min_compress_bytes: Optional[int] = None,
+) -> bytes:
+    """Encode a value for storage."""
+    if isinstance(value, bytes):
+        serializer, payload = SERIALIZER_BYTES, value
+    elif isinstance(value, str):
+        serializer, payload = SERIALIZER_TEXT, value.encode()
+    else:
+        serializer, payload = SERIALIZER_MSGPACK, msgpack.packb(
+            value, use_bin_type=True, default=_default
+        )
+
+    if min_compress_bytes is None:
+        min_compress_bytes = settings.CACHE_COMPRESS_MIN_BYTES
+    compression = COMPRESSION_NONE
+    if len(payload) >= min_compress_bytes:
+        compressor = compressor or default_compressor()
+        compressed = compressor.compress(payload)
+        # Incompressible payloads are kept as they are
+        if len(compressed) < len(payload):
+            compression, payload = compressor.flag, compressed
+
+    return bytes((VERSION, serializer | compression)) + payload
+
+
+def decode(data: Optional[bytes]) -> Any:
+    """
+    Decode a stored value (None stays None).
+
+    Raises:
+        CodecError: Unknown version, format or compressor, or corrupt payload
+    """
+    if data is None:
+        return None
+    if len(data) < 2 or data[0] != VERSION:
+        raise CodecError("Unsupported cache value version")
+
+    serializer, compression = data[1] & 0x0F, data[1] & 0xF0
+    payload = data[2:]
+    try:
+        if compression != COMPRESSION_NONE:
+            compressor = compressors.get(compression)
+            if compressor is None:
+                raise CodecError(
+                    f"Cache value compressed with unavailable compressor {compression:#x}"
+                )
+            payload = compressor.decompress(payload)
+
+        if serializer == SERIALIZER_MSGPACK:
+            # Map keys may be ints (e.g. counts keyed by id), not only strings
+            return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+        if serializer == SERIALIZER_BYTES:
+            return payload
+        if serializer == SERIALIZER_TEXT:
+            return payload.decode()
+    except CodecError:
+        raise
+    except Exception as e:
+        raise CodecError("Corrupt cache value") from e
+    raise CodecError(f"Unknown cache value serializer {serializer:#x}")
@@ -5,64 +5,276 @@ This module handles database initialization, connection pooling, and session man
 using SQLAlchemy 2.0 with async/await support.
 """
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import declarative_base
-from sqlalchemy.pool import NullPool
+import asyncio
+import hashlib
+import itertools
+from dataclasses import dataclass
+from typing import List, Optional
+
 import structlog
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session, declarative_base
+from starlette.requests import HTTPConnection
 
 from app.core.config import settings
+from app.core.redis import cache_exists, cache_set
 
 logger = structlog.get_logger()
 
-# Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DATABASE_ECHO,
-    poolclass=NullPool,  # Use NullPool for async operations
-    future=True,
-)
+
+def _create_engine(url: str, pool_budget: int) -> AsyncEngine:
+    # Each worker process gets an equal share of the cluster-wide connection
+    # budget and never overflows it
+    return create_async_engine(
+        url,
+        echo=settings.DATABASE_ECHO,
+        pool_size=settings.per_worker(pool_budget),
+        max_overflow=0,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=True,
+        future=True,
+    )
+
+
+class PrimarySession(AsyncSession):
+    """
+    Session bound to the primary that records recent writes.
+
+    After a commit that wrote anything, the client that issued the request is
+    pinned to the primary for `READ_YOUR_WRITES_SECONDS` so its next reads do
+    not hit a replica that has not caught up yet.
+    """
+
+    async def commit(self) -> None:
+        await super().commit()
+        wrote = self.info.pop("has_writes", False)
+        sticky_key = self.info.get("sticky_key")
+        if wrote and sticky_key and replicas:
+            await cache_set(
+                _sticky_cache_key(sticky_key),
+                "1",
+                expire=settings.READ_YOUR_WRITES_SECONDS,
+            )
+
+
+class ReplicaSession(AsyncSession):
+    """
+    Session bound to a read replica.
+
+    What it reads may lag the primary, so it must not be used to fill caches
+    that primary writes invalidate.
+    """
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flush_writes(session, flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_statement_writes(orm_execute_state):
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info["has_writes"] = True
+
+
+# Create async engine for the primary
+engine = _create_engine(settings.DATABASE_URL, settings.DB_POOL_BUDGET)
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
-    class_=AsyncSession,
+    class_=PrimarySession,
     expire_on_commit=False,
 )
 
+
+@dataclass
+class Replica:
+    """A read replica and its last observed health."""
+
+    engine: AsyncEngine
+    sessionmaker: async_sessionmaker
+    lag_seconds: Optional[float] = None
+    healthy: bool = False
+
+
+# Read replicas (only considered once the health monitor has seen them healthy)
+replicas: List[Replica] = []
+for _url in settings.DATABASE_REPLICA_URLS:
+    _replica_engine = _create_engine(_url, settings.DB_REPLICA_POOL_BUDGET)
+    replicas.append(
+        Replica(
+            engine=_replica_engine,
+            sessionmaker=async_sessionmaker(
+                _replica_engine, class_=ReplicaSession, expire_on_commit=False
+            ),
+        )
+    )
+
+_replica_cycle = itertools.count()
+_replica_monitor: Optional[asyncio.Task] = None
+
+# Replication delay; zero when the replica has replayed everything it received
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
 # Base class for all models
 Base = declarative_base()
 
+
 async def init_db():
     """
     Initialize database connection and create tables.
-    
+
     This function should be called during application startup.
     """
     try:
         # Test database connection
         async with engine.begin() as conn:
             await conn.run_sync(lambda sync_conn: sync_conn.execute("SELECT 1"))
-        
+
         logger.info("Database connection established successfully")
-        
+
         # Create tables (in production, use migrations instead)
         if settings.ENVIRONMENT == "development":
+            import app.models  # noqa: F401  (register models on Base.metadata)
+
             async with engine.begin() as conn:
                 await conn.run_sync(Base.metadata.create_all)
             logger.info("Database tables created successfully")
-            
+
     except Exception as e:
         logger.error("Failed to initialize database", error=str(e))
         raise
 
-async def get_db() -> AsyncSession:
+
+def _sticky_cache_key(sticky_key: str) -> str:
+    return f"db:recent-write:{sticky_key}"
+
+
+def sticky_key_for(connection: HTTPConnection) -> Optional[str]:
+    """
+    Identify the client for read-your-writes pinning.
+
+    Only an access token or a session cookie identifies a client; requests
+    without either are never pinned, since a client IP is shared by everyone
+    behind the same NAT or proxy.
+    """
+    identity = connection.headers.get("authorization") or connection.cookies.get(
+        settings.SESSION_COOKIE_NAME
+    )
+    if not identity:
+        return None
+    return hashlib.sha256(identity.encode()).hexdigest()[:32]
+
+
+async def _replica_lag(replica: Replica) -> float:
+    async with replica.engine.connect() as conn:
+        return float(await conn.scalar(REPLICA_LAG_SQL) or 0)
+
+
+async def _check_replica(replica: Replica) -> None:
+    try:
+        # Bounds connecting too, so an unreachable replica cannot stall the monitor
+        replica.lag_seconds = await asyncio.wait_for(
+            _replica_lag(replica), timeout=settings.REPLICA_HEALTH_CHECK_TIMEOUT
+        )
+        healthy = replica.lag_seconds <= settings.REPLICA_MAX_LAG_SECONDS
+    except Exception as e:
+        replica.lag_seconds = None
+        healthy = False
+        logger.warning(
+            "Replica health check failed",
+            replica=replica.engine.url.host,
+            error=str(e) or type(e).__name__,
+        )
+
+    if healthy != replica.healthy:
+        logger.info(
+            "Replica health changed",
+            replica=replica.engine.url.host,
+            healthy=healthy,
+            lag_seconds=replica.lag_seconds,
+        )
+    replica.healthy = healthy
+
+
+async def _monitor_replicas() -> None:
+    while True:
+        await asyncio.gather(*(_check_replica(replica) for replica in replicas))
+        await asyncio.sleep(settings.REPLICA_HEALTH_CHECK_INTERVAL)
+
+
+def pick_replica() -> Optional[Replica]:
+    """Next healthy replica in round-robin order, or None if none is usable."""
+    healthy = [replica for replica in replicas if replica.healthy]
+    if not healthy:
+        return None
+    return healthy[next(_replica_cycle) % len(healthy)]
+
+
+async def start_replica_monitor():
+    """
+    Start checking replica health and lag in the background.
+
+    This function should be called during application startup.
+    """
+    global _replica_monitor
+
+    if replicas and _replica_monitor is None:
+        await asyncio.gather(*(_check_replica(replica) for replica in replicas))
+        _replica_monitor = asyncio.create_task(_monitor_replicas())
+        logger.info("Replica monitor started", replicas=len(replicas))
+
+
+async def get_db(connection: HTTPConnection) -> AsyncSession:
     """
     Dependency to get database session.
-    
+
     This function is used as a FastAPI dependency to provide database sessions
     to API endpoints.
     """
     async with AsyncSessionLocal() as session:
+        session.info["sticky_key"] = sticky_key_for(connection)
+        try:
+            yield session
+        except Exception as e:
+            await session.rollback()
+            logger.error("Database session error", error=str(e))
+            raise
+        finally:
+            await session.close()
+
+
+async def get_read_db(connection: HTTPConnection) -> AsyncSession:
+    """
+    Dependency to get a read-only database session.
+
+    Sessions are bound to a healthy replica in round-robin order. Clients that
+    wrote recently, or requests arriving while every replica is down or lagging
+    more than `REPLICA_MAX_LAG_SECONDS`, are served from the primary.
+    """
+    replica = pick_replica()
+    if replica is not None:
+        sticky_key = sticky_key_for(connection)
+        if sticky_key and await cache_exists(_sticky_cache_key(sticky_key)):
+            replica = None
+
+    sessionmaker = replica.sessionmaker if replica is not None else AsyncSessionLocal
+    async with sessionmaker() as session:
         try:
             yield session
         except Exception as e:
@@ -72,11 +284,20 @@ async def get_db() -> AsyncSession:
         finally:
             await session.close()
 
+
 async def close_db():
     """
     Close database connections.
-    
+
     This function should be called during application shutdown.
     """
+    global _replica_monitor
+
+    if _replica_monitor is not None:
+        _replica_monitor.cancel()
+        _replica_monitor = None
+
     await engine.dispose()
+    for replica in replicas:
+        await replica.engine.dispose()
     logger.info("Database connections closed")
@@ -6,19 +6,21 @@ and debugging capabilities.
 """
 
 import sys
-import structlog
 from typing import Any, Dict
 
+import structlog
+
 from app.core.config import settings
 
+
 def setup_logging():
     """
     Setup structured logging configuration.
-    
+
     Configures structlog with appropriate processors and formatters
     based on the environment settings.
     """
-    
+
     # Configure structlog processors
     processors = [
         structlog.stdlib.filter_by_level,
@@ -29,14 +31,14 @@ def setup_logging():
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
     ]
-    
+
     # Add JSON formatter for production
     if settings.ENVIRONMENT == "production":
         processors.append(structlog.processors.JSONRenderer())
     else:
         # Add console formatter for development
         processors.append(structlog.dev.ConsoleRenderer())
-    
+
     # Configure structlog
     structlog.configure(
         processors=processors,
@@ -45,23 +47,24 @@ def setup_logging():
         wrapper_class=structlog.stdlib.BoundLogger,
         cache_logger_on_first_use=True,
     )
-    
+
     # Configure standard library logging
     import logging
-    
+
     logging.basicConfig(
         format="%(message)s",
         stream=sys.stdout,
         level=getattr(logging, settings.LOG_LEVEL.upper()),
     )
 
+
 def get_logger(name: str = None) -> structlog.BoundLogger:
     """
     Get a structured logger instance.
-    
+
     Args:
         name: Logger name (optional)
-        
+
     Returns:
         Configured structlog logger
     """
@@ -0,0 +1,57 @@
+"""
+Prometheus metrics export for the AI Multi-Agent Content Creation & Marketing System.
+
+Metrics are served at `/metrics` when `ENABLE_METRICS` is on. Under the
+prefork server every worker keeps its own counters, so a scrape answered by
+one worker would only see that worker's share. Setting
+`PROMETHEUS_MULTIPROC_DIR` (before the app is imported) makes
+prometheus_client write values to per-process files in that directory, and
+the exporter then aggregates the files of every worker. The directory is
+emptied when the prefork server starts, and the files of exited workers
+are marked dead so their live gauges drop out of the totals.
+"""
+
+import os
+from typing import Optional
+
+import structlog
+from prometheus_client import REGISTRY, CollectorRegistry, make_asgi_app, multiprocess
+
+logger = structlog.get_logger()
+
+
+def multiprocess_dir() -> Optional[str]:
+    """Directory of per-process metric files, when multiprocess mode is on."""
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR") or None
+
+
+def metrics_registry() -> CollectorRegistry:
+    """Registry to export: all workers' files in multiprocess mode."""
+    if multiprocess_dir() is None:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics_app():
+    """ASGI app serving the metrics in the Prometheus text format."""
+    return make_asgi_app(registry=metrics_registry())
+
+
+def reset_multiprocess_dir() -> None:
+    """Remove metric files left by a previous run (prefork master only)."""
+    path = multiprocess_dir()
+    if path is None:
+        return
+    os.makedirs(path, exist_ok=True)
+    for name in os.listdir(path):
+        if name.endswith(".db"):
+            os.remove(os.path.join(path, name))
+    logger.info("Prometheus multiprocess mode enabled", path=path)
+
+
+def child_exit(server, worker) -> None:
+    """Gunicorn hook: drop the live gauges of an exited worker."""
+    if multiprocess_dir() is not None:
+        multiprocess.mark_process_dead(worker.pid)
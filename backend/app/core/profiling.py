@@ -0,0 +1,336 @@
+"""
+Request profiling and event-loop monitoring for the AI Multi-Agent Content Creation & Marketing System.
+
+`ProfilingMiddleware` samples the event-loop thread's stack while selected
+requests run and writes the samples as folded stacks (one
+`frame;frame;frame count` line per stack), the input format of flamegraph.pl,
+speedscope and inferno. A request is profiled when it carries
+`X-Profile: <PROFILING_TOKEN>` or is picked by `PROFILING_SAMPLE_RATE`; only
+the newest `PROFILING_MAX_FILES` profiles are kept.
+
+`LoopMonitor` measures event-loop lag and, from a watchdog thread, reports
+callbacks that block the loop for longer than `SLOW_CALLBACK_MS` together with
+the stack that is blocking and the route of the request it belongs to.
+
+Both find the request a stack belongs to by looking for the middleware's own
+frame in it, so they only need a dictionary entry per in-flight request and
+nothing runs on the request path when no request is profiled.
+"""
+
+import asyncio
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+from prometheus_client import Counter as MetricCounter
+from prometheus_client import Histogram
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+PROFILE_SUFFIX = ".folded"
+
+# Route label of requests no route matched, so probes of random paths cannot
+# create unbounded metric label values or profile file names
+UNMATCHED_ROUTE = "unmatched"
+
+LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a timer callback",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+SLOW_CALLBACKS = MetricCounter(
+    "event_loop_slow_callbacks_total",
+    "Callbacks that blocked the event loop",
+    ["route"],
+)
+
+_UNSAFE_CHARS_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+class _Request:
+    """An in-flight request, keyed in the registry by its middleware frame."""
+
+    __slots__ = ("scope", "samples")
+
+    def __init__(self, scope: Dict[str, Any], profiled: bool):
+        self.scope = scope
+        self.samples: Optional[Counter] = Counter() if profiled else None
+
+    @property
+    def route(self) -> str:
+        path = getattr(self.scope.get("route"), "path", None) or UNMATCHED_ROUTE
+        return f"{self.scope.get('method', 'WS')} {path}"
+
+
+# Middleware frame -> request; read without locking by the sampling threads
+_inflight: Dict[FrameType, _Request] = {}
+
+
+def _owner(frame: Optional[FrameType]) -> Tuple[List[CodeType], Optional[_Request]]:
+    """Walk a stack up to the request frame it runs under."""
+    codes = []
+    while frame is not None:
+        request = _inflight.get(frame)
+        if request is not None:
+            return codes, request
+        codes.append(frame.f_code)
+        frame = frame.f_back
+    return codes, None
+
+
+def _frame_label(code: CodeType) -> str:
+    filename = code.co_filename
+    for prefix in sys.path:
+        if prefix and filename.startswith(prefix):
+            filename = filename[len(prefix) :].lstrip(os.sep)
+            break
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def fold(codes: Tuple[CodeType, ...]) -> str:
+    """Format a leaf-first stack as a folded, root-first frame list."""
+    return ";".join(_frame_label(code) for code in reversed(codes))
+
+
+class SamplingProfiler:
+    """
+    Samples the event-loop thread while at least one request is profiled.
+
+    The sampling thread is started on demand and exits once no profiled
+    request is left.
+    """
+
+    def __init__(self, interval_ms: float):
+        self.interval = interval_ms / 1000
+        self.loop_thread_id: Optional[int] = None
+        self._profiled = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def begin(self) -> None:
+        with self._lock:
+            self._profiled += 1
+            self.loop_thread_id = threading.get_ident()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="request-profiler", daemon=True
+                )
+                self._thread.start()
+
+    def end(self) -> None:
+        with self._lock:
+            self._profiled -= 1
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._profiled:
+                    self._thread = None
+                    return
+            frame = sys._current_frames().get(self.loop_thread_id)
+            codes, request = _owner(frame)
+            if request is not None and request.samples is not None:
+                request.samples[tuple(codes)] += 1
+            time.sleep(self.interval)
+
+
+profiler = SamplingProfiler(settings.PROFILING_INTERVAL_MS)
+
+
+def _should_profile(scope: Dict[str, Any]) -> bool:
+    if settings.PROFILING_TOKEN:
+        for name, value in scope.get("headers", ()):
+            if name == PROFILE_HEADER.encode():
+                return hmac.compare_digest(value, settings.PROFILING_TOKEN.encode())
+    return (
+        settings.PROFILING_SAMPLE_RATE > 0
+        and random.random() < settings.PROFILING_SAMPLE_RATE
+    )
+
+
+def write_profile(path: str, samples: Counter) -> None:
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as output:
+        for codes, count in samples.items():
+            output.write(f"{fold(codes)} {count}\n")
+    prune_profiles(directory, settings.PROFILING_MAX_FILES)
+
+
+def prune_profiles(directory: str, keep: int) -> List[str]:
+    """
+    Delete all but the `keep` newest profiles in a directory.
+
+    Profile names start with their timestamp, so they sort oldest first.
+
+    Returns:
+        Paths of the deleted profiles
+    """
+    names = sorted(
+        name for name in os.listdir(directory) if name.endswith(PROFILE_SUFFIX)
+    )
+    deleted = []
+    for name in names[: max(len(names) - keep, 0)]:
+        path = os.path.join(directory, name)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # Pruned concurrently by another worker
+            continue
+        deleted.append(path)
+    return deleted
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware registering requests for profiling and loop monitoring.
+
+    It must be the innermost middleware: the `@app.middleware("http")`
+    middlewares run the rest of the app in a separate task, whose stacks would
+    not contain this middleware's frame.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        frame = sys._getframe()
+        request = _Request(scope, _should_profile(scope))
+        _inflight[frame] = request
+        if request.samples is None:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                del _inflight[frame]
+            return
+
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (PROFILE_ID_HEADER, profile_id.encode()),
+                    ],
+                }
+            await send(message)
+
+        profiler.begin()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.end()
+            del _inflight[frame]
+            route = _UNSAFE_CHARS_RE.sub("_", request.route).strip("_")
+            path = os.path.join(
+                settings.PROFILING_OUTPUT_DIR, f"{profile_id}-{route}{PROFILE_SUFFIX}"
+            )
+            asyncio.get_running_loop().run_in_executor(
+                None, write_profile, path, request.samples
+            )
+            logger.info(
+                "Request profiled",
+                route=request.route,
+                profile=path,
+                samples=sum(request.samples.values()),
+                duration=time.perf_counter() - started,
+            )
+
+
+class LoopMonitor:
+    """
+    Event-loop lag and slow-callback monitor.
+
+    A task on the loop records a heartbeat every `LOOP_LAG_INTERVAL_MS` and
+    observes how late its timer fired. A watchdog thread notices when the
+    heartbeat stops for more than `SLOW_CALLBACK_MS` and logs what the loop
+    is executing at that moment, once per blocking episode.
+    """
+
+    def __init__(self):
+        self.interval = settings.LOOP_LAG_INTERVAL_MS / 1000
+        self.threshold = settings.SLOW_CALLBACK_MS / 1000
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    async def start(self) -> None:
+        """
+        Start the lag probe and the watchdog thread.
+
+        This function should be called during application startup.
+        """
+        if not settings.LOOP_MONITOR_ENABLED or self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._probe())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+        logger.info(
+            "Event loop monitor started", slow_callback_ms=settings.SLOW_CALLBACK_MS
+        )
+
+    async def stop(self) -> None:
+        """Stop the lag probe and the watchdog thread."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        self._task = None
+        self._stopped.set()
+
+    async def _probe(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            LOOP_LAG.observe(max(0.0, now - expected))
+
+    def _watch(self) -> None:
+        reported_beat = None
+        while not self._stopped.wait(self.threshold / 2):
+            beat = self._heartbeat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.threshold or beat == reported_beat:
+                continue
+            reported_beat = beat
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            codes, request = _owner(frame)
+            route = request.route if request is not None else "background"
+            SLOW_CALLBACKS.labels(route=route).inc()
+            logger.warning(
+                "Event loop blocked",
+                route=route,
+                blocked_ms=round(blocked * 1000),
+                stack=fold(tuple(codes)),
+            )
+
+
+loop_monitor = LoopMonitor()
@@ -2,48 +2,74 @@
 Redis connection and caching for the AI Multi-Agent Content Creation & Marketing System.
 
 This module handles Redis connection, caching operations, and session management.
+Plain cache functions store text; the typed `cache_*_object(s)` functions store
+any Python object through the versioned, compressed codec in `app.core.codec`.
 """
 
-import aioredis
+from typing import Any, Dict, List, Optional
+
 import structlog
-from typing import Optional, Any
+from redis import asyncio as aioredis
 
+from app.core import codec
 from app.core.config import settings
 
 logger = structlog.get_logger()
 
-# Global Redis connection
+# Set KEYS[2..n] to ARGV[3..n] with expiry ARGV[2], only if KEYS[1] still holds
+# ARGV[1] (an empty ARGV[1] matches a missing key)
+SET_IF_GENERATION_SCRIPT = """
+if (redis.call('GET', KEYS[1]) or '') ~= ARGV[1] then
+    return 0
+end
+for i = 2, #KEYS do
+    redis.call('SET', KEYS[i], ARGV[i + 1], 'EX', ARGV[2])
+end
+return 1
+"""
+
+# Global Redis connections (text values, and raw bytes for binary payloads)
 redis_client: Optional[aioredis.Redis] = None
+binary_redis_client: Optional[aioredis.Redis] = None
+
 
 async def init_redis():
     """
     Initialize Redis connection.
-    
+
     This function should be called during application startup.
     """
-    global redis_client
-    
+    global redis_client, binary_redis_client
+
     try:
         redis_client = aioredis.from_url(
             settings.REDIS_URL,
             db=settings.REDIS_DB,
             password=settings.REDIS_PASSWORD,
+            max_connections=settings.per_worker(settings.REDIS_POOL_BUDGET),
             encoding="utf-8",
-            decode_responses=True
+            decode_responses=True,
         )
-        
+        binary_redis_client = aioredis.from_url(
+            settings.REDIS_URL,
+            db=settings.REDIS_DB,
+            password=settings.REDIS_PASSWORD,
+            max_connections=settings.per_worker(settings.REDIS_BINARY_POOL_BUDGET),
+        )
+
         # Test connection
         await redis_client.ping()
         logger.info("Redis connection established successfully")
-        
+
     except Exception as e:
         logger.error("Failed to connect to Redis", error=str(e))
         raise
 
+
 async def get_redis() -> aioredis.Redis:
     """
     Get Redis client instance.
-    
+
     This function is used as a dependency to provide Redis client
     to other parts of the application.
     """
@@ -51,17 +77,33 @@ async def get_redis() -> aioredis.Redis:
         raise RuntimeError("Redis client not initialized")
     return redis_client
 
+
+async def get_binary_redis() -> aioredis.Redis:
+    """
+    Get the Redis client that returns raw bytes.
+
+    Use it for compressed or otherwise binary values, which the default
+    client would try to decode as UTF-8.
+    """
+    if binary_redis_client is None:
+        raise RuntimeError("Redis client not initialized")
+    return binary_redis_client
+
+
 async def close_redis():
     """
     Close Redis connection.
-    
+
     This function should be called during application shutdown.
     """
-    global redis_client
-    
+    global redis_client, binary_redis_client
+
     if redis_client:
         await redis_client.close()
         logger.info("Redis connection closed")
+    if binary_redis_client:
+        await binary_redis_client.close()
+
 
 # Cache utility functions
 async def cache_get(key: str) -> Optional[str]:
@@ -73,6 +115,7 @@ async def cache_get(key: str) -> Optional[str]:
         logger.error("Cache get error", key=key, error=str(e))
         return None
 
+
 async def cache_set(key: str, value: str, expire: int = 3600) -> bool:
     """Set value in cache with expiration."""
     try:
@@ -83,6 +126,7 @@ async def cache_set(key: str, value: str, expire: int = 3600) -> bool:
         logger.error("Cache set error", key=key, error=str(e))
         return False
 
+
 async def cache_delete(key: str) -> bool:
     """Delete value from cache."""
     try:
@@ -93,6 +137,7 @@ async def cache_delete(key: str) -> bool:
         logger.error("Cache delete error", key=key, error=str(e))
         return False
 
+
 async def cache_exists(key: str) -> bool:
     """Check if key exists in cache."""
     try:
@@ -101,3 +146,148 @@ async def cache_exists(key: str) -> bool:
     except Exception as e:
         logger.error("Cache exists error", key=key, error=str(e))
         return False
+
+
+async def cache_get_many(keys: List[str]) -> List[Optional[str]]:
+    """Get several values from cache in a single round trip."""
+    try:
+        redis = await get_redis()
+        return await redis.mget(keys)
+    except Exception as e:
+        logger.error("Cache get many error", keys=keys, error=str(e))
+        return [None] * len(keys)
+
+
+async def cache_set_many(mapping: Dict[str, str], expire: int = 3600) -> bool:
+    """Set several values atomically, all with the same expiration."""
+    try:
+        redis = await get_redis()
+        async with redis.pipeline(transaction=True) as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=expire)
+            await pipe.execute()
+        return True
+    except Exception as e:
+        logger.error("Cache set many error", keys=list(mapping), error=str(e))
+        return False
+
+
+async def cache_delete_many(keys: List[str]) -> bool:
+    """Delete several values from cache in a single round trip."""
+    if not keys:
+        return True
+    try:
+        redis = await get_redis()
+        await redis.delete(*keys)
+        return True
+    except Exception as e:
+        logger.error("Cache delete many error", keys=keys, error=str(e))
+        return False
+
+
+# Typed cache functions (values go through the binary codec in app.core.codec)
+async def cache_get_object(key: str, default: Any = None) -> Any:
+    """Get a Python object from cache."""
+    try:
+        redis = await get_binary_redis()
+        value = codec.decode(await redis.get(key))
+        return default if value is None else value
+    except Exception as e:
+        logger.error("Cache get error", key=key, error=str(e))
+        return default
+
+
+async def cache_set_object(key: str, value: Any, expire: int = 3600) -> bool:
+    """Set a Python object (structured value, bytes or text) in cache with expiration."""
+    try:
+        redis = await get_binary_redis()
+        await redis.set(key, codec.encode(value), ex=expire)
+        return True
+    except Exception as e:
+        logger.error("Cache set error", key=key, error=str(e))
+        return False
+
+
+async def cache_get_objects(keys: List[str]) -> List[Any]:
+    """Get several Python objects from cache in a single round trip."""
+    try:
+        redis = await get_binary_redis()
+        return [codec.decode(value) for value in await redis.mget(keys)]
+    except Exception as e:
+        logger.error("Cache get many error", keys=keys, error=str(e))
+        return [None] * len(keys)
+
+
+async def cache_set_objects(mapping: Dict[str, Any], expire: int = 3600) -> bool:
+    """Set several Python objects atomically, all with the same expiration."""
+    try:
+        redis = await get_binary_redis()
+        async with redis.pipeline(transaction=True) as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, codec.encode(value), ex=expire)
+            await pipe.execute()
+        return True
+    except Exception as e:
+        logger.error("Cache set many error", keys=list(mapping), error=str(e))
+        return False
+
+
+# Generation-guarded cache fills: readers note a generation before loading a
+# value from the database and only store it if no invalidation bumped the
+# generation in the meantime, so a slow reader cannot re-cache stale data
+async def cache_get_generation(key: str) -> bytes:
+    """Current value of a generation counter (empty if never bumped)."""
+    try:
+        redis = await get_binary_redis()
+        return await redis.get(key) or b""
+    except Exception as e:
+        logger.error("Cache get error", key=key, error=str(e))
+        return b""
+
+
+async def cache_set_objects_if_generation(
+    mapping: Dict[str, Any],
+    generation_key: str,
+    generation: bytes,
+    expire: int = 3600,
+) -> bool:
+    """
+    Set several Python objects atomically if a generation counter is unchanged.
+
+    Returns:
+        Whether the values were stored
+    """
+    try:
+        redis = await get_binary_redis()
+        stored = await redis.eval(
+            SET_IF_GENERATION_SCRIPT,
+            len(mapping) + 1,
+            generation_key,
+            *mapping,
+            generation,
+            expire,
+            *(codec.encode(value) for value in mapping.values()),
+        )
+        return bool(stored)
+    except Exception as e:
+        logger.error("Cache set many error", keys=list(mapping), error=str(e))
+        return False
+
+
+async def cache_invalidate(
+    keys: List[str], generation_keys: List[str], generation_ttl: int = 86400
+) -> bool:
+    """Delete cached values and bump the generations guarding their fills."""
+    try:
+        redis = await get_binary_redis()
+        async with redis.pipeline(transaction=True) as pipe:
+            for key in generation_keys:
+                pipe.incr(key)
+                pipe.expire(key, generation_ttl)
+            if keys:
+                pipe.delete(*keys)
+            await pipe.execute()
+        return True
+    except Exception as e:
+        logger.error("Cache invalidate error", keys=keys, error=str(e))
+        return False
@@ -0,0 +1,64 @@
+"""
+Security helpers for the AI Multi-Agent Content Creation & Marketing System.
+
+Access tokens are JWTs signed with `SECRET_KEY` using `ALGORITHM`. The subject
+(`sub`) identifies the user and `scopes` lists what the token may do:
+`content:write` allows editing any content item, `content:{content_id}:write`
+a single one.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional
+
+from jose import JWTError, jwt
+
+from app.core.config import settings
+
+CONTENT_WRITE_SCOPE = "content:write"
+
+
+class AuthenticationError(Exception):
+    """Raised when a token is missing, invalid or expired."""
+
+
+def create_access_token(
+    subject: str,
+    scopes: Iterable[str] = (),
+    expires_minutes: Optional[int] = None,
+) -> str:
+    """Issue a signed access token."""
+    expires_at = datetime.now(timezone.utc) + timedelta(
+        minutes=expires_minutes or settings.ACCESS_TOKEN_EXPIRE_MINUTES
+    )
+    claims = {
+        "sub": subject,
+        "type": "access",
+        "scopes": list(scopes),
+        "exp": expires_at,
+    }
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def decode_access_token(token: Optional[str]) -> Dict[str, Any]:
+    """
+    Verify an access token and return its claims.
+
+    Raises:
+        AuthenticationError: Missing, malformed, expired or non-access token
+    """
+    if not token:
+        raise AuthenticationError("Missing access token")
+    try:
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError as e:
+        raise AuthenticationError("Invalid access token") from e
+
+    if claims.get("type") != "access" or not claims.get("sub"):
+        raise AuthenticationError("Invalid access token")
+    return claims
+
+
+def can_edit_content(claims: Dict[str, Any], content_id: str) -> bool:
+    """Whether a token's scopes allow editing a content item."""
+    scopes = claims.get("scopes") or ()
+    return CONTENT_WRITE_SCOPE in scopes or f"content:{content_id}:write" in scopes
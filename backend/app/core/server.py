@@ -0,0 +1,203 @@
+"""
+Production server for the AI Multi-Agent Content Creation & Marketing System.
+
+This module runs the application under a prefork Gunicorn master with
+`WORKERS` Uvicorn worker processes. The app is imported once in the master and
+inherited by every worker; uvloop and httptools are used when installed.
+Workers are recycled, draining first, after a (jittered) number of requests
+or when their resident memory exceeds `WORKER_MAX_RSS_MB`. Connection budgets and the
+scoring process pool are totals split across the workers, so the CPU and
+memory footprint does not grow with `WORKERS`. On
+SIGTERM/SIGINT every worker drains (see `app.core.shutdown`) before Uvicorn
+stops serving; a second signal skips the drain.
+"""
+
+import asyncio
+import os
+import resource
+import signal
+import sys
+from typing import Any, Dict, Optional
+
+import structlog
+from gunicorn.app.base import BaseApplication
+from gunicorn.arbiter import Arbiter
+from uvicorn import Config, Server
+from uvicorn.workers import UvicornWorker
+
+from app.core.config import settings
+from app.core.metrics import child_exit, reset_multiprocess_dir
+from app.core.shutdown import drain_controller
+
+logger = structlog.get_logger()
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of the current process."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Peak RSS; reported in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class DrainingServer(Server):
+    """Uvicorn server that drains the worker before it stops serving."""
+
+    _drain_task = None
+
+    def handle_exit(self, sig: int, frame) -> None:
+        if drain_controller.draining or not self.started:
+            super().handle_exit(sig, frame)
+            return
+        # Called from the event loop's signal handler
+        self._drain_task = asyncio.get_event_loop().create_task(
+            self._drain_and_exit(sig, frame)
+        )
+
+    async def on_tick(self, counter: int) -> bool:
+        should_exit = await super().on_tick(counter)
+        if should_exit and not self.should_exit:
+            # Recycled after `limit_max_requests`; Uvicorn would leave the main
+            # loop without a signal, so drain as if one had been received
+            if self._drain_task is None:
+                logger.info(
+                    "Worker reached its request limit, recycling",
+                    pid=os.getpid(),
+                    requests=self.server_state.total_requests,
+                )
+                self.handle_exit(signal.SIGTERM, None)
+            return self.should_exit
+        return should_exit
+
+    async def _drain_and_exit(self, sig: int, frame) -> None:
+        try:
+            await drain_controller.drain()
+        finally:
+            super().handle_exit(sig, frame)
+
+
+class RecyclingUvicornWorker(UvicornWorker):
+    """
+    Uvicorn worker that restarts itself once it grows past the RSS limit.
+
+    The check piggybacks on the periodic heartbeat Uvicorn already sends to the
+    Gunicorn master, so it costs nothing on the request path.
+    """
+
+    CONFIG_KWARGS: Dict[str, Any] = {"loop": "auto", "http": "auto", "lifespan": "on"}
+
+    async def callback_notify(self) -> None:
+        await super().callback_notify()
+
+        limit = settings.WORKER_MAX_RSS_MB * 1024 * 1024
+        if limit and self.alive and current_rss_bytes() > limit:
+            logger.warning(
+                "Worker exceeded memory limit, recycling",
+                pid=os.getpid(),
+                rss_mb=current_rss_bytes() // (1024 * 1024),
+                limit_mb=settings.WORKER_MAX_RSS_MB,
+            )
+            self.alive = False
+            # Graceful shutdown through Uvicorn's own signal handling
+            os.kill(os.getpid(), signal.SIGTERM)
+
+    async def _serve(self) -> None:
+        # UvicornWorker._serve with the draining server
+        self.config.app = self.wsgi
+        server = DrainingServer(config=self.config)
+        self._install_sigquit_handler()
+        await server.serve(sockets=self.sockets)
+        if not server.started:
+            sys.exit(Arbiter.WORKER_BOOT_ERROR)
+
+
+def post_fork(server, worker) -> None:
+    """Gunicorn hook: drop any DB connections inherited from the master."""
+    from app.core.database import engine
+
+    engine.sync_engine.dispose(close=False)
+    logger.info("Worker started", pid=worker.pid)
+
+
+class ServerApplication(BaseApplication):
+    """Embedded Gunicorn application serving a preloaded ASGI app."""
+
+    def __init__(self, app_uri: str, options: Optional[Dict[str, Any]] = None):
+        self.app_uri = app_uri
+        self.options = options or {}
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        from gunicorn.util import import_app
+
+        return import_app(self.app_uri)
+
+
+def gunicorn_options() -> Dict[str, Any]:
+    """Gunicorn settings derived from application settings."""
+    return {
+        "bind": f"{settings.HOST}:{settings.PORT}",
+        "workers": settings.WORKERS,
+        "worker_class": f"{__name__}.RecyclingUvicornWorker",
+        "preload_app": True,
+        "max_requests": settings.WORKER_MAX_REQUESTS,
+        "max_requests_jitter": settings.WORKER_MAX_REQUESTS_JITTER,
+        "graceful_timeout": settings.WORKER_GRACEFUL_TIMEOUT,
+        "timeout": settings.WORKER_TIMEOUT,
+        "keepalive": 5,
+        "loglevel": "debug" if settings.DEBUG else "info",
+        "post_fork": post_fork,
+        "child_exit": child_exit,
+    }
+
+
+def run_prefork(app_uri: str = "main:app") -> None:
+    """
+    Serve the application with `WORKERS` prefork worker processes.
+    """
+    logger.info(
+        "Starting prefork server",
+        workers=settings.WORKERS,
+        db_pool_per_worker=settings.per_worker(settings.DB_POOL_BUDGET),
+        redis_pool_per_worker=settings.per_worker(settings.REDIS_POOL_BUDGET),
+        scoring_processes_per_worker=settings.per_worker(settings.SCORING_WORKERS),
+    )
+    reset_multiprocess_dir()
+    ServerApplication(app_uri, gunicorn_options()).run()
+
+
+def run_server(app_uri: str = "main:app") -> None:
+    """
+    Serve the application in a single process.
+
+    In debug mode the auto-reloader is used and shutdown does not drain.
+    """
+    if settings.DEBUG:
+        import uvicorn
+
+        uvicorn.run(
+            app_uri,
+            host=settings.HOST,
+            port=settings.PORT,
+            reload=True,
+            log_level="debug",
+        )
+        return
+
+    config = Config(
+        app_uri,
+        host=settings.HOST,
+        port=settings.PORT,
+        loop="auto",
+        http="auto",
+        log_level="info",
+    )
+    DrainingServer(config=config).run()
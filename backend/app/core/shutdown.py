@@ -0,0 +1,194 @@
+"""
+Graceful draining shutdown for the AI Multi-Agent Content Creation & Marketing System.
+
+When a worker is asked to stop (deploy, scale-down, memory recycling) it first
+drains:
+
+1. New HTTP requests get `503` with a jittered `Retry-After` and new
+   WebSocket handshakes are refused, so load balancers and clients move on.
+2. Drain hooks run: services stop taking new work and tell connected clients
+   to reconnect after a jittered delay, so they do not all come back at once.
+3. Work registered with `drain_controller.track()` (agent jobs, scheduled
+   actions) gets until `DRAIN_DEADLINE_SECONDS` to finish. Whatever is still
+   running is cancelled, has `DRAIN_CHECKPOINT_SECONDS` to checkpoint while
+   handling the cancellation, and is then requeued through its callback.
+
+Only then does the server stop and the lifespan shutdown close the pools.
+`DRAIN_DEADLINE_SECONDS + DRAIN_CHECKPOINT_SECONDS` must stay below
+`WORKER_GRACEFUL_TIMEOUT`, or the process manager kills the worker first.
+"""
+
+import asyncio
+import math
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import orjson
+import structlog
+from starlette.websockets import WebSocket
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+DrainHook = Callable[[], Awaitable[None]]
+Requeue = Callable[[], Awaitable[None]]
+
+# WebSocket close code for "server restarting, reconnect later"
+WS_SERVICE_RESTART = 1012
+
+
+def reconnect_delay_ms() -> int:
+    """Jittered delay after which a disconnected client should reconnect."""
+    return random.randint(
+        settings.RECONNECT_MIN_DELAY_MS, settings.RECONNECT_MAX_DELAY_MS
+    )
+
+
+async def close_for_restart(websocket: WebSocket) -> None:
+    """Send a WebSocket client a reconnect hint and close the connection."""
+    delay_ms = reconnect_delay_ms()
+    try:
+        await websocket.send_text(
+            orjson.dumps({"type": "reconnect", "delay_ms": delay_ms}).decode()
+        )
+        await websocket.close(
+            code=WS_SERVICE_RESTART, reason=f"reconnect in {delay_ms}ms"
+        )
+    except Exception:
+        # Already gone
+        pass
+
+
+class _Work:
+    __slots__ = ("name", "requeue")
+
+    def __init__(self, name: str, requeue: Optional[Requeue]):
+        self.name = name
+        self.requeue = requeue
+
+
+class DrainController:
+    """Drain state and in-flight work of this worker."""
+
+    def __init__(self):
+        self.draining = False
+        self._hooks: List[DrainHook] = []
+        self._work: Dict[asyncio.Task, _Work] = {}
+        self._drained = asyncio.Event()
+
+    def on_drain(self, hook: DrainHook) -> None:
+        """Register a coroutine function to run when draining starts."""
+        self._hooks.append(hook)
+
+    @asynccontextmanager
+    async def track(
+        self, name: str, requeue: Optional[Requeue] = None
+    ) -> AsyncIterator[None]:
+        """
+        Mark the current task as in-flight work that draining waits for.
+
+        If the work is still running at the drain deadline, the task is
+        cancelled (it should save a checkpoint when handling the
+        `CancelledError`) and `requeue` is awaited afterwards.
+        """
+        task = asyncio.current_task()
+        self._work[task] = _Work(name, requeue)
+        try:
+            yield
+        finally:
+            self._work.pop(task, None)
+
+    async def _run_hook(self, hook: DrainHook) -> None:
+        try:
+            await hook()
+        except Exception as e:
+            logger.error(
+                "Drain hook failed",
+                hook=getattr(hook, "__qualname__", repr(hook)),
+                error=str(e),
+            )
+
+    async def drain(self) -> None:
+        """Stop taking work, wait for in-flight work, requeue what is left."""
+        if self.draining:
+            await self._drained.wait()
+            return
+        self.draining = True
+        started = time.monotonic()
+        logger.info("Draining worker", in_flight=len(self._work))
+
+        await asyncio.gather(*(self._run_hook(hook) for hook in self._hooks))
+
+        pending = set()
+        remaining = settings.DRAIN_DEADLINE_SECONDS - (time.monotonic() - started)
+        if self._work:
+            _, pending = await asyncio.wait(list(self._work), timeout=max(remaining, 0))
+
+        interrupted = [
+            (task, self._work[task]) for task in pending if task in self._work
+        ]
+        for task, _ in interrupted:
+            task.cancel()
+        if interrupted:
+            await asyncio.wait(
+                [task for task, _ in interrupted],
+                timeout=settings.DRAIN_CHECKPOINT_SECONDS,
+            )
+        for task, work in interrupted:
+            if work.requeue is not None:
+                try:
+                    await work.requeue()
+                except Exception as e:
+                    logger.error(
+                        "Failed to requeue interrupted work",
+                        work=work.name,
+                        error=str(e),
+                    )
+
+        self._drained.set()
+        logger.info(
+            "Worker drained",
+            seconds=round(time.monotonic() - started, 3),
+            requeued=[work.name for _, work in interrupted],
+        )
+
+
+class DrainMiddleware:
+    """ASGI middleware refusing new requests and WebSockets while draining."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not drain_controller.draining or scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        if scope["type"] == "websocket":
+            await send({"type": "websocket.close", "code": WS_SERVICE_RESTART})
+            return
+
+        body = orjson.dumps(
+            {"detail": "Service is restarting", "error_code": "SERVICE_DRAINING"}
+        )
+        retry_after = math.ceil(reconnect_delay_ms() / 1000)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(retry_after).encode()),
+                    (b"connection", b"close"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+# Global drain controller for this worker
+drain_controller = DrainController()
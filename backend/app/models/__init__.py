@@ -0,0 +1,11 @@
+"""
+SQLAlchemy database models for the AI Multi-Agent Content Creation & Marketing System.
+
+Importing this package registers every model on `Base.metadata`.
+"""
+
+from app.models.agent import AgentJob
+from app.models.content import Content
+from app.models.marketing import Subscriber
+
+__all__ = ["AgentJob", "Content", "Subscriber"]
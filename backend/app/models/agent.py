@@ -0,0 +1,57 @@
+"""
+AI agent models for the AI Multi-Agent Content Creation & Marketing System.
+"""
+
+import uuid
+
+from sqlalchemy import Column, DateTime, Index, String, func
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+
+from app.core.database import Base
+
+
+def generate_job_id() -> str:
+    """Generate a public job identifier."""
+    return f"job_{uuid.uuid4().hex}"
+
+
+class AgentJob(Base):
+    """
+    A content generation job run by one or more agents.
+
+    The table is range-partitioned by month on `created_at` (hence the
+    composite primary key); partitions are created ahead of time and dropped
+    whole once they fall out of retention, and a default partition catches
+    rows outside every monthly range. Bulky `agent_outputs` of older
+    jobs are moved to cold storage, leaving `outputs_archive_key` behind.
+    """
+
+    __tablename__ = "agent_jobs"
+
+    id = Column(String(64), primary_key=True, default=generate_job_id)
+    created_at = Column(
+        DateTime(timezone=True),
+        primary_key=True,
+        nullable=False,
+        server_default=func.now(),
+    )
+    content_id = Column(String(64), nullable=True, index=True)
+    status = Column(String(20), nullable=False, default="pending")
+    agents_used = Column(ARRAY(String), nullable=False, default=list)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    agent_outputs = Column(JSONB, nullable=True)
+    outputs_archive_key = Column(String(500), nullable=True)
+
+    __table_args__ = (
+        Index("ix_agent_jobs_created_at_id", "created_at", "id"),
+        Index("ix_agent_jobs_status_created_at_id", "status", "created_at", "id"),
+        # Lets archival find jobs still holding outputs without scanning the
+        # archived majority
+        Index(
+            "ix_agent_jobs_unarchived_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=agent_outputs.isnot(None),
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
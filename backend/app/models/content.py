@@ -0,0 +1,54 @@
+"""
+Content models for the AI Multi-Agent Content Creation & Marketing System.
+"""
+
+import uuid
+
+from sqlalchemy import Column, DateTime, Float, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.core.database import Base
+
+
+def generate_content_id() -> str:
+    """Generate a public content identifier."""
+    return f"content_{uuid.uuid4().hex}"
+
+
+class Content(Base):
+    """
+    A content item (blog post, social post, email, ...).
+
+    `version` is SQLAlchemy's version counter: it is bumped on every ORM
+    update and is the source of the content ETag. Server-generated timestamps
+    are fetched eagerly so instances stay readable after commit without a
+    lazy refresh.
+    """
+
+    __tablename__ = "content"
+
+    id = Column(String(64), primary_key=True, default=generate_content_id)
+    title = Column(String(500), nullable=False)
+    type = Column(String(50), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="draft", index=True)
+    body = Column(Text, nullable=True)
+    brief = Column(Text, nullable=True)
+    target_audience = Column(String(500), nullable=True)
+    tone = Column(String(50), nullable=True)
+    style = Column(String(50), nullable=True)
+    keywords = Column(ARRAY(String), nullable=False, default=list)
+    word_count = Column(Integer, nullable=True)
+    readability_score = Column(Float, nullable=True)
+    version = Column(Integer, nullable=False, default=1)
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+    published_at = Column(DateTime(timezone=True), nullable=True)
+
+    __mapper_args__ = {"version_id_col": version, "eager_defaults": True}
@@ -0,0 +1,39 @@
+"""
+Marketing models for the AI Multi-Agent Content Creation & Marketing System.
+"""
+
+import uuid
+
+from sqlalchemy import Column, DateTime, Index, String, func
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+
+from app.core.database import Base
+
+
+def generate_subscriber_id() -> str:
+    """Generate a public subscriber identifier."""
+    return f"subscriber_{uuid.uuid4().hex}"
+
+
+class Subscriber(Base):
+    """
+    An email recipient of marketing campaigns.
+
+    `tags` are matched against a campaign's target audience; `attributes`
+    holds extra fields available to email templates.
+    """
+
+    __tablename__ = "subscribers"
+
+    id = Column(String(64), primary_key=True, default=generate_subscriber_id)
+    email = Column(String(320), nullable=False, unique=True)
+    first_name = Column(String(200), nullable=True)
+    last_name = Column(String(200), nullable=True)
+    tags = Column(ARRAY(String), nullable=False, default=list)
+    attributes = Column(JSONB, nullable=False, default=dict)
+    unsubscribed_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    __table_args__ = (Index("ix_subscribers_tags", "tags", postgresql_using="gin"),)
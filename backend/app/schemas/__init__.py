@@ -0,0 +1,3 @@
+"""
+Pydantic request/response schemas for the AI Multi-Agent Content Creation & Marketing System.
+"""
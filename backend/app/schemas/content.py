@@ -0,0 +1,46 @@
+"""
+Content request schemas for the AI Multi-Agent Content Creation & Marketing System.
+"""
+
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+ContentStatus = Literal["draft", "published", "archived"]
+
+MAX_BULK_ITEMS = 500
+
+
+class ContentCreate(BaseModel):
+    """Fields accepted when creating a content item."""
+
+    title: str = Field(..., min_length=1, max_length=500)
+    type: str = Field(..., min_length=1, max_length=50)
+    content: Optional[str] = None
+    brief: Optional[str] = None
+    target_audience: Optional[str] = Field(None, max_length=500)
+    tone: Optional[str] = Field(None, max_length=50)
+    style: Optional[str] = Field(None, max_length=50)
+    keywords: List[str] = Field(default_factory=list)
+    word_count: Optional[int] = Field(None, gt=0)
+
+
+class ContentUpdate(BaseModel):
+    """Fields accepted by `PUT /content/{content_id}`."""
+
+    title: Optional[str] = Field(None, min_length=1, max_length=500)
+    content: Optional[str] = None
+    status: Optional[ContentStatus] = None
+
+
+class BulkContentCreate(BaseModel):
+    """Body of `POST /content/bulk`."""
+
+    items: List[ContentCreate] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+
+class BulkStatusChange(BaseModel):
+    """Body of `POST /content/bulk/status`."""
+
+    content_ids: List[str] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+    status: Literal["published", "archived"]
@@ -0,0 +1,42 @@
+"""
+Marketing request schemas for the AI Multi-Agent Content Creation & Marketing System.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+CampaignFrequency = Literal["once", "daily", "weekly", "monthly"]
+
+MAX_CAMPAIGN_CONTENT = 500
+
+
+class CampaignSchedule(BaseModel):
+    """When a campaign runs and how often it sends."""
+
+    start_date: datetime
+    end_date: Optional[datetime] = None
+    frequency: CampaignFrequency = "once"
+
+    @model_validator(mode="after")
+    def check_dates(self) -> "CampaignSchedule":
+        if self.start_date.tzinfo is None or (
+            self.end_date and self.end_date.tzinfo is None
+        ):
+            raise ValueError("Schedule dates must include a timezone")
+        if self.end_date and self.end_date < self.start_date:
+            raise ValueError("end_date must not be before start_date")
+        if self.frequency != "once" and self.end_date is None:
+            raise ValueError("Recurring campaigns need an end_date")
+        return self
+
+
+class CampaignCreate(BaseModel):
+    """Body of `POST /marketing/campaigns`."""
+
+    name: str = Field(..., min_length=1, max_length=200)
+    content_ids: List[str] = Field(..., min_length=1, max_length=MAX_CAMPAIGN_CONTENT)
+    channels: List[str] = Field(..., min_length=1)
+    schedule: CampaignSchedule
+    target_audience: Dict[str, List[str]] = Field(default_factory=dict)
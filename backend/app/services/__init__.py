@@ -0,0 +1,3 @@
+"""
+Business logic services for the AI Multi-Agent Content Creation & Marketing System.
+"""
@@ -0,0 +1,3 @@
+"""
+AI services: model integrations, agent orchestration and job tracking.
+"""
@@ -0,0 +1,464 @@
+"""
+Job history service for the AI Multi-Agent Content Creation & Marketing System.
+
+Agent jobs live in a table range-partitioned by month. History is paged with
+keyset cursors over `(created_at, id)`, which stay fast at any depth. A
+background retention task keeps partitions created ahead of time, moves the
+bulky agent outputs of older jobs into compressed cold storage, and removes
+whole partitions, with their archived outputs, once they pass
+`ANALYTICS_RETENTION_DAYS` — so old rows are never deleted one by one and the
+table never needs a VACUUM FULL.
+"""
+
+import asyncio
+import base64
+import gzip
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+import structlog
+from sqlalchemy import bindparam, select, text, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis import get_redis
+from app.models.agent import AgentJob
+from app.services.storage.cloud_storage import (
+    delete_object,
+    delete_prefix,
+    get_object,
+    list_prefixes,
+    put_object,
+)
+
+logger = structlog.get_logger()
+
+PARENT_TABLE = AgentJob.__tablename__
+# Catches rows outside every monthly partition (clock skew, backfills)
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+RETENTION_LOCK_KEY = "lock:job-history-retention"
+ARCHIVE_BATCH_SIZE = 1000
+ARCHIVE_ROOT = "job-archive/"
+
+_PARTITION_RE = re.compile(rf"^{PARENT_TABLE}_p(\d{{4}})(\d{{2}})$")
+
+_retention_task: Optional[asyncio.Task] = None
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+# ---------------------------------------------------------------------------
+# Cursor pagination
+# ---------------------------------------------------------------------------
+
+
+def encode_cursor(created_at: datetime, job_id: str) -> str:
+    raw = orjson.dumps([created_at.isoformat(), job_id])
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, job_id = orjson.loads(raw)
+        return datetime.fromisoformat(created_at), str(job_id)
+    except Exception as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+
+def serialize_job(job: Any) -> Dict[str, Any]:
+    return {
+        "id": job.id,
+        "content_id": job.content_id,
+        "status": job.status,
+        "created_at": job.created_at,
+        "completed_at": job.completed_at,
+        "agents_used": list(job.agents_used or []),
+    }
+
+
+async def get_job_history(
+    db: AsyncSession,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Get one page of job history, newest first.
+
+    Agent outputs are not selected, so pages never read the bulky column.
+
+    Returns:
+        The jobs on the page and the cursor of the next page (None at the end)
+
+    Raises:
+        InvalidCursorError: The cursor is malformed
+    """
+    query = select(
+        AgentJob.id,
+        AgentJob.content_id,
+        AgentJob.status,
+        AgentJob.created_at,
+        AgentJob.completed_at,
+        AgentJob.agents_used,
+    )
+    if status:
+        query = query.where(AgentJob.status == status)
+    if cursor:
+        created_at, job_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(AgentJob.created_at, AgentJob.id) < tuple_(created_at, job_id)
+        )
+
+    query = query.order_by(AgentJob.created_at.desc(), AgentJob.id.desc()).limit(
+        limit + 1
+    )
+    rows = (await db.execute(query)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return [serialize_job(row) for row in rows], next_cursor
+
+
+# ---------------------------------------------------------------------------
+# Partition management
+# ---------------------------------------------------------------------------
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month.year:04d}{month.month:02d}"
+
+
+async def list_partitions(db: AsyncSession) -> Dict[str, date]:
+    """Existing monthly partitions mapped to the month they hold."""
+    rows = await db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = :parent"
+        ),
+        {"parent": PARENT_TABLE},
+    )
+    partitions = {}
+    for (name,) in rows:
+        match = _PARTITION_RE.match(name)
+        if match:
+            partitions[name] = date(int(match.group(1)), int(match.group(2)), 1)
+    return partitions
+
+
+def _range_bounds(month: date) -> str:
+    return f"FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+
+
+async def _create_partition(db: AsyncSession, name: str, month: date) -> None:
+    bounds = {"start": month, "end": _add_months(month, 1)}
+    in_default = await db.scalar(
+        text(
+            f'SELECT EXISTS (SELECT 1 FROM "{DEFAULT_PARTITION}" '
+            "WHERE created_at >= :start AND created_at < :end)"
+        ),
+        bounds,
+    )
+    if not in_default:
+        await db.execute(
+            text(
+                f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{PARENT_TABLE}" '
+                f"FOR VALUES {_range_bounds(month)}"
+            )
+        )
+        return
+
+    # Postgres refuses a new partition whose range has rows in the default
+    # partition, so those rows are moved into it before it is attached
+    await db.execute(
+        text(
+            f'CREATE TABLE "{name}" '
+            f'(LIKE "{PARENT_TABLE}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        )
+    )
+    await db.execute(
+        text(
+            f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" '
+            "WHERE created_at >= :start AND created_at < :end RETURNING *) "
+            f'INSERT INTO "{name}" SELECT * FROM moved'
+        ),
+        bounds,
+    )
+    await db.execute(
+        text(
+            f'ALTER TABLE "{PARENT_TABLE}" ATTACH PARTITION "{name}" '
+            f"FOR VALUES {_range_bounds(month)}"
+        )
+    )
+
+
+async def ensure_partitions(
+    db: AsyncSession, months_ahead: Optional[int] = None
+) -> None:
+    """
+    Create the default partition and the partitions for the current month and
+    the next few months.
+    """
+    months_ahead = (
+        settings.JOB_PARTITIONS_AHEAD if months_ahead is None else months_ahead
+    )
+    await db.execute(
+        text(
+            f'CREATE TABLE IF NOT EXISTS "{DEFAULT_PARTITION}" '
+            f'PARTITION OF "{PARENT_TABLE}" DEFAULT'
+        )
+    )
+    existing = await list_partitions(db)
+    current = _month_start(datetime.now(timezone.utc).date())
+
+    for offset in range(months_ahead + 1):
+        month = _add_months(current, offset)
+        name = partition_name(month)
+        if name in existing:
+            continue
+        await _create_partition(db, name, month)
+        logger.info("Job history partition created", partition=name)
+    await db.commit()
+
+
+def archive_prefix(partition: str) -> str:
+    return f"{ARCHIVE_ROOT}{partition}/"
+
+
+def _is_expired(month: date, cutoff: date) -> bool:
+    return _add_months(month, 1) <= cutoff
+
+
+async def drop_expired_partitions(db: AsyncSession) -> List[str]:
+    """
+    Detach partitions whose whole month is past retention.
+
+    Detached partitions are dropped, or kept as standalone tables when
+    `JOB_RETENTION_MODE` is "archive". In "drop" mode expired rows that landed
+    in the default partition are deleted too, and so are the archived agent
+    outputs of every expired month.
+    """
+    cutoff = datetime.now(timezone.utc).date() - timedelta(
+        days=settings.ANALYTICS_RETENTION_DAYS
+    )
+    removed = []
+    for name, month in sorted(
+        (await list_partitions(db)).items(), key=lambda item: item[1]
+    ):
+        if not _is_expired(month, cutoff):
+            continue
+        await db.execute(
+            text(f'ALTER TABLE "{PARENT_TABLE}" DETACH PARTITION "{name}"')
+        )
+        if settings.JOB_RETENTION_MODE == "drop":
+            await db.execute(text(f'DROP TABLE "{name}"'))
+        await db.commit()
+        removed.append(name)
+        logger.info(
+            "Job history partition removed",
+            partition=name,
+            mode=settings.JOB_RETENTION_MODE,
+        )
+
+    if settings.JOB_RETENTION_MODE == "drop":
+        await db.execute(
+            text(f'DELETE FROM "{DEFAULT_PARTITION}" WHERE created_at < :cutoff'),
+            {"cutoff": _month_start(cutoff)},
+        )
+        await db.commit()
+        if settings.AWS_S3_BUCKET:
+            await delete_expired_archives(cutoff)
+    return removed
+
+
+async def delete_expired_archives(cutoff: date) -> int:
+    """
+    Delete archived agent outputs of months past retention.
+
+    Runs after the rows are gone, so a failure leaves orphaned objects rather
+    than rows pointing at missing ones; the next pass deletes them.
+
+    Returns:
+        Number of objects deleted
+    """
+    deleted = 0
+    for prefix in await list_prefixes(ARCHIVE_ROOT):
+        match = _PARTITION_RE.match(prefix[len(ARCHIVE_ROOT) :].rstrip("/"))
+        if match is None:
+            continue
+        month = date(int(match.group(1)), int(match.group(2)), 1)
+        if _is_expired(month, cutoff):
+            deleted += await delete_prefix(prefix)
+            logger.info("Archived agent outputs deleted", prefix=prefix)
+    return deleted
+
+
+# ---------------------------------------------------------------------------
+# Cold storage for agent outputs
+# ---------------------------------------------------------------------------
+
+
+def archive_object_key(partition: str, first_job_id: str) -> str:
+    return f"{archive_prefix(partition)}outputs-{first_job_id}.jsonl.gz"
+
+
+async def archive_agent_outputs(db: AsyncSession) -> int:
+    """
+    Move agent outputs older than `JOB_OUTPUT_HOT_DAYS` to cold storage.
+
+    Outputs are written as gzip-compressed JSON lines, one object per batch of
+    jobs from the same month (so dropping a partition can delete its objects by
+    prefix), and the column is cleared so the space is reused by ordinary
+    autovacuum.
+
+    Returns:
+        Number of jobs archived
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.JOB_OUTPUT_HOT_DAYS)
+    archived = 0
+
+    while True:
+        rows = (
+            await db.execute(
+                select(AgentJob.id, AgentJob.created_at, AgentJob.agent_outputs)
+                .where(AgentJob.created_at < cutoff, AgentJob.agent_outputs.isnot(None))
+                .order_by(AgentJob.created_at, AgentJob.id)
+                .limit(ARCHIVE_BATCH_SIZE)
+            )
+        ).all()
+        if not rows:
+            return archived
+
+        month = _month_start(rows[0].created_at.date())
+        rows = [row for row in rows if _month_start(row.created_at.date()) == month]
+        partition = partition_name(month)
+        key = archive_object_key(partition, rows[0].id)
+        lines = b"".join(
+            orjson.dumps({"id": row.id, "agent_outputs": row.agent_outputs}) + b"\n"
+            for row in rows
+        )
+        await put_object(
+            key,
+            await asyncio.to_thread(gzip.compress, lines),
+            content_type="application/x-ndjson",
+            content_encoding="gzip",
+        )
+
+        table = AgentJob.__table__
+        try:
+            await db.execute(
+                update(table)
+                .where(
+                    table.c.id == bindparam("b_id"),
+                    table.c.created_at == bindparam("b_created_at"),
+                )
+                .values(agent_outputs=None, outputs_archive_key=key),
+                [{"b_id": row.id, "b_created_at": row.created_at} for row in rows],
+            )
+            await db.commit()
+        except BaseException:
+            # No row points at the object yet, so nothing else would remove it
+            await db.rollback()
+            await delete_object(key)
+            raise
+        archived += len(rows)
+        logger.info("Agent outputs archived", key=key, jobs=len(rows))
+
+
+async def load_archived_outputs(job_id: str, archive_key: str) -> Optional[Any]:
+    """Fetch the agent outputs of one job back from cold storage."""
+    data = await asyncio.to_thread(gzip.decompress, await get_object(archive_key))
+    for line in data.splitlines():
+        record = orjson.loads(line)
+        if record["id"] == job_id:
+            return record["agent_outputs"]
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Background retention task
+# ---------------------------------------------------------------------------
+
+
+async def run_retention() -> None:
+    """
+    Run one retention pass (partition upkeep, output archival, expiry).
+
+    Archival needs `AWS_S3_BUCKET` and is skipped without it; a storage outage
+    is logged and does not hold up partition expiry.
+    """
+    async with AsyncSessionLocal() as db:
+        await ensure_partitions(db)
+        if settings.AWS_S3_BUCKET:
+            try:
+                await archive_agent_outputs(db)
+            except Exception:
+                logger.exception("Agent output archival failed")
+                await db.rollback()
+        await drop_expired_partitions(db)
+
+
+async def _retention_loop() -> None:
+    while True:
+        try:
+            redis = await get_redis()
+            # Only one worker in the cluster runs a pass per interval
+            acquired = await redis.set(
+                RETENTION_LOCK_KEY,
+                "1",
+                nx=True,
+                ex=settings.JOB_RETENTION_INTERVAL_SECONDS,
+            )
+            if acquired:
+                await run_retention()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Job history retention failed", error=str(e))
+        await asyncio.sleep(settings.JOB_RETENTION_INTERVAL_SECONDS)
+
+
+async def start_retention_task() -> None:
+    """
+    Create missing partitions and start the periodic retention task.
+
+    This function should be called during application startup.
+    """
+    global _retention_task
+
+    try:
+        async with AsyncSessionLocal() as db:
+            await ensure_partitions(db)
+    except Exception as e:
+        # Another worker may be creating the same partitions
+        logger.warning("Could not ensure job history partitions", error=str(e))
+
+    if _retention_task is None:
+        _retention_task = asyncio.create_task(_retention_loop())
+
+
+async def stop_retention_task() -> None:
+    """Stop the periodic retention task."""
+    global _retention_task
+
+    if _retention_task is not None:
+        _retention_task.cancel()
+        _retention_task = None
@@ -0,0 +1,283 @@
+"""
+Job status service for the AI Multi-Agent Content Creation & Marketing System.
+
+Progress of a generation job is published once to Redis: the latest snapshot
+is stored under a key (so late readers can catch up) and announced on a
+per-job pub/sub channel. Each worker process keeps a single pub/sub
+connection and an in-memory map of the jobs its clients are watching, so
+long-poll and Server-Sent Events clients are fed from memory with no database
+access per event. Snapshots of finished jobs are kept until their TTL expires.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+import orjson
+import structlog
+from redis.exceptions import WatchError
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = structlog.get_logger()
+
+TERMINAL_STATUSES = frozenset({"completed", "failed", "cancelled"})
+
+# Completed snapshots kept in memory per worker
+MAX_CACHED_RESULTS = 1024
+
+
+def status_key(job_id: str) -> str:
+    return f"job:{job_id}:status"
+
+
+def sequence_key(job_id: str) -> str:
+    return f"job:{job_id}:seq"
+
+
+def channel_name(job_id: str) -> str:
+    return f"job-status:{job_id}"
+
+
+def is_terminal(snapshot: Optional[Dict[str, Any]]) -> bool:
+    return bool(snapshot) and snapshot.get("status") in TERMINAL_STATUSES
+
+
+async def publish_job_status(job_id: str, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Publish the latest state of a job.
+
+    Args:
+        job_id: Job identifier
+        snapshot: Full job state (`status`, `progress`, `agents`, `result`, ...)
+
+    Returns:
+        The stored snapshot, including its sequence number
+    """
+    redis = await get_redis()
+    ttl = (
+        settings.JOB_RESULT_TTL_SECONDS
+        if is_terminal(snapshot)
+        else settings.JOB_STATUS_TTL_SECONDS
+    )
+
+    # The sequence number and the snapshot carrying it are written in one
+    # transaction, retried if another publisher got in between, so readers
+    # never see a sequence number without its snapshot
+    async with redis.pipeline(transaction=True) as pipe:
+        while True:
+            try:
+                await pipe.watch(sequence_key(job_id))
+                seq = int(await pipe.get(sequence_key(job_id)) or 0) + 1
+                stored = {
+                    **snapshot,
+                    "job_id": job_id,
+                    "seq": seq,
+                    "updated_at": time.time(),
+                }
+                payload = orjson.dumps(stored).decode()
+
+                pipe.multi()
+                pipe.set(sequence_key(job_id), seq, ex=ttl)
+                pipe.set(status_key(job_id), payload, ex=ttl)
+                pipe.publish(channel_name(job_id), payload)
+                await pipe.execute()
+                return stored
+            except WatchError:
+                continue
+
+
+class _Subscriber:
+    """Conflating mailbox: only the newest snapshot is kept."""
+
+    def __init__(self):
+        self.latest: Optional[Dict[str, Any]] = None
+        self.event = asyncio.Event()
+
+    def push(self, snapshot: Dict[str, Any]) -> None:
+        self.latest = snapshot
+        self.event.set()
+
+    async def next(self, timeout: Optional[float]) -> Optional[Dict[str, Any]]:
+        try:
+            await asyncio.wait_for(self.event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self.event.clear()
+        return self.latest
+
+
+class JobStatusHub:
+    """Per-worker fan-out of job status updates from Redis pub/sub."""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[_Subscriber]] = {}
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self._completed: "OrderedDict[str, Any]" = OrderedDict()
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """
+        Open the pub/sub connection.
+
+        This function should be called during application startup.
+        """
+        redis = await get_redis()
+        self._pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        # A placeholder subscription keeps the connection in listening mode
+        await self._pubsub.subscribe("job-status:__hub__")
+        self._reader = asyncio.create_task(self._read_loop())
+        logger.info("Job status hub started")
+
+    async def stop(self) -> None:
+        """Close the pub/sub connection and release any waiting clients."""
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.close()
+            except Exception as e:
+                logger.error("Failed to close job status pub/sub", error=str(e))
+            self._pubsub = None
+        for subscribers in self._subscribers.values():
+            for subscriber in subscribers:
+                subscriber.event.set()
+        logger.info("Job status hub stopped")
+
+    async def _read_loop(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+                if message is None or message.get("type") != "message":
+                    continue
+                self._dispatch(orjson.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Job status listener error", error=str(e))
+                await asyncio.sleep(1)
+
+    def _dispatch(self, snapshot: Dict[str, Any]) -> None:
+        job_id = snapshot.get("job_id")
+        current = self._snapshots.get(job_id)
+        if current is not None and current.get("seq", 0) >= snapshot.get("seq", 0):
+            return
+
+        self._remember(snapshot)
+        for subscriber in self._subscribers.get(job_id, ()):
+            subscriber.push(snapshot)
+
+    def _remember(self, snapshot: Dict[str, Any]) -> None:
+        job_id = snapshot["job_id"]
+        if is_terminal(snapshot):
+            self._snapshots.pop(job_id, None)
+            self._completed[job_id] = (
+                time.monotonic() + settings.JOB_RESULT_TTL_SECONDS,
+                snapshot,
+            )
+            self._completed.move_to_end(job_id)
+            while len(self._completed) > MAX_CACHED_RESULTS:
+                self._completed.popitem(last=False)
+        elif job_id in self._subscribers:
+            self._snapshots[job_id] = snapshot
+
+    def _cached(self, job_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._completed.get(job_id)
+        if entry is not None:
+            expires_at, snapshot = entry
+            if expires_at > time.monotonic():
+                return snapshot
+            del self._completed[job_id]
+        return self._snapshots.get(job_id)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Latest known state of a job, from memory or Redis."""
+        snapshot = self._cached(job_id)
+        if snapshot is not None:
+            return snapshot
+
+        redis = await get_redis()
+        payload = await redis.get(status_key(job_id))
+        if payload is None:
+            return None
+        snapshot = orjson.loads(payload)
+        self._remember(snapshot)
+        return snapshot
+
+    async def _subscribe(self, job_id: str) -> _Subscriber:
+        subscriber = _Subscriber()
+        subscribers = self._subscribers.setdefault(job_id, set())
+        subscribers.add(subscriber)
+        if len(subscribers) == 1 and self._pubsub is not None:
+            await self._pubsub.subscribe(channel_name(job_id))
+        return subscriber
+
+    async def _unsubscribe(self, job_id: str, subscriber: _Subscriber) -> None:
+        subscribers = self._subscribers.get(job_id)
+        if not subscribers:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self._subscribers[job_id]
+            self._snapshots.pop(job_id, None)
+            if self._pubsub is not None:
+                await self._pubsub.unsubscribe(channel_name(job_id))
+
+    async def wait(
+        self, job_id: str, since: int, timeout: float
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Long-poll: return as soon as the job moves past sequence `since`.
+
+        Returns the current snapshot immediately if it is already newer than
+        `since` or terminal, otherwise the next update, or the unchanged
+        snapshot once `timeout` seconds pass. Unknown jobs return None right
+        away instead of holding the request.
+        """
+        snapshot = await self.get(job_id)
+        if snapshot is None:
+            return None
+        if snapshot["seq"] > since or is_terminal(snapshot):
+            return snapshot
+
+        # Subscribe, then read again so an update between the two is not lost
+        subscriber = await self._subscribe(job_id)
+        try:
+            snapshot = await self.get(job_id) or snapshot
+            if snapshot["seq"] <= since and not is_terminal(snapshot):
+                snapshot = await subscriber.next(timeout) or snapshot
+            return snapshot
+        finally:
+            await self._unsubscribe(job_id, subscriber)
+
+    async def stream(self, job_id: str) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield every new snapshot of a job until it reaches a terminal status.
+
+        Yields None when no update arrived within the heartbeat interval so
+        callers can keep the connection alive.
+        """
+        subscriber = await self._subscribe(job_id)
+        try:
+            snapshot = await self.get(job_id)
+            last_seq = 0
+            if snapshot is not None:
+                last_seq = snapshot["seq"]
+                yield snapshot
+            while not is_terminal(snapshot) and self._pubsub is not None:
+                update = await subscriber.next(settings.JOB_STATUS_HEARTBEAT_SECONDS)
+                if update is None or update["seq"] <= last_seq:
+                    yield None
+                    continue
+                snapshot, last_seq = update, update["seq"]
+                yield snapshot
+        finally:
+            await self._unsubscribe(job_id, subscriber)
+
+
+# Global job status hub for this worker
+job_status_hub = JobStatusHub()
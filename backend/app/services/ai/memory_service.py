@@ -0,0 +1,245 @@
+"""
+Conversation memory service for the AI Multi-Agent Content Creation & Marketing System.
+
+Each agent session keeps its last `MEMORY_WINDOW_TURNS` turns verbatim and a
+rolling summary of everything older, in one Redis hash per session:
+
+    memory:{session_id}   HASH
+        next              number of the next turn
+        start             oldest turn still kept verbatim
+        summary           packed summary text
+        t:{n}             packed turn n
+
+Turns and the summary are encoded with the cache codec (msgpack, compressed
+above `MEMORY_COMPRESS_MIN_BYTES`). Older turns are folded into the summary in
+batches once the window overflows. Readers fetch only the fields they ask
+for, nothing is cached in the worker, and every write refreshes the session
+TTL, so long-running campaigns cost Redis memory proportional to the window
+and none in worker RSS.
+"""
+
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+import structlog
+
+from app.core import codec
+from app.core.config import settings
+from app.core.redis import get_binary_redis
+
+logger = structlog.get_logger()
+
+Turn = Dict[str, Any]
+Summarizer = Callable[[Optional[str], List[Turn]], Awaitable[str]]
+
+# Characters of each turn kept by the default summarizer
+SUMMARY_TURN_CHARS = 200
+
+# Releases the compaction lock only if this compaction still holds it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def memory_key(session_id: str) -> str:
+    return f"memory:{session_id}"
+
+
+def _turn_field(number: int) -> str:
+    return f"t:{number}"
+
+
+def pack(value: Any) -> bytes:
+    return codec.encode(value, min_compress_bytes=settings.MEMORY_COMPRESS_MIN_BYTES)
+
+
+def unpack(data: bytes) -> Any:
+    return codec.decode(data)
+
+
+async def truncating_summarizer(summary: Optional[str], turns: List[Turn]) -> str:
+    """
+    Default summarizer: keep the opening of each folded turn.
+
+    Agents with an LLM at hand should pass a summarizer that asks it to
+    condense `summary` and `turns` instead.
+    """
+    lines = [summary] if summary else []
+    for turn in turns:
+        speaker = turn.get("name") or turn["role"]
+        lines.append(f"{speaker}: {turn['content'][:SUMMARY_TURN_CHARS]}")
+    return "\n".join(lines)[-settings.MEMORY_SUMMARY_MAX_CHARS :]
+
+
+class ConversationMemory:
+    """Windowed, summarized conversation history stored in Redis."""
+
+    def __init__(
+        self,
+        window_turns: Optional[int] = None,
+        summarizer: Optional[Summarizer] = None,
+    ):
+        self.window_turns = window_turns or settings.MEMORY_WINDOW_TURNS
+        self.summarizer = summarizer or truncating_summarizer
+
+    async def append(
+        self, session_id: str, role: str, content: str, name: Optional[str] = None
+    ) -> int:
+        """
+        Add a turn to a session.
+
+        Returns:
+            The turn number
+        """
+        redis = await get_binary_redis()
+        key = memory_key(session_id)
+        turn: Turn = {"role": role, "content": content, "ts": time.time()}
+        if name:
+            turn["name"] = name
+
+        number = await redis.hincrby(key, "next", 1) - 1
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, _turn_field(number), pack(turn))
+            pipe.expire(key, settings.MEMORY_TTL_SECONDS)
+            pipe.hget(key, "start")
+            _, _, start = await pipe.execute()
+
+        # Fold in batches so the summarizer is not called on every turn
+        if (
+            number + 1 - int(start or 0)
+            >= self.window_turns + settings.MEMORY_COMPACT_BATCH
+        ):
+            await self._compact(session_id)
+        return number
+
+    async def extend(self, session_id: str, turns: Sequence[Turn]) -> None:
+        """Add several `{"role", "content", "name"?}` turns in order."""
+        for turn in turns:
+            await self.append(
+                session_id, turn["role"], turn["content"], turn.get("name")
+            )
+
+    async def _compact(self, session_id: str) -> None:
+        redis = await get_binary_redis()
+        key = memory_key(session_id)
+        lock_key = f"{key}:compact"
+        # Concurrent appends leave compaction to whoever holds the lock
+        token = uuid.uuid4().hex
+        if not await redis.set(lock_key, token, nx=True, ex=30):
+            return
+
+        try:
+            next_number, start, summary = await redis.hmget(
+                key, "next", "start", "summary"
+            )
+            start = int(start or 0)
+            end = int(next_number or 0) - self.window_turns
+            if end <= start:
+                return
+
+            fields = [_turn_field(number) for number in range(start, end)]
+            turns = [
+                unpack(raw) for raw in await redis.hmget(key, fields) if raw is not None
+            ]
+            new_summary = await self.summarizer(
+                unpack(summary) if summary else None, turns
+            )
+
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.hset(key, mapping={"summary": pack(new_summary), "start": end})
+                pipe.hdel(key, *fields)
+                pipe.expire(key, settings.MEMORY_TTL_SECONDS)
+                await pipe.execute()
+            logger.debug(
+                "Conversation memory compacted",
+                session_id=session_id,
+                folded=len(fields),
+            )
+        finally:
+            # A slow summarizer may outlive the lock; keep the next holder's
+            await redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+    async def load(
+        self,
+        session_id: str,
+        last_n: Optional[int] = None,
+        include_summary: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Load the part of a session an agent needs.
+
+        Args:
+            session_id: Session identifier
+            last_n: Most recent turns to return (defaults to the whole window)
+            include_summary: Also return the summary of older turns
+
+        Returns:
+            `{"summary": str | None, "turns": [turn, ...]}`, oldest turn first
+        """
+        redis = await get_binary_redis()
+        key = memory_key(session_id)
+        next_number, start = await redis.hmget(key, "next", "start")
+        if next_number is None:
+            return {"summary": None, "turns": []}
+
+        next_number, start = int(next_number), int(start or 0)
+        first = max(start, next_number - (last_n or self.window_turns))
+        fields = [_turn_field(number) for number in range(first, next_number)]
+        if include_summary:
+            fields.append("summary")
+
+        values = await redis.hmget(key, fields) if fields else []
+        summary = None
+        if include_summary:
+            raw_summary = values.pop()
+            summary = unpack(raw_summary) if raw_summary else None
+        # Turns folded by a concurrent compaction are already in the summary
+        return {
+            "summary": summary,
+            "turns": [unpack(raw) for raw in values if raw is not None],
+        }
+
+    async def clear(self, session_id: str) -> None:
+        """Forget a session."""
+        redis = await get_binary_redis()
+        await redis.delete(memory_key(session_id))
+
+    async def sizes(self, session_ids: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Report how much Redis memory each session uses.
+
+        Returns:
+            One `{"session_id", "bytes", "summary_bytes", "turns", "ttl"}` per
+            session (`bytes` is None for unknown sessions)
+        """
+        redis = await get_binary_redis()
+        async with redis.pipeline(transaction=False) as pipe:
+            for session_id in session_ids:
+                key = memory_key(session_id)
+                pipe.memory_usage(key, samples=0)
+                pipe.hstrlen(key, "summary")
+                pipe.hmget(key, "next", "start")
+                pipe.ttl(key)
+            results = await pipe.execute()
+
+        report = []
+        for i, session_id in enumerate(session_ids):
+            usage, summary_bytes, (next_number, start), ttl = results[i * 4 : i * 4 + 4]
+            report.append(
+                {
+                    "session_id": session_id,
+                    "bytes": usage,
+                    "summary_bytes": summary_bytes,
+                    "turns": int(next_number or 0) - int(start or 0),
+                    "ttl": ttl if ttl >= 0 else None,
+                }
+            )
+        return report
+
+
+# Global conversation memory
+conversation_memory = ConversationMemory()
@@ -0,0 +1,3 @@
+"""
+Content services: CRUD, versioning, templates and content scoring.
+"""
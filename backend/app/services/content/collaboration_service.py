@@ -0,0 +1,791 @@
+"""
+Real-time collaboration engine for the AI Multi-Agent Content Creation & Marketing System.
+
+Each document being edited gets an in-memory session that applies text
+operations with operational transformation (OT) against a bounded history.
+Nothing is sent per keystroke: once per tick the session broadcasts a single
+frame carrying every operation applied since the last tick plus the latest
+cursor position of each editor. Document state is snapshotted to Postgres
+once editing goes idle, not on every change, and only if nobody else changed
+the body in the meantime.
+
+A document is held by one worker process, which claims it in Redis
+(`collab:{content_id}:owner`) when its first editor joins. Editors connected
+to other workers are served by a relay there: it forwards their messages to
+the owner on `collab:{content_id}:in` and delivers the owner's frames from
+`collab:{content_id}:out`. If the owner goes away without handing over, relays
+ask their editors to reconnect and the first one back claims the document.
+"""
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+from weakref import WeakValueDictionary
+
+import orjson
+import structlog
+from fastapi import WebSocket
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis import get_redis
+from app.core.shutdown import close_for_restart
+from app.models.content import Content
+from app.services.content import content_service
+
+logger = structlog.get_logger()
+
+Reply = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Take ownership of KEYS[1] for ARGV[2] ms if it is free or already ours
+CLAIM_OWNER_SCRIPT = """
+local owner = redis.call('GET', KEYS[1])
+if owner and owner ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+return 1
+"""
+
+# Extend ownership of KEYS[1] for ARGV[2] ms if ARGV[1] still owns it
+RENEW_OWNER_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Give up ownership of KEYS[1] if ARGV[1] owns it
+RELEASE_OWNER_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def owner_key(content_id: str) -> str:
+    return f"collab:{content_id}:owner"
+
+
+def inbox_channel(content_id: str) -> str:
+    return f"collab:{content_id}:in"
+
+
+def outbox_channel(content_id: str) -> str:
+    return f"collab:{content_id}:out"
+
+
+def _dumps(frame: Dict[str, Any]) -> str:
+    return orjson.dumps(frame).decode()
+
+
+class OperationError(Exception):
+    """Raised when an operation cannot be applied."""
+
+
+class StaleRevisionError(OperationError):
+    """Raised when an operation is based on a revision no longer in history."""
+
+
+@dataclass
+class Operation:
+    """A single insert or delete on the document text."""
+
+    kind: str  # "insert" or "delete"
+    position: int
+    text: str = ""
+    length: int = 0
+    user_id: str = ""
+    op_id: Optional[str] = None
+
+    @classmethod
+    def from_message(cls, message: Dict[str, Any], user_id: str) -> "Operation":
+        kind = message.get("action")
+        position = message.get("position")
+        if (
+            kind not in ("insert", "delete")
+            or not isinstance(position, int)
+            or position < 0
+        ):
+            raise OperationError("Invalid operation")
+        if kind == "insert":
+            text = message.get("text")
+            if not isinstance(text, str) or not text:
+                raise OperationError("Insert requires text")
+            return cls(
+                kind, position, text=text, user_id=user_id, op_id=message.get("op_id")
+            )
+        length = message.get("length")
+        if not isinstance(length, int) or length <= 0:
+            raise OperationError("Delete requires a positive length")
+        return cls(
+            kind, position, length=length, user_id=user_id, op_id=message.get("op_id")
+        )
+
+    def transform(self, other: "Operation") -> None:
+        """Shift this operation past a concurrent operation applied before it."""
+        if other.kind == "insert":
+            size = len(other.text)
+            if other.position < self.position or (
+                other.position == self.position
+                and (self.kind == "delete" or other.user_id < self.user_id)
+            ):
+                self.position += size
+            elif (
+                self.kind == "delete"
+                and self.position < other.position < self.position + self.length
+            ):
+                # The insert landed inside the deleted range: delete around it
+                self.length += size
+        else:
+            start, end = other.position, other.position + other.length
+            if self.kind == "insert":
+                if self.position >= end:
+                    self.position -= other.length
+                elif self.position > start:
+                    # Typed inside a concurrently deleted range: the delete wins
+                    self.position = start
+                    self.text = ""
+            else:
+                self_end = self.position + self.length
+                overlap = max(0, min(self_end, end) - max(self.position, start))
+                if self.position >= end:
+                    self.position -= other.length
+                elif self.position > start:
+                    self.position = start
+                self.length -= overlap
+
+    def to_frame(self) -> Dict[str, Any]:
+        frame = {
+            "action": self.kind,
+            "position": self.position,
+            "user_id": self.user_id,
+        }
+        if self.kind == "insert":
+            frame["text"] = self.text
+        else:
+            frame["length"] = self.length
+        if self.op_id is not None:
+            frame["op_id"] = self.op_id
+        return frame
+
+
+@dataclass
+class DocumentSession:
+    """In-memory editing state of a document owned by this worker."""
+
+    content_id: str
+    text: str
+    version: int = 1  # content version the text was loaded or last saved at
+    base_text: str = ""  # body as of `version`
+    revision: int = 0
+    history: List[Operation] = field(default_factory=list)
+    connections: Dict[WebSocket, str] = field(default_factory=dict)
+    remote: Dict[str, str] = field(default_factory=dict)  # relayed conn -> user
+    presence: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    pending_ops: List[Operation] = field(default_factory=list)
+    presence_dirty: bool = False
+    last_edit_at: float = 0.0
+    last_snapshot_at: float = field(default_factory=time.monotonic)
+    last_renewed_at: float = field(default_factory=time.monotonic)
+    snapshot_revision: int = 0
+    tick_task: Optional[asyncio.Task] = None
+
+    def apply(self, op: Operation, base_revision: int) -> Operation:
+        """
+        Transform an operation from `base_revision` to the head and apply it.
+
+        Raises:
+            StaleRevisionError: The base revision fell out of the history window
+        """
+        behind = self.revision - base_revision
+        if behind < 0 or behind > len(self.history):
+            raise StaleRevisionError(f"Revision {base_revision} is not available")
+
+        for concurrent in self.history[len(self.history) - behind :]:
+            op.transform(concurrent)
+
+        op.position = min(op.position, len(self.text))
+        if op.kind == "delete":
+            op.length = max(0, min(op.length, len(self.text) - op.position))
+
+        if not op.text and not op.length:
+            # Cancelled out by a concurrent edit; still echoed so the sender sees its ack
+            self.pending_ops.append(op)
+            return op
+
+        if op.kind == "insert":
+            self.text = self.text[: op.position] + op.text + self.text[op.position :]
+        else:
+            self.text = self.text[: op.position] + self.text[op.position + op.length :]
+
+        self.revision += 1
+        self.history.append(op)
+        if len(self.history) > settings.COLLAB_HISTORY_LIMIT:
+            del self.history[: len(self.history) - settings.COLLAB_HISTORY_LIMIT]
+        self.pending_ops.append(op)
+        self.last_edit_at = time.monotonic()
+        return op
+
+    def reset(self, text: str, version: int) -> None:
+        """Replace the text with a version saved elsewhere; editors must resync."""
+        self.text = self.base_text = text
+        self.version = version
+        self.revision += 1
+        self.snapshot_revision = self.revision
+        self.history.clear()
+        self.pending_ops.clear()
+
+    def update_presence(self, user_id: str, message: Dict[str, Any]) -> None:
+        """Record the latest cursor state of an editor (coalesced until next tick)."""
+        self.presence[user_id] = {
+            "user_id": user_id,
+            "action": message.get("action", "typing"),
+            "position": message.get("position"),
+        }
+        self.presence_dirty = True
+
+    def drop_presence(self, user_id: Optional[str]) -> None:
+        """Forget an editor's cursor once none of their connections is left."""
+        if user_id is None:
+            return
+        if user_id in self.connections.values() or user_id in self.remote.values():
+            return
+        self.presence.pop(user_id, None)
+        self.presence_dirty = True
+
+    @property
+    def editors(self) -> int:
+        return len(self.connections) + len(self.remote)
+
+    def state_frame(self) -> Dict[str, Any]:
+        return {
+            "type": "collaboration_state",
+            "content_id": self.content_id,
+            "revision": self.revision,
+            "content": self.text,
+            "presence": list(self.presence.values()),
+        }
+
+
+@dataclass
+class RelaySession:
+    """Editors connected to this worker of a document owned by another worker."""
+
+    content_id: str
+    connections: Dict[WebSocket, str] = field(default_factory=dict)
+    conn_ids: Dict[WebSocket, str] = field(default_factory=dict)
+    watch_task: Optional[asyncio.Task] = None
+
+    def socket_for(self, conn_id: str) -> Optional[WebSocket]:
+        for socket, candidate in self.conn_ids.items():
+            if candidate == conn_id:
+                return socket
+        return None
+
+
+Session = Union[DocumentSession, RelaySession]
+
+
+class CollaborationManager:
+    """Documents owned by, and relays open in, this worker."""
+
+    def __init__(self):
+        self.worker_id = uuid.uuid4().hex
+        self.sessions: Dict[str, DocumentSession] = {}
+        self.relays: Dict[str, RelaySession] = {}
+        # Per-document locks: joins, hand-overs and closes of one document are
+        # serialized without holding up other documents
+        self._locks: "WeakValueDictionary[str, asyncio.Lock]" = WeakValueDictionary()
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+
+    def _lock(self, content_id: str) -> asyncio.Lock:
+        lock = self._locks.get(content_id)
+        if lock is None:
+            lock = self._locks[content_id] = asyncio.Lock()
+        return lock
+
+    async def start(self) -> None:
+        """
+        Open the pub/sub connection used to reach other workers.
+
+        This function should be called during application startup.
+        """
+        redis = await get_redis()
+        self._pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        # A placeholder subscription keeps the connection in listening mode
+        await self._pubsub.subscribe("collab:__hub__")
+        self._reader = asyncio.create_task(self._read_loop())
+
+    async def _publish(self, channel: str, message: Dict[str, Any]) -> None:
+        redis = await get_redis()
+        await redis.publish(channel, _dumps(message))
+
+    # -- Joining and leaving -------------------------------------------------
+
+    async def join(
+        self, content_id: str, websocket: WebSocket, user_id: str
+    ) -> Session:
+        """
+        Attach an editor to a document.
+
+        The first editor in the cluster loads the document and makes this
+        worker its owner; later editors on other workers get a relay.
+        """
+        async with self._lock(content_id):
+            session = self.sessions.get(content_id)
+            relay = self.relays.get(content_id)
+            if session is None and relay is None:
+                session = await self._open(content_id)
+                if session is None:
+                    relay = await self._open_relay(content_id)
+
+            if session is not None:
+                session.connections[websocket] = user_id
+                await websocket.send_text(_dumps(session.state_frame()))
+                return session
+
+            conn_id = uuid.uuid4().hex
+            relay.connections[websocket] = user_id
+            relay.conn_ids[websocket] = conn_id
+        # The owner answers with the state frame
+        await self._publish(
+            inbox_channel(content_id),
+            {"kind": "join", "conn": conn_id, "user_id": user_id},
+        )
+        return relay
+
+    async def _open(self, content_id: str) -> Optional[DocumentSession]:
+        """Claim and load a document, or return None if another worker owns it."""
+        redis = await get_redis()
+        ttl_ms = settings.COLLAB_OWNER_TTL_SECONDS * 1000
+        key = owner_key(content_id)
+        if not await redis.eval(CLAIM_OWNER_SCRIPT, 1, key, self.worker_id, ttl_ms):
+            return None
+
+        try:
+            async with AsyncSessionLocal() as db:
+                content = await db.get(Content, content_id)
+            if content is None:
+                raise content_service.ContentNotFoundError(
+                    f"Content {content_id} not found"
+                )
+            if self._pubsub is not None:
+                await self._pubsub.subscribe(inbox_channel(content_id))
+        except BaseException:
+            await redis.eval(RELEASE_OWNER_SCRIPT, 1, key, self.worker_id)
+            raise
+
+        text = content.body or ""
+        session = DocumentSession(
+            content_id=content_id,
+            text=text,
+            base_text=text,
+            version=content.version,
+        )
+        session.tick_task = asyncio.create_task(self._tick_loop(session))
+        self.sessions[content_id] = session
+        logger.info("Collaboration session opened", content_id=content_id)
+        return session
+
+    async def _open_relay(self, content_id: str) -> RelaySession:
+        if self._pubsub is None:
+            raise RuntimeError("Collaboration manager not started")
+        relay = RelaySession(content_id=content_id)
+        await self._pubsub.subscribe(outbox_channel(content_id))
+        relay.watch_task = asyncio.create_task(self._watch_owner(relay))
+        self.relays[content_id] = relay
+        return relay
+
+    async def leave(self, session: Session, websocket: WebSocket) -> None:
+        """Detach an editor; the last one out snapshots and closes the session."""
+        if isinstance(session, RelaySession):
+            await self._leave_relay(session, websocket)
+            return
+
+        session.drop_presence(session.connections.pop(websocket, None))
+        if not session.editors:
+            await self.close_session(session)
+
+    async def _leave_relay(self, relay: RelaySession, websocket: WebSocket) -> None:
+        relay.connections.pop(websocket, None)
+        conn_id = relay.conn_ids.pop(websocket, None)
+        if conn_id is not None:
+            await self._publish(
+                inbox_channel(relay.content_id), {"kind": "leave", "conn": conn_id}
+            )
+        if not relay.connections:
+            await self._close_relay(relay)
+
+    async def close_session(
+        self, session: DocumentSession, reconnect: bool = False
+    ) -> None:
+        """
+        Snapshot and close an owned document.
+
+        Editors who joined while the close was pending keep the session open,
+        unless `reconnect` asks every editor to come back later.
+        """
+        content_id = session.content_id
+        async with self._lock(content_id):
+            if self.sessions.get(content_id) is not session:
+                return
+            if session.editors and not reconnect:
+                return
+
+            if session.tick_task is not None:
+                session.tick_task.cancel()
+                # Let a flush or snapshot the tick was in finish unwinding first
+                await asyncio.gather(session.tick_task, return_exceptions=True)
+            await self._flush(session)
+            await self._snapshot(session)
+            # Removed only now, so a join waiting on the lock loads the snapshot
+            del self.sessions[content_id]
+
+            try:
+                if self._pubsub is not None:
+                    await self._pubsub.unsubscribe(inbox_channel(content_id))
+                redis = await get_redis()
+                await redis.eval(
+                    RELEASE_OWNER_SCRIPT, 1, owner_key(content_id), self.worker_id
+                )
+                if session.remote:
+                    await self._publish(outbox_channel(content_id), {"kind": "closed"})
+            except Exception as e:
+                logger.error(
+                    "Failed to hand over collaboration session",
+                    content_id=content_id,
+                    error=str(e),
+                )
+
+        if reconnect:
+            await asyncio.gather(
+                *(close_for_restart(socket) for socket in list(session.connections))
+            )
+        logger.info("Collaboration session closed", content_id=content_id)
+
+    async def _close_relay(self, relay: RelaySession, reconnect: bool = False) -> None:
+        async with self._lock(relay.content_id):
+            if self.relays.get(relay.content_id) is not relay:
+                return
+            if relay.connections and not reconnect:
+                return
+            del self.relays[relay.content_id]
+            if relay.watch_task is not None:
+                relay.watch_task.cancel()
+            if self._pubsub is not None:
+                await self._pubsub.unsubscribe(outbox_channel(relay.content_id))
+
+        if reconnect:
+            await asyncio.gather(
+                *(close_for_restart(socket) for socket in list(relay.connections))
+            )
+
+    # -- Messages --------------------------------------------------------------
+
+    async def handle_message(
+        self, session: Session, websocket: WebSocket, message: Dict[str, Any]
+    ) -> None:
+        """Apply an incoming `collaboration_update` message."""
+        user_id = session.connections.get(websocket)
+        if user_id is None:
+            # Dropped as too slow by a broadcast; make the client reconnect
+            await close_for_restart(websocket)
+            return
+
+        if isinstance(session, RelaySession):
+            await self._publish(
+                inbox_channel(session.content_id),
+                {
+                    "kind": "update",
+                    "conn": session.conn_ids[websocket],
+                    "user_id": user_id,
+                    "message": message,
+                },
+            )
+            return
+
+        async def reply(frame: Dict[str, Any]) -> None:
+            await websocket.send_text(_dumps(frame))
+
+        await self._apply_message(session, user_id, message, reply)
+
+    async def _apply_message(
+        self,
+        session: DocumentSession,
+        user_id: str,
+        message: Dict[str, Any],
+        reply: Reply,
+    ) -> None:
+        action = message.get("action")
+        if action not in ("insert", "delete"):
+            session.update_presence(user_id, message)
+            return
+
+        revision = message.get("revision")
+        if not isinstance(revision, int) or isinstance(revision, bool):
+            # Without its base revision an operation cannot be transformed
+            await reply({"type": "error", "message": "Operations require a revision"})
+            return
+        try:
+            session.apply(Operation.from_message(message, user_id), revision)
+        except StaleRevisionError:
+            await reply(session.state_frame())
+        except OperationError as e:
+            await reply({"type": "error", "message": str(e)})
+
+    async def _read_loop(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+                if message is None or message.get("type") != "message":
+                    continue
+                channel = message["channel"]
+                content_id, _, direction = channel[len("collab:") :].rpartition(":")
+                payload = orjson.loads(message["data"])
+                if direction == "in" and content_id in self.sessions:
+                    await self._handle_relayed(self.sessions[content_id], payload)
+                elif direction == "out" and content_id in self.relays:
+                    await self._deliver(self.relays[content_id], payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Collaboration listener error", error=str(e))
+                await asyncio.sleep(1)
+
+    async def _handle_relayed(
+        self, session: DocumentSession, payload: Dict[str, Any]
+    ) -> None:
+        """Owner side: a message from an editor on another worker."""
+        kind, conn_id = payload.get("kind"), payload.get("conn")
+
+        async def reply(frame: Dict[str, Any]) -> None:
+            await self._publish(
+                outbox_channel(session.content_id), {"conn": conn_id, "frame": frame}
+            )
+
+        if kind == "join":
+            session.remote[conn_id] = payload["user_id"]
+            await reply(session.state_frame())
+        elif kind == "leave":
+            session.drop_presence(session.remote.pop(conn_id, None))
+            if not session.editors:
+                asyncio.create_task(self.close_session(session))
+        elif kind == "update" and conn_id in session.remote:
+            await self._apply_message(
+                session, session.remote[conn_id], payload["message"], reply
+            )
+
+    async def _deliver(self, relay: RelaySession, payload: Dict[str, Any]) -> None:
+        """Relay side: a frame from the owner."""
+        if payload.get("kind") == "closed":
+            # The owner went away; editors rejoin and one of them takes over
+            await self._close_relay(relay, reconnect=True)
+            return
+
+        conn_id = payload.get("conn")
+        if conn_id is None:
+            targets = relay.connections
+        else:
+            socket = relay.socket_for(conn_id)
+            targets = {socket: relay.connections[socket]} if socket is not None else {}
+        for socket in await self._broadcast(targets, _dumps(payload["frame"])):
+            await self._leave_relay(relay, socket)
+
+    # -- Ticks -----------------------------------------------------------------
+
+    async def _tick_loop(self, session: DocumentSession) -> None:
+        interval = settings.COLLAB_TICK_MS / 1000
+        renew_every = settings.COLLAB_OWNER_TTL_SECONDS / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._flush(session)
+
+                now = time.monotonic()
+                if now - session.last_renewed_at >= renew_every:
+                    if not await self._renew(session):
+                        logger.warning(
+                            "Lost collaboration session ownership",
+                            content_id=session.content_id,
+                        )
+                        asyncio.create_task(self.close_session(session, reconnect=True))
+                        return
+                    session.last_renewed_at = now
+
+                if session.revision != session.snapshot_revision and (
+                    now - session.last_edit_at >= settings.COLLAB_SNAPSHOT_IDLE_SECONDS
+                    or now - session.last_snapshot_at
+                    >= settings.COLLAB_SNAPSHOT_MAX_INTERVAL_SECONDS
+                ):
+                    await self._snapshot(session)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(
+                    "Collaboration tick failed",
+                    content_id=session.content_id,
+                    error=str(e),
+                )
+
+    async def _renew(self, session: DocumentSession) -> bool:
+        redis = await get_redis()
+        renewed = await redis.eval(
+            RENEW_OWNER_SCRIPT,
+            1,
+            owner_key(session.content_id),
+            self.worker_id,
+            settings.COLLAB_OWNER_TTL_SECONDS * 1000,
+        )
+        return bool(renewed)
+
+    async def _watch_owner(self, relay: RelaySession) -> None:
+        """Relay side: notice an owner that died without handing over."""
+        while True:
+            await asyncio.sleep(settings.COLLAB_OWNER_TTL_SECONDS / 2)
+            try:
+                redis = await get_redis()
+                if not await redis.exists(owner_key(relay.content_id)):
+                    asyncio.create_task(self._close_relay(relay, reconnect=True))
+                    return
+            except Exception as e:
+                logger.error(
+                    "Collaboration owner check failed",
+                    content_id=relay.content_id,
+                    error=str(e),
+                )
+
+    async def _broadcast(
+        self, connections: Dict[WebSocket, str], payload: str
+    ) -> List[WebSocket]:
+        """Send a frame to sockets; slow or dead ones are closed and returned."""
+        sockets = list(connections)
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(
+                    socket.send_text(payload), settings.COLLAB_SEND_TIMEOUT_SECONDS
+                )
+                for socket in sockets
+            ),
+            return_exceptions=True,
+        )
+        dropped = [
+            socket
+            for socket, result in zip(sockets, results)
+            if isinstance(result, Exception)
+        ]
+        for socket in dropped:
+            # Slow or dead client: drop it rather than stall the document
+            asyncio.create_task(socket.close())
+        return dropped
+
+    async def _flush(self, session: DocumentSession) -> None:
+        """Broadcast everything accumulated since the last tick as one frame."""
+        if not session.pending_ops and not session.presence_dirty:
+            return
+
+        frame = {
+            "type": "collaboration_batch",
+            "content_id": session.content_id,
+            "revision": session.revision,
+            "ops": [op.to_frame() for op in session.pending_ops],
+        }
+        if session.presence_dirty:
+            frame["presence"] = list(session.presence.values())
+        session.pending_ops = []
+        session.presence_dirty = False
+        await self._send_all(session, frame)
+
+    async def _send_all(self, session: DocumentSession, frame: Dict[str, Any]) -> None:
+        if session.remote:
+            await self._publish(outbox_channel(session.content_id), {"frame": frame})
+        for socket in await self._broadcast(session.connections, _dumps(frame)):
+            session.drop_presence(session.connections.pop(socket, None))
+
+    async def _snapshot(self, session: DocumentSession) -> None:
+        """Persist the document text if it changed since the last snapshot."""
+        revision, text = session.revision, session.text
+        if revision == session.snapshot_revision:
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                content = await content_service.save_content_snapshot(
+                    db, session.content_id, text, session.version, session.base_text
+                )
+        except content_service.ContentConflictError:
+            await self._resync(session)
+            return
+        except Exception as e:
+            logger.error(
+                "Collaboration snapshot failed",
+                content_id=session.content_id,
+                error=str(e),
+            )
+            return
+
+        session.version, session.base_text = content.version, text
+        session.snapshot_revision = revision
+        session.last_snapshot_at = time.monotonic()
+        logger.info(
+            "Collaboration snapshot saved",
+            content_id=session.content_id,
+            revision=revision,
+        )
+
+    async def _resync(self, session: DocumentSession) -> None:
+        """The body was edited outside the session: adopt it and resync editors."""
+        async with AsyncSessionLocal() as db:
+            content = await db.get(Content, session.content_id)
+        if content is None:
+            return
+        logger.warning(
+            "Collaboration edits discarded, content changed concurrently",
+            content_id=session.content_id,
+            revision=session.revision,
+        )
+        session.reset(content.body or "", content.version)
+        await self._send_all(session, session.state_frame())
+
+    # -- Shutdown --------------------------------------------------------------
+
+    async def drain(self) -> None:
+        """
+        Snapshot every session, then ask its editors to reconnect.
+
+        Each editor gets its own jittered delay so they reconnect to other
+        workers gradually instead of all at once.
+        """
+        await asyncio.gather(
+            *(
+                self.close_session(session, reconnect=True)
+                for session in list(self.sessions.values())
+            ),
+            *(
+                self._close_relay(relay, reconnect=True)
+                for relay in list(self.relays.values())
+            ),
+        )
+
+    async def shutdown(self) -> None:
+        """Snapshot and close every open session and the pub/sub connection."""
+        for session in list(self.sessions.values()):
+            await self.close_session(session, reconnect=True)
+        for relay in list(self.relays.values()):
+            await self._close_relay(relay, reconnect=True)
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.close()
+            except Exception as e:
+                logger.error("Failed to close collaboration pub/sub", error=str(e))
+            self._pubsub = None
+
+
+# Global collaboration manager for this worker
+collaboration_manager = CollaborationManager()
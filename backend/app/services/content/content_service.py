@@ -0,0 +1,446 @@
+"""
+Content service for the AI Multi-Agent Content Creation & Marketing System.
+
+This module implements content reads and state changes. Reads of a single
+content item are served from a Redis copy of the serialized response together
+with a strong ETag derived from the content version, so conditional requests
+can be answered without touching Postgres. Every write path invalidates that
+copy after committing.
+
+Bulk operations validate every item up front and write all of them in one
+transaction with a single multi-row statement.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import orjson
+import structlog
+from fastapi import status
+from sqlalchemy import bindparam, case, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import AsyncSessionLocal, ReplicaSession
+from app.core.redis import (
+    cache_get_generation,
+    cache_get_object,
+    cache_get_objects,
+    cache_invalidate,
+    cache_set_objects_if_generation,
+)
+from app.models.content import Content, generate_content_id
+from app.schemas.content import ContentCreate, ContentUpdate
+from app.services.content.scoring_service import scoring_service
+
+logger = structlog.get_logger()
+
+CONTENT_CACHE_TTL = 300
+
+# Target status -> statuses it may be reached from
+STATUS_TRANSITIONS = {
+    "draft": {"draft", "archived"},
+    "published": {"draft", "published"},
+    "archived": {"draft", "published", "archived"},
+}
+
+
+class ContentError(Exception):
+    """Base error for content operations."""
+
+    status_code = status.HTTP_400_BAD_REQUEST
+
+
+class ContentNotFoundError(ContentError):
+    """Raised when a content item does not exist."""
+
+    status_code = status.HTTP_404_NOT_FOUND
+
+
+class InvalidStatusTransitionError(ContentError):
+    """Raised when a status change is not allowed from the current status."""
+
+    status_code = status.HTTP_409_CONFLICT
+
+
+class ContentConflictError(ContentError):
+    """Raised when the body was changed by someone else since it was read."""
+
+    status_code = status.HTTP_409_CONFLICT
+
+
+def etag_cache_key(content_id: str) -> str:
+    return f"content:{content_id}:etag"
+
+
+def body_cache_key(content_id: str) -> str:
+    return f"content:{content_id}:body"
+
+
+def generation_cache_key(content_id: str) -> str:
+    return f"content:{content_id}:gen"
+
+
+def content_etag(content: Content) -> str:
+    """Strong ETag for a content item, derived from its version counter."""
+    return f'"{content.id}-v{content.version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an `If-None-Match` header value against an ETag."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def serialize_content(content: Content) -> Dict[str, Any]:
+    """Render a content item in the API response shape."""
+    return {
+        "id": content.id,
+        "title": content.title,
+        "type": content.type,
+        "status": content.status,
+        "content": content.body,
+        "brief": content.brief,
+        "target_audience": content.target_audience,
+        "tone": content.tone,
+        "style": content.style,
+        "keywords": list(content.keywords or []),
+        "word_count": content.word_count,
+        "readability_score": content.readability_score,
+        "version": content.version,
+        "created_at": content.created_at,
+        "updated_at": content.updated_at,
+        "published_at": content.published_at,
+    }
+
+
+async def get_cached_etag(content_id: str) -> Optional[str]:
+    """Current ETag of a content item as known to the cache."""
+    return await cache_get_object(etag_cache_key(content_id))
+
+
+async def get_content_response(db: AsyncSession, content_id: str) -> Tuple[bytes, str]:
+    """
+    Get the serialized `GET /content/{content_id}` body and its ETag.
+
+    Served from Redis when cached; otherwise loaded from Postgres and cached,
+    unless the item was invalidated while it was being loaded. Rows read from a
+    replica are never cached: the replica may not have replayed a write whose
+    invalidation already ran, and caching it would undo read-your-writes.
+
+    Raises:
+        ContentNotFoundError: The content item does not exist
+    """
+    etag, body = await cache_get_objects(
+        [etag_cache_key(content_id), body_cache_key(content_id)]
+    )
+    if etag and body:
+        return body, etag
+
+    # Noted before reading, so a write committed after our read (whose
+    # invalidation bumps the generation) stops us caching the old version
+    generation = await cache_get_generation(generation_cache_key(content_id))
+    content = await db.get(Content, content_id)
+    if content is None:
+        raise ContentNotFoundError(f"Content {content_id} not found")
+
+    etag = content_etag(content)
+    body = orjson.dumps(
+        {"success": True, "data": {"content": serialize_content(content)}}
+    )
+    if isinstance(db, ReplicaSession):
+        return body, etag
+    # The body is cached as the serialized bytes, compressed when large
+    await cache_set_objects_if_generation(
+        {etag_cache_key(content_id): etag, body_cache_key(content_id): body},
+        generation_cache_key(content_id),
+        generation,
+        expire=CONTENT_CACHE_TTL,
+    )
+    return body, etag
+
+
+async def invalidate_content_cache(*content_ids: str) -> None:
+    """Drop cached responses for one or more content items."""
+    keys = []
+    for content_id in content_ids:
+        keys.extend((etag_cache_key(content_id), body_cache_key(content_id)))
+    await cache_invalidate(
+        keys, [generation_cache_key(content_id) for content_id in content_ids]
+    )
+
+
+async def _load_for_update(db: AsyncSession, content_id: str) -> Content:
+    content = await db.get(Content, content_id, with_for_update=True)
+    if content is None:
+        raise ContentNotFoundError(f"Content {content_id} not found")
+    return content
+
+
+def _apply_status(content: Content, new_status: str) -> None:
+    if content.status not in STATUS_TRANSITIONS[new_status]:
+        raise InvalidStatusTransitionError(
+            f"Cannot change status from {content.status} to {new_status}"
+        )
+    if new_status == "published" and content.status != "published":
+        content.published_at = datetime.now(timezone.utc)
+    content.status = new_status
+
+
+def _content_values(data: ContentCreate) -> Dict[str, Any]:
+    return {
+        "id": generate_content_id(),
+        "title": data.title,
+        "type": data.type,
+        "status": "draft",
+        "body": data.content,
+        "brief": data.brief,
+        "target_audience": data.target_audience,
+        "tone": data.tone,
+        "style": data.style,
+        "keywords": data.keywords,
+        "word_count": data.word_count
+        or (len(data.content.split()) if data.content else None),
+        "version": 1,
+    }
+
+
+async def create_content(db: AsyncSession, data: ContentCreate) -> Content:
+    """Create a draft content item."""
+    content = Content(**_content_values(data))
+    db.add(content)
+    await db.commit()
+    logger.info("Content created", content_id=content.id)
+    return content
+
+
+async def bulk_create_content(
+    db: AsyncSession, items: Sequence[ContentCreate]
+) -> List[Dict[str, Any]]:
+    """
+    Create many draft content items in one transaction.
+
+    Rows are written with a single `INSERT ... RETURNING` executed over all
+    parameter sets, so the whole batch costs one round trip per few hundred
+    rows instead of one flush per item.
+
+    Returns:
+        One result per input item, in input order
+    """
+    values = [_content_values(item) for item in items]
+    result = await db.execute(
+        insert(Content).returning(
+            Content.id, Content.created_at, sort_by_parameter_order=True
+        ),
+        values,
+    )
+    rows = result.all()
+    await db.commit()
+
+    logger.info("Content bulk created", count=len(rows))
+    return [
+        {
+            "index": index,
+            "id": row.id,
+            "status": "created",
+            "created_at": row.created_at,
+        }
+        for index, row in enumerate(rows)
+    ]
+
+
+async def bulk_change_status(
+    db: AsyncSession, content_ids: Sequence[str], new_status: str
+) -> List[Dict[str, Any]]:
+    """
+    Move many content items to a new status with one `UPDATE ... RETURNING`.
+
+    Items that are missing, already in the target status, or not allowed to
+    make the transition are reported individually instead of failing the batch.
+    Cached responses of all changed items are dropped in one round trip.
+
+    Returns:
+        One result per requested id, in request order
+    """
+    ids = list(dict.fromkeys(content_ids))
+    allowed_from = STATUS_TRANSITIONS[new_status] - {new_status}
+    values: Dict[str, Any] = {
+        "status": new_status,
+        "version": Content.version + 1,
+        "updated_at": func.now(),
+    }
+    if new_status == "published":
+        values["published_at"] = case(
+            (Content.published_at.is_(None), func.now()), else_=Content.published_at
+        )
+
+    result = await db.execute(
+        update(Content)
+        .where(Content.id.in_(ids), Content.status.in_(allowed_from))
+        .values(**values)
+        .returning(Content.id, Content.version)
+        .execution_options(synchronize_session=False)
+    )
+    changed = {row.id: row.version for row in result}
+
+    unchanged = [content_id for content_id in ids if content_id not in changed]
+    current_status: Dict[str, str] = {}
+    if unchanged:
+        rows = await db.execute(
+            select(Content.id, Content.status).where(Content.id.in_(unchanged))
+        )
+        current_status = {row.id: row.status for row in rows}
+    await db.commit()
+    await invalidate_content_cache(*changed)
+
+    results = []
+    for content_id in ids:
+        if content_id in changed:
+            results.append(
+                {
+                    "id": content_id,
+                    "status": new_status,
+                    "version": changed[content_id],
+                    "ok": True,
+                }
+            )
+        elif content_id not in current_status:
+            results.append({"id": content_id, "ok": False, "error": "NOT_FOUND"})
+        elif current_status[content_id] == new_status:
+            results.append(
+                {"id": content_id, "status": new_status, "ok": True, "unchanged": True}
+            )
+        else:
+            results.append(
+                {
+                    "id": content_id,
+                    "status": current_status[content_id],
+                    "ok": False,
+                    "error": "INVALID_STATUS_TRANSITION",
+                }
+            )
+
+    logger.info(
+        "Content bulk status change",
+        status=new_status,
+        changed=len(changed),
+        requested=len(ids),
+    )
+    return results
+
+
+async def score_content_batch(content_ids: Sequence[str]) -> None:
+    """
+    Follow-up for bulk writes: score all items as one batch and store the results.
+
+    Runs after the response is sent; bodies are loaded with one query, scored in
+    the process pool together and written back with one executemany UPDATE.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            rows = (
+                await db.execute(
+                    select(Content.id, Content.body, Content.keywords).where(
+                        Content.id.in_(content_ids), Content.body.isnot(None)
+                    )
+                )
+            ).all()
+            if not rows:
+                return
+
+            scores = await scoring_service.score_many(
+                (row.body, row.keywords or ()) for row in rows
+            )
+            table = Content.__table__
+            # Core UPDATEs bypass the ORM version counter; bump it explicitly so
+            # the ETag changes with the served score
+            await db.execute(
+                update(table)
+                .where(table.c.id == bindparam("b_id"))
+                .values(
+                    readability_score=bindparam("b_score"),
+                    version=table.c.version + 1,
+                ),
+                [
+                    {"b_id": row.id, "b_score": score.readability_score}
+                    for row, score in zip(rows, scores)
+                ],
+            )
+            await db.commit()
+        await invalidate_content_cache(*[row.id for row in rows])
+    except Exception as e:
+        logger.error(
+            "Bulk content scoring failed", count=len(content_ids), error=str(e)
+        )
+
+
+async def update_content(
+    db: AsyncSession, content_id: str, data: ContentUpdate
+) -> Content:
+    """Apply a partial update to a content item."""
+    content = await _load_for_update(db, content_id)
+
+    if data.title is not None:
+        content.title = data.title
+    if data.content is not None:
+        content.body = data.content
+        content.word_count = len(data.content.split())
+    if data.status is not None:
+        _apply_status(content, data.status)
+
+    await db.commit()
+    await invalidate_content_cache(content_id)
+    logger.info("Content updated", content_id=content_id, version=content.version)
+    return content
+
+
+async def save_content_snapshot(
+    db: AsyncSession,
+    content_id: str,
+    body: str,
+    base_version: int,
+    base_body: str,
+) -> Content:
+    """
+    Persist the body of a collaboratively edited content item.
+
+    `base_version` and `base_body` describe the row the edits started from.
+    Changes to other fields since then are kept; a changed body is not
+    overwritten.
+
+    Raises:
+        ContentConflictError: The body was changed since `base_version`
+    """
+    content = await _load_for_update(db, content_id)
+    if content.version != base_version and (content.body or "") != base_body:
+        await db.rollback()
+        raise ContentConflictError(f"Content {content_id} was changed concurrently")
+
+    content.body = body
+    content.word_count = len(body.split())
+
+    await db.commit()
+    await invalidate_content_cache(content_id)
+    return content
+
+
+async def change_status(db: AsyncSession, content_id: str, new_status: str) -> Content:
+    """Move a content item to a new status (e.g. publish or archive)."""
+    content = await _load_for_update(db, content_id)
+    _apply_status(content, new_status)
+
+    await db.commit()
+    await invalidate_content_cache(content_id)
+    logger.info("Content status changed", content_id=content_id, status=new_status)
+    return content
+
+
+async def publish_content(db: AsyncSession, content_id: str) -> Content:
+    """Publish a content item."""
+    return await change_status(db, content_id, "published")
+
+
+async def archive_content(db: AsyncSession, content_id: str) -> Content:
+    """Archive a content item."""
+    return await change_status(db, content_id, "archived")
@@ -0,0 +1,404 @@
+"""
+Content scoring service for the AI Multi-Agent Content Creation & Marketing System.
+
+This module computes the readability score, SEO keyword density and hashtag
+candidates reported in generation job results. The analyses are CPU-bound on
+long drafts, so they run in a process pool instead of the event loop. Requests
+are micro-batched before submission and results travel back as plain tuples to
+keep inter-process pickling cheap.
+"""
+
+import asyncio
+import multiprocessing
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+# Keyword density band (percent of words) considered SEO-optimized
+SEO_MIN_DENSITY = 0.5
+SEO_MAX_DENSITY = 3.0
+SEO_MIN_WORDS = 300
+
+MAX_HASHTAGS = 8
+
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z'-]*")
+_SENTENCE_RE = re.compile(r"[.!?]+(?:\s|$)")
+_VOWEL_GROUP_RE = re.compile(r"[aeiouy]+")
+
+_STOPWORDS = frozenset(
+    """
+    a about above after again against all am an and any are as at be because been
+    before being below between both but by can could did do does doing down during
+    each few for from further had has have having he her here hers herself him
+    himself his how i if in into is it its itself just me more most my myself no
+    nor not now of off on once only or other our ours ourselves out over own same
+    she should so some such than that the their theirs them themselves then there
+    these they this those through to too under until up very was we were what when
+    where which while who whom why will with would you your yours yourself
+    yourselves also may might must shall us get got one two new like make made
+    """.split()
+)
+
+# (text, keywords) as submitted to a worker process
+ScoringItem = Tuple[str, Tuple[str, ...]]
+
+
+class ContentScore(NamedTuple):
+    """Compact scoring result for a single piece of content."""
+
+    word_count: int
+    readability_score: float
+    keyword_density: Tuple[Tuple[str, float], ...]
+    seo_optimized: bool
+    hashtags: Tuple[str, ...]
+
+    def to_result(self) -> Dict[str, Any]:
+        """Render the score in the shape used by the job result payload."""
+        return {
+            "word_count": self.word_count,
+            "readability_score": self.readability_score,
+            "keyword_density": dict(self.keyword_density),
+            "seo_optimized": self.seo_optimized,
+            "hashtags": list(self.hashtags),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Pure analysis functions (executed inside worker processes)
+# ---------------------------------------------------------------------------
+
+
+@lru_cache(maxsize=65536)
+def count_syllables(word: str) -> int:
+    """Estimate the syllable count of a lowercase English word."""
+    groups = len(_VOWEL_GROUP_RE.findall(word))
+    if word.endswith("e") and not word.endswith(("le", "ee", "ye")) and groups > 1:
+        groups -= 1
+    return max(groups, 1)
+
+
+def readability_score(words: Sequence[str], sentence_count: int) -> float:
+    """
+    Compute the Flesch reading ease score, clamped to the 0-100 range.
+
+    Args:
+        words: Lowercase word tokens
+        sentence_count: Number of sentences in the text
+
+    Returns:
+        Reading ease score rounded to one decimal
+    """
+    if not words:
+        return 0.0
+
+    syllables = sum(count_syllables(word) for word in words)
+    score = (
+        206.835
+        - 1.015 * (len(words) / max(sentence_count, 1))
+        - 84.6 * (syllables / len(words))
+    )
+    return round(min(max(score, 0.0), 100.0), 1)
+
+
+def keyword_density(
+    words: Sequence[str], keywords: Iterable[str]
+) -> Tuple[Tuple[str, float], ...]:
+    """
+    Compute the density of each keyword (single or multi-word) as a percentage.
+
+    N-gram counters are built once per distinct keyword length, so the cost is
+    linear in the text regardless of how many keywords are checked.
+    """
+    if not words:
+        return tuple((keyword, 0.0) for keyword in keywords)
+
+    counters: Dict[int, Counter] = {}
+    densities = []
+    for keyword in keywords:
+        tokens = tuple(_WORD_RE.findall(keyword.lower()))
+        if not tokens:
+            continue
+        n = len(tokens)
+        if n not in counters:
+            counters[n] = Counter(zip(*(words[i:] for i in range(n))))
+        occurrences = counters[n][tokens]
+        densities.append((keyword, round(occurrences * n * 100.0 / len(words), 2)))
+    return tuple(densities)
+
+
+def hashtag_candidates(
+    words: Sequence[str], keywords: Iterable[str] = (), limit: int = MAX_HASHTAGS
+) -> Tuple[str, ...]:
+    """
+    Rank unigram and bigram hashtag candidates by frequency.
+
+    Keywords are always ranked first; bigrams are weighted above unigrams since
+    they tend to be more specific.
+    """
+    content_words = [word for word in words if word not in _STOPWORDS and len(word) > 2]
+    scores: Counter = Counter()
+    scores.update((word,) for word in content_words)
+    for first, second in zip(content_words, content_words[1:]):
+        scores[(first, second)] += 1.5
+
+    # Candidate token tuples mapped to the words used for display
+    ranked: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+    for keyword in keywords:
+        display = tuple(_WORD_RE.findall(keyword))
+        tokens = tuple(token.lower() for token in display)
+        if tokens and tokens not in ranked:
+            ranked[tokens] = display
+    for tokens, score in scores.most_common():
+        if len(ranked) >= limit:
+            break
+        if score >= 2 and tokens not in ranked:
+            ranked[tokens] = tokens
+
+    return tuple(
+        "#"
+        + "".join(
+            (word if word.isupper() else word.capitalize())
+            .replace("'", "")
+            .replace("-", "")
+            for word in display
+        )
+        for display in list(ranked.values())[:limit]
+    )
+
+
+def score_text(
+    text: str, keywords: Sequence[str] = (), seo_enabled: bool = True
+) -> ContentScore:
+    """Run every analysis over a single text."""
+    words = [word.lower() for word in _WORD_RE.findall(text)]
+    sentence_count = len(_SENTENCE_RE.findall(text)) or (1 if words else 0)
+
+    density = keyword_density(words, keywords) if seo_enabled else ()
+    seo_optimized = (
+        seo_enabled
+        and bool(density)
+        and len(words) >= SEO_MIN_WORDS
+        and all(SEO_MIN_DENSITY <= value <= SEO_MAX_DENSITY for _, value in density)
+    )
+
+    return ContentScore(
+        word_count=len(words),
+        readability_score=readability_score(words, sentence_count),
+        keyword_density=density,
+        seo_optimized=seo_optimized,
+        hashtags=hashtag_candidates(words, keywords),
+    )
+
+
+def _score_batch(batch: Sequence[ScoringItem], seo_enabled: bool) -> List[tuple]:
+    """Worker entry point: score a batch and return plain tuples."""
+    return [tuple(score_text(text, keywords, seo_enabled)) for text, keywords in batch]
+
+
+# ---------------------------------------------------------------------------
+# Process pool front-end
+# ---------------------------------------------------------------------------
+
+
+class ScoringService:
+    """
+    Process-pool backed scoring with micro-batched submission.
+
+    Single requests submitted through `score()` are grouped for up to
+    `SCORING_BATCH_WINDOW_MS` (or until `SCORING_BATCH_SIZE` items are waiting)
+    and shipped to a worker as one task.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        batch_window_ms: Optional[int] = None,
+    ):
+        self.max_workers = max_workers or settings.per_worker(settings.SCORING_WORKERS)
+        self.batch_size = batch_size or settings.SCORING_BATCH_SIZE
+        self.batch_window = (batch_window_ms or settings.SCORING_BATCH_WINDOW_MS) / 1000
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: List[Tuple[ScoringItem, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self._closed = False
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._closed:
+            raise RuntimeError("Scoring service is shut down")
+        if self._executor is None:
+            # spawn avoids forking a process that already runs an event loop and threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info("Scoring process pool started", workers=self.max_workers)
+        return self._executor
+
+    async def _run_batch(self, batch: Sequence[ScoringItem]) -> List[ContentScore]:
+        loop = asyncio.get_running_loop()
+        rows = await loop.run_in_executor(
+            self._get_executor(), _score_batch, batch, settings.ENABLE_SEO_OPTIMIZATION
+        )
+        return [ContentScore._make(row) for row in rows]
+
+    async def score(self, text: str, keywords: Sequence[str] = ()) -> ContentScore:
+        """Score a single text; the request is batched with concurrent callers."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(((text, tuple(keywords)), future))
+
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending, self._pending = self._pending, []
+        if pending:
+            task = asyncio.ensure_future(self._resolve(pending))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def _resolve(self, pending: List[Tuple[ScoringItem, asyncio.Future]]) -> None:
+        try:
+            results = await self._run_batch([item for item, _ in pending])
+        except Exception as e:
+            logger.error("Scoring batch failed", size=len(pending), error=str(e))
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def score_many(
+        self, items: Iterable[Tuple[str, Sequence[str]]]
+    ) -> List[ContentScore]:
+        """Score several texts at once, preserving input order."""
+        batch: List[ScoringItem] = [(text, tuple(keywords)) for text, keywords in items]
+        chunks = [
+            batch[i : i + self.batch_size]
+            for i in range(0, len(batch), self.batch_size)
+        ]
+        results = await asyncio.gather(*(self._run_batch(chunk) for chunk in chunks))
+        return [score for chunk in results for score in chunk]
+
+    async def rescore_library(
+        self,
+        items: Union[
+            Iterable[Tuple[Any, str, Sequence[str]]],
+            AsyncIterable[Tuple[Any, str, Sequence[str]]],
+        ],
+        batch_size: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+    ) -> AsyncIterator[Tuple[Any, ContentScore]]:
+        """
+        Bulk mode for re-scoring an entire content library.
+
+        Consumes `(key, text, keywords)` rows (e.g. streamed from the database)
+        in large batches, keeps every worker busy with a bounded number of
+        in-flight batches and yields `(key, score)` pairs as batches complete.
+
+        Args:
+            items: Sync or async iterable of `(key, text, keywords)`
+            batch_size: Items per worker task (defaults to 8x the micro-batch size)
+            max_in_flight: Concurrent batches (defaults to twice the worker count)
+        """
+        batch_size = batch_size or self.batch_size * 8
+        max_in_flight = max_in_flight or self.max_workers * 2
+        in_flight: set = set()
+        started = time.perf_counter()
+        scored = 0
+
+        async def submit(rows: List[Tuple[Any, str, Sequence[str]]]):
+            keys = [row[0] for row in rows]
+            scores = await self._run_batch([(text, tuple(kw)) for _, text, kw in rows])
+            return list(zip(keys, scores))
+
+        async def rows_of(source) -> AsyncIterator[Tuple[Any, str, Sequence[str]]]:
+            if hasattr(source, "__aiter__"):
+                async for row in source:
+                    yield row
+            else:
+                for row in source:
+                    yield row
+
+        batch: List[Tuple[Any, str, Sequence[str]]] = []
+        async for row in rows_of(items):
+            batch.append(row)
+            if len(batch) < batch_size:
+                continue
+            in_flight.add(asyncio.ensure_future(submit(batch)))
+            batch = []
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    for pair in task.result():
+                        scored += 1
+                        yield pair
+
+        if batch:
+            in_flight.add(asyncio.ensure_future(submit(batch)))
+        for task in asyncio.as_completed(in_flight):
+            for pair in await task:
+                scored += 1
+                yield pair
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "Content library re-scored",
+            items=scored,
+            seconds=round(elapsed, 2),
+            items_per_second=round(scored / elapsed, 1) if elapsed else None,
+        )
+
+    async def shutdown(self) -> None:
+        """Flush pending work, wait for it and stop the worker processes."""
+        self._flush()
+        # Batches still resolving need the pool; closing it first would leave
+        # them to start a new one
+        while self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        self._closed = True
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+            logger.info("Scoring process pool stopped")
+
+
+# Global scoring service (worker processes are started lazily)
+scoring_service = ScoringService()
@@ -0,0 +1,3 @@
+"""
+Marketing services: campaigns, scheduling and multi-channel distribution.
+"""
@@ -0,0 +1,332 @@
+"""
+Campaign service for the AI Multi-Agent Content Creation & Marketing System.
+
+Creating a campaign turns its schedule into scheduled actions: one publish per
+content item at the start date, and one send per content item, channel and
+occurrence up to the end date. The actions are run by the scheduler; this
+module also registers their handlers. Campaign metadata and action lists
+expire `CAMPAIGN_RETENTION_SECONDS` after the last send or the cancellation.
+"""
+
+import calendar
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import orjson
+import structlog
+from fastapi import status
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis import cache_get, get_redis
+from app.models.content import Content
+from app.schemas.marketing import CampaignCreate, CampaignSchedule
+from app.services.content import content_service
+from app.services.content.content_service import ContentError
+from app.services.marketing.scheduler_service import (
+    cancel_actions,
+    register_handler,
+    schedule_actions,
+)
+from app.services.notification.email_service import (
+    EmailCampaign,
+    email_service,
+    stream_recipients,
+)
+
+logger = structlog.get_logger()
+
+# Upper bound on sends one campaign may schedule
+MAX_CAMPAIGN_ACTIONS = 100_000
+
+# How far in the past a start date may be, for clients scheduling "now"
+START_DATE_GRACE = timedelta(minutes=5)
+
+# Campaign ids by creation time, and by when their metadata expires
+CAMPAIGN_INDEX_KEY = "campaigns"
+CAMPAIGN_EXPIRY_KEY = "campaigns:expiry"
+
+
+class CampaignError(Exception):
+    """Base error for campaign operations."""
+
+    status_code = status.HTTP_400_BAD_REQUEST
+
+
+class CampaignNotFoundError(CampaignError):
+    """Raised when a campaign does not exist."""
+
+    status_code = status.HTTP_404_NOT_FOUND
+
+
+def campaign_key(campaign_id: str) -> str:
+    return f"campaign:{campaign_id}"
+
+
+def actions_key(campaign_id: str) -> str:
+    return f"campaign:{campaign_id}:actions"
+
+
+def _add_months(anchor: datetime, months: int) -> datetime:
+    # Same day as the anchor, clamped to the target month's last day
+    index = anchor.year * 12 + anchor.month - 1 + months
+    year, month = divmod(index, 12)
+    day = min(anchor.day, calendar.monthrange(year, month + 1)[1])
+    return anchor.replace(year=year, month=month + 1, day=day)
+
+
+def _occurrence(start: datetime, frequency: str, n: int) -> datetime:
+    # Computed from the start rather than the previous send, so a clamped
+    # month end (Jan 31 -> Feb 28) does not pull every later send forward
+    if frequency == "daily":
+        return start + timedelta(days=n)
+    if frequency == "weekly":
+        return start + timedelta(weeks=n)
+    return _add_months(start, n)
+
+
+def occurrences(
+    schedule: CampaignSchedule, limit: Optional[int] = None
+) -> List[datetime]:
+    """Send times of a campaign schedule, in order, at most `limit` of them."""
+    if schedule.frequency == "once":
+        return [schedule.start_date]
+    times = []
+    when = schedule.start_date
+    while when <= schedule.end_date and (limit is None or len(times) < limit):
+        times.append(when)
+        when = _occurrence(schedule.start_date, schedule.frequency, len(times))
+    return times
+
+
+async def _save_campaign(
+    campaign: Dict[str, Any], expires_at: float, action_ids: Sequence[str] = ()
+) -> None:
+    """Store campaign metadata; everything about it expires at `expires_at`."""
+    campaign_id = campaign["id"]
+    expire_at = int(expires_at)
+    redis = await get_redis()
+    async with redis.pipeline(transaction=True) as pipe:
+        if action_ids:
+            pipe.rpush(actions_key(campaign_id), *action_ids)
+            pipe.zadd(CAMPAIGN_INDEX_KEY, {campaign_id: time.time()})
+        pipe.set(campaign_key(campaign_id), orjson.dumps(campaign).decode())
+        pipe.expireat(campaign_key(campaign_id), expire_at)
+        pipe.expireat(actions_key(campaign_id), expire_at)
+        pipe.zadd(CAMPAIGN_EXPIRY_KEY, {campaign_id: expire_at})
+        await pipe.execute()
+
+
+async def prune_campaigns() -> int:
+    """
+    Drop expired campaigns from the campaign index.
+
+    Their metadata and action lists expire on their own.
+
+    Returns:
+        Number of campaigns pruned
+    """
+    redis = await get_redis()
+    expired = await redis.zrangebyscore(CAMPAIGN_EXPIRY_KEY, "-inf", time.time())
+    if not expired:
+        return 0
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.zrem(CAMPAIGN_INDEX_KEY, *expired)
+        pipe.zrem(CAMPAIGN_EXPIRY_KEY, *expired)
+        await pipe.execute()
+    return len(expired)
+
+
+async def create_campaign(data: CampaignCreate) -> Dict[str, Any]:
+    """
+    Create a campaign and schedule its publishes and sends.
+
+    Raises:
+        CampaignError: The schedule starts in the past or would create too
+            many sends
+    """
+    if data.schedule.start_date < datetime.now(timezone.utc) - START_DATE_GRACE:
+        raise CampaignError("Campaign start_date is in the past")
+
+    # Generation stops one past the cap, so a decades-long daily schedule is
+    # rejected without building every send time first
+    sends_per_occurrence = len(data.content_ids) * len(data.channels)
+    max_occurrences = (
+        MAX_CAMPAIGN_ACTIONS - len(data.content_ids)
+    ) // sends_per_occurrence
+    send_times = occurrences(data.schedule, limit=max_occurrences + 1)
+    if len(send_times) > max_occurrences:
+        raise CampaignError(
+            f"Campaign would schedule more than {MAX_CAMPAIGN_ACTIONS} actions"
+        )
+
+    campaign_id = f"campaign_{uuid.uuid4().hex[:12]}"
+    actions: List[Tuple[str, Dict[str, Any], datetime]] = []
+    for content_id in data.content_ids:
+        actions.append(
+            (
+                "publish_content",
+                {"campaign_id": campaign_id, "content_id": content_id},
+                data.schedule.start_date,
+            )
+        )
+        for channel in data.channels:
+            for occurrence, when in enumerate(send_times):
+                payload = {
+                    "campaign_id": campaign_id,
+                    "content_id": content_id,
+                    "channel": channel,
+                    "occurrence": occurrence,
+                }
+                actions.append(("campaign_send", payload, when))
+    action_ids = await schedule_actions(actions)
+
+    ends_at = send_times[-1]
+    campaign = {
+        "id": campaign_id,
+        "name": data.name,
+        "status": "scheduled",
+        "content_ids": data.content_ids,
+        "content_count": len(data.content_ids),
+        "channels": data.channels,
+        "schedule": data.schedule.model_dump(mode="json"),
+        "target_audience": data.target_audience,
+        "scheduled_actions": len(action_ids),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "ends_at": ends_at.isoformat(),
+    }
+    # Kept for a while after the last send, so late retries still find it
+    await _save_campaign(
+        campaign,
+        ends_at.timestamp() + settings.CAMPAIGN_RETENTION_SECONDS,
+        action_ids,
+    )
+    await prune_campaigns()
+
+    logger.info("Campaign scheduled", campaign_id=campaign_id, actions=len(action_ids))
+    return campaign
+
+
+async def get_campaign(campaign_id: str) -> Dict[str, Any]:
+    """Get a campaign by id."""
+    payload = await cache_get(campaign_key(campaign_id))
+    if payload is None:
+        raise CampaignNotFoundError(f"Campaign {campaign_id} not found")
+    return orjson.loads(payload)
+
+
+async def list_campaigns(limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+    """Campaigns, newest first."""
+    await prune_campaigns()
+    redis = await get_redis()
+    campaign_ids = await redis.zrevrange(CAMPAIGN_INDEX_KEY, offset, offset + limit - 1)
+    if not campaign_ids:
+        return []
+    payloads = await redis.mget(
+        [campaign_key(campaign_id) for campaign_id in campaign_ids]
+    )
+    return [orjson.loads(payload) for payload in payloads if payload is not None]
+
+
+async def cancel_campaign(campaign_id: str) -> int:
+    """Cancel every pending action of a campaign. Returns how many were pending."""
+    campaign = await get_campaign(campaign_id)
+    redis = await get_redis()
+    action_ids = await redis.lrange(actions_key(campaign_id), 0, -1)
+    cancelled = await cancel_actions(action_ids)
+
+    campaign["status"] = "cancelled"
+    await _save_campaign(campaign, time.time() + settings.CAMPAIGN_RETENTION_SECONDS)
+    return cancelled
+
+
+async def _active_campaign(campaign_id: str) -> Optional[Dict[str, Any]]:
+    """The campaign, or None if it is gone or cancelled."""
+    try:
+        campaign = await get_campaign(campaign_id)
+    except CampaignNotFoundError:
+        logger.warning(
+            "Campaign action skipped, campaign not found", campaign_id=campaign_id
+        )
+        return None
+    if campaign["status"] == "cancelled":
+        return None
+    return campaign
+
+
+# Publishing content that is already published changes nothing
+@register_handler("publish_content", idempotent=True)
+async def _publish_content(payload: Dict[str, Any]) -> None:
+    # Cancelling only removes actions not yet claimed; this one may have been
+    if await _active_campaign(payload["campaign_id"]) is None:
+        return
+    try:
+        async with AsyncSessionLocal() as db:
+            await content_service.publish_content(db, payload["content_id"])
+    except ContentError as e:
+        # Missing or archived content will not become publishable by retrying
+        logger.warning(
+            "Scheduled publish skipped", content_id=payload["content_id"], error=str(e)
+        )
+
+
+async def send_campaign_email(
+    campaign: Dict[str, Any], content_id: str, occurrence: int = 0
+) -> Optional[Dict[str, Any]]:
+    """
+    Email a content item to the campaign's audience.
+
+    The audience is every subscriber tagged with any value listed in the
+    campaign's `target_audience` (all subscribers when it is empty). Running
+    the same occurrence again only emails recipients the earlier runs did not
+    get to.
+    """
+    async with AsyncSessionLocal() as db:
+        content = await db.get(Content, content_id)
+    if content is None or not content.body:
+        logger.warning(
+            "Campaign email skipped, no content body",
+            campaign_id=campaign["id"],
+            content_id=content_id,
+        )
+        return None
+
+    tags = sorted(
+        {
+            tag
+            for values in campaign.get("target_audience", {}).values()
+            for tag in values
+        }
+    )
+    email = EmailCampaign.from_sources(campaign["id"], content.title, content.body)
+    return await email_service.send_campaign(
+        email,
+        stream_recipients(tags),
+        send_id=f"{campaign['id']}:{content_id}:{occurrence}",
+    )
+
+
+# Email sends resume from their batch checkpoints instead of starting over
+@register_handler("campaign_send", idempotent=True)
+async def _campaign_send(payload: Dict[str, Any]) -> None:
+    campaign = await _active_campaign(payload["campaign_id"])
+    if campaign is None:
+        return
+
+    if payload["channel"] == "email" and settings.ENABLE_EMAIL_MARKETING:
+        await send_campaign_email(
+            campaign, payload["content_id"], payload["occurrence"]
+        )
+        return
+
+    # Delivery for other channels is not implemented yet; the send is
+    # recorded so the campaign's progress can be followed.
+    logger.info(
+        "Campaign send due",
+        campaign_id=payload["campaign_id"],
+        content_id=payload["content_id"],
+        channel=payload["channel"],
+        occurrence=payload["occurrence"],
+    )
@@ -0,0 +1,497 @@
+"""
+Scheduled action engine for the AI Multi-Agent Content Creation & Marketing System.
+
+Future actions (scheduled publishes, campaign sends, ...) are stored in Redis
+sorted sets scored by due time and sharded by action id. Workers claim due
+actions in batches with a Lua script that atomically moves them to a lease set,
+so an action is only ever handed to one worker. Actions due within the next
+`SCHEDULER_HORIZON_MS` are claimed early and parked in an in-memory timing
+wheel, which fires them with tick-level precision instead of poll-level
+precision. Leases of crashed workers expire and their actions are put back.
+Actions interrupted by a drain are put back only if their handler is
+registered as idempotent; others go to the dead-letter hash instead of
+running twice.
+
+Key layout per shard `n` (hash-tagged so a shard lives in one cluster slot):
+    scheduler:{n}:due      ZSET  action id -> due time (ms)
+    scheduler:{n}:lease    ZSET  action id -> lease expiry (ms)
+    scheduler:{n}:payload  HASH  action id -> JSON action
+"""
+
+import asyncio
+import random
+import time
+import uuid
+import zlib
+from datetime import datetime
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import orjson
+import structlog
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.core.shutdown import drain_controller
+
+logger = structlog.get_logger()
+
+ActionHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+SCHEDULING_LAG = Histogram(
+    "scheduler_lag_seconds",
+    "Delay between an action's due time and the moment it started running",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+ACTIONS_TOTAL = Counter(
+    "scheduler_actions_total", "Scheduled actions processed", ["outcome"]
+)
+WHEEL_SIZE = Gauge(
+    "scheduler_timing_wheel_size",
+    "Actions parked in the in-memory timing wheel",
+    # Summed over live workers in multiprocess mode
+    multiprocess_mode="livesum",
+)
+
+# Claim up to ARGV[2] actions due before ARGV[1] and lease them until ARGV[3]
+CLAIM_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, ARGV[2])
+local claimed = {}
+for i = 1, #due, 2 do
+    local id = due[i]
+    redis.call('ZREM', KEYS[1], id)
+    redis.call('ZADD', KEYS[2], ARGV[3], id)
+    claimed[#claimed + 1] = id
+    claimed[#claimed + 1] = due[i + 1]
+    claimed[#claimed + 1] = redis.call('HGET', KEYS[3], id) or ''
+end
+return claimed
+"""
+
+# Put up to ARGV[2] actions whose lease expired before ARGV[1] back as due now
+RECOVER_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, id in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], id)
+    if redis.call('HEXISTS', KEYS[3], id) == 1 then
+        redis.call('ZADD', KEYS[1], ARGV[1], id)
+    end
+end
+return #expired
+"""
+
+# Extend the lease of ARGV[2..n] to ARGV[1] if still held
+RENEW_SCRIPT = """
+local renewed = 0
+for i = 2, #ARGV do
+    if redis.call('ZSCORE', KEYS[1], ARGV[i]) then
+        redis.call('ZADD', KEYS[1], ARGV[1], ARGV[i])
+        renewed = renewed + 1
+    end
+end
+return renewed
+"""
+
+DEAD_LETTER_KEY = "scheduler:dead"
+
+_handlers: Dict[str, ActionHandler] = {}
+# Action types whose handlers may safely run again after being interrupted
+_idempotent: Set[str] = set()
+
+
+def register_handler(
+    action_type: str, idempotent: bool = False
+) -> Callable[[ActionHandler], ActionHandler]:
+    """
+    Decorator registering the coroutine that runs actions of a given type.
+
+    Args:
+        action_type: Action type the handler runs
+        idempotent: Running the handler again after it was interrupted part
+            way (e.g. because it resumes from a checkpoint) has no duplicate
+            effects, so drains may requeue its actions
+    """
+
+    def decorator(handler: ActionHandler) -> ActionHandler:
+        _handlers[action_type] = handler
+        if idempotent:
+            _idempotent.add(action_type)
+        else:
+            _idempotent.discard(action_type)
+        return handler
+
+    return decorator
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def shard_for(action_id: str) -> int:
+    return zlib.crc32(action_id.encode()) % settings.SCHEDULER_SHARDS
+
+
+def shard_keys(shard: int) -> Tuple[str, str, str]:
+    prefix = f"scheduler:{{{shard}}}"
+    return f"{prefix}:due", f"{prefix}:lease", f"{prefix}:payload"
+
+
+async def schedule_action(
+    action_type: str,
+    payload: Dict[str, Any],
+    run_at: datetime,
+    action_id: Optional[str] = None,
+) -> str:
+    """
+    Schedule an action to run at `run_at`.
+
+    Re-scheduling an existing `action_id` replaces its payload and due time.
+
+    Returns:
+        The action id
+    """
+    action_id = action_id or f"action_{uuid.uuid4().hex}"
+    due_ms = int(run_at.timestamp() * 1000)
+    action = {
+        "id": action_id,
+        "type": action_type,
+        "payload": payload,
+        "due_ms": due_ms,
+        "attempts": 0,
+    }
+    due_key, _, payload_key = shard_keys(shard_for(action_id))
+
+    redis = await get_redis()
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.hset(payload_key, action_id, orjson.dumps(action).decode())
+        pipe.zadd(due_key, {action_id: due_ms})
+        await pipe.execute()
+    return action_id
+
+
+async def schedule_actions(
+    actions: List[Tuple[str, Dict[str, Any], datetime]]
+) -> List[str]:
+    """Schedule many `(action_type, payload, run_at)` actions in one round trip."""
+    redis = await get_redis()
+    ids = []
+    async with redis.pipeline(transaction=False) as pipe:
+        for action_type, payload, run_at in actions:
+            action_id = f"action_{uuid.uuid4().hex}"
+            due_ms = int(run_at.timestamp() * 1000)
+            action = {
+                "id": action_id,
+                "type": action_type,
+                "payload": payload,
+                "due_ms": due_ms,
+                "attempts": 0,
+            }
+            due_key, _, payload_key = shard_keys(shard_for(action_id))
+            pipe.hset(payload_key, action_id, orjson.dumps(action).decode())
+            pipe.zadd(due_key, {action_id: due_ms})
+            ids.append(action_id)
+        await pipe.execute()
+    return ids
+
+
+async def cancel_actions(action_ids: List[str]) -> int:
+    """
+    Cancel scheduled actions that have not been claimed yet.
+
+    Returns:
+        How many of the actions were still pending
+    """
+    redis = await get_redis()
+    async with redis.pipeline(transaction=False) as pipe:
+        for action_id in action_ids:
+            due_key, _, payload_key = shard_keys(shard_for(action_id))
+            pipe.zrem(due_key, action_id)
+            pipe.hdel(payload_key, action_id)
+        results = await pipe.execute()
+    return sum(results[::2])
+
+
+class TimingWheel:
+    """
+    Hashed timing wheel for actions due within the claim horizon.
+
+    Each slot covers `tick_ms`; the wheel spans more than the horizon, so an
+    action never waits a full revolution.
+    """
+
+    def __init__(self, tick_ms: int, span_ms: int):
+        self.tick_ms = tick_ms
+        self.size = span_ms // tick_ms + 1
+        self.slots: List[List[Tuple[int, Dict[str, Any]]]] = [
+            [] for _ in range(self.size)
+        ]
+        self.count = 0
+
+    def add(self, due_ms: int, action: Dict[str, Any], now_ms: int) -> None:
+        # Overdue actions go in the current slot so the next tick fires them
+        slot = max(due_ms, now_ms) // self.tick_ms % self.size
+        self.slots[slot].append((due_ms, action))
+        self.count += 1
+
+    def pop_due(self, now_ms: int, last_tick_ms: int) -> List[Dict[str, Any]]:
+        """Remove and return actions in every slot passed since `last_tick_ms`."""
+        due = []
+        first = last_tick_ms // self.tick_ms
+        last = now_ms // self.tick_ms
+        for tick in range(first, min(last, first + self.size - 1) + 1):
+            slot = self.slots[tick % self.size]
+            if not slot:
+                continue
+            remaining = [(due_ms, action) for due_ms, action in slot if due_ms > now_ms]
+            due.extend(action for due_ms, action in slot if due_ms <= now_ms)
+            self.slots[tick % self.size] = remaining
+        self.count -= len(due)
+        return due
+
+    def drain(self) -> List[Dict[str, Any]]:
+        actions = [action for slot in self.slots for _, action in slot]
+        self.slots = [[] for _ in range(self.size)]
+        self.count = 0
+        return actions
+
+
+class Scheduler:
+    """Claims, times and runs scheduled actions in this worker."""
+
+    def __init__(self):
+        self.wheel = TimingWheel(
+            settings.SCHEDULER_TICK_MS, settings.SCHEDULER_HORIZON_MS * 2
+        )
+        self._held: Dict[str, int] = {}  # action id -> shard, for lease renewal
+        self._tasks: List[asyncio.Task] = []
+        self._lease_task: Optional[asyncio.Task] = None
+        self._running: set = set()
+        self._semaphore = asyncio.Semaphore(settings.SCHEDULER_MAX_CONCURRENCY)
+        self._scripts: Dict[str, Any] = {}
+
+    async def start(self) -> None:
+        """
+        Start the claim, timing and lease-recovery loops.
+
+        This function should be called during application startup.
+        """
+        redis = await get_redis()
+        self._scripts = {
+            "claim": redis.register_script(CLAIM_SCRIPT),
+            "recover": redis.register_script(RECOVER_SCRIPT),
+            "renew": redis.register_script(RENEW_SCRIPT),
+        }
+        self._tasks = [
+            asyncio.create_task(self._claim_loop()),
+            asyncio.create_task(self._tick_loop()),
+        ]
+        self._lease_task = asyncio.create_task(self._lease_loop())
+        logger.info("Scheduler started", shards=settings.SCHEDULER_SHARDS)
+
+    async def pause(self) -> None:
+        """
+        Stop claiming and hand parked actions back; running ones continue.
+
+        Leases keep being renewed until `stop()`, so actions still running
+        through a drain are not recovered and run a second time elsewhere.
+        """
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+        parked = self.wheel.drain()
+        if parked:
+            await self._release(parked)
+            logger.info("Scheduler released parked actions", released=len(parked))
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop claiming, hand parked actions back and wait for running ones."""
+        await self.pause()
+        if self._running:
+            await asyncio.wait(self._running, timeout=timeout)
+        if self._lease_task is not None:
+            self._lease_task.cancel()
+            await asyncio.gather(self._lease_task, return_exceptions=True)
+            self._lease_task = None
+        logger.info("Scheduler stopped")
+
+    async def _claim_loop(self) -> None:
+        interval = settings.SCHEDULER_POLL_INTERVAL_MS / 1000
+        while True:
+            try:
+                # Start at a random shard so workers spread over shards
+                offset = random.randrange(settings.SCHEDULER_SHARDS)
+                for i in range(settings.SCHEDULER_SHARDS):
+                    await self._claim_shard((offset + i) % settings.SCHEDULER_SHARDS)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Scheduler claim failed", error=str(e))
+            await asyncio.sleep(interval)
+
+    async def _claim_shard(self, shard: int) -> None:
+        now = _now_ms()
+        while self.wheel.count < settings.SCHEDULER_MAX_PARKED:
+            claimed = await self._scripts["claim"](
+                keys=list(shard_keys(shard)),
+                args=[
+                    now + settings.SCHEDULER_HORIZON_MS,
+                    settings.SCHEDULER_CLAIM_BATCH,
+                    now + settings.SCHEDULER_LEASE_SECONDS * 1000,
+                ],
+            )
+            for i in range(0, len(claimed), 3):
+                action_id, due_ms, raw = (
+                    claimed[i],
+                    int(float(claimed[i + 1])),
+                    claimed[i + 2],
+                )
+                if not raw:
+                    continue
+                self._held[action_id] = shard
+                self.wheel.add(due_ms, orjson.loads(raw), _now_ms())
+            WHEEL_SIZE.set(self.wheel.count)
+            if len(claimed) < settings.SCHEDULER_CLAIM_BATCH * 3:
+                return
+
+    async def _tick_loop(self) -> None:
+        tick = settings.SCHEDULER_TICK_MS
+        last = _now_ms()
+        while True:
+            now = _now_ms()
+            await asyncio.sleep((tick - now % tick) / 1000)
+            now = _now_ms()
+            for action in self.wheel.pop_due(now, last):
+                task = asyncio.create_task(self._run(action, now))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+            last = now
+            WHEEL_SIZE.set(self.wheel.count)
+
+    async def _lease_loop(self) -> None:
+        interval = settings.SCHEDULER_LEASE_SECONDS / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                now = _now_ms()
+                by_shard: Dict[int, List[str]] = {}
+                for action_id, shard in self._held.items():
+                    by_shard.setdefault(shard, []).append(action_id)
+                for shard, action_ids in by_shard.items():
+                    await self._scripts["renew"](
+                        keys=[shard_keys(shard)[1]],
+                        args=[
+                            now + settings.SCHEDULER_LEASE_SECONDS * 1000,
+                            *action_ids,
+                        ],
+                    )
+                for shard in range(settings.SCHEDULER_SHARDS):
+                    recovered = await self._scripts["recover"](
+                        keys=list(shard_keys(shard)),
+                        args=[now, settings.SCHEDULER_CLAIM_BATCH],
+                    )
+                    if recovered:
+                        logger.warning(
+                            "Recovered expired scheduler leases",
+                            shard=shard,
+                            count=recovered,
+                        )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Scheduler lease maintenance failed", error=str(e))
+
+    async def _run(self, action: Dict[str, Any], fired_ms: int) -> None:
+        SCHEDULING_LAG.observe(max(0, fired_ms - action["due_ms"]) / 1000)
+        handler = _handlers.get(action["type"])
+
+        # Interrupted by a drain, the action goes back to its shard to run
+        # elsewhere, unless running it again could repeat its effects
+        if action["type"] in _idempotent:
+            requeue = partial(self._release, [action])
+        else:
+            requeue = partial(self._dead_letter, action, "interrupted by drain")
+        async with self._semaphore, drain_controller.track(action["id"], requeue):
+            try:
+                if handler is None:
+                    raise LookupError(f"No handler for action type {action['type']}")
+                await handler(action["payload"])
+            except Exception as e:
+                logger.error(
+                    "Scheduled action failed",
+                    action_id=action["id"],
+                    type=action["type"],
+                    error=str(e),
+                )
+                await self._retry(action)
+                return
+
+        await self._ack(action["id"])
+        ACTIONS_TOTAL.labels(outcome="succeeded").inc()
+
+    async def _ack(self, action_id: str) -> None:
+        shard = self._held.pop(action_id, shard_for(action_id))
+        _, lease_key, payload_key = shard_keys(shard)
+        redis = await get_redis()
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(lease_key, action_id)
+            pipe.hdel(payload_key, action_id)
+            await pipe.execute()
+
+    async def _retry(self, action: Dict[str, Any]) -> None:
+        action = {**action, "attempts": action.get("attempts", 0) + 1}
+        shard = self._held.pop(action["id"], shard_for(action["id"]))
+        if action["attempts"] >= settings.SCHEDULER_MAX_ATTEMPTS:
+            await self._dead_letter(action, "attempts exhausted", shard)
+            return
+
+        due_key, lease_key, payload_key = shard_keys(shard)
+        redis = await get_redis()
+        backoff_ms = min(2 ** action["attempts"], 300) * 1000
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(lease_key, action["id"])
+            pipe.hset(payload_key, action["id"], orjson.dumps(action).decode())
+            pipe.zadd(due_key, {action["id"]: _now_ms() + backoff_ms})
+            await pipe.execute()
+        ACTIONS_TOTAL.labels(outcome="retried").inc()
+
+    async def _dead_letter(
+        self, action: Dict[str, Any], reason: str, shard: Optional[int] = None
+    ) -> None:
+        """Move an action to the dead-letter hash for inspection."""
+        if shard is None:
+            shard = self._held.pop(action["id"], shard_for(action["id"]))
+        _, lease_key, payload_key = shard_keys(shard)
+        redis = await get_redis()
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.zrem(lease_key, action["id"])
+            pipe.hdel(payload_key, action["id"])
+            pipe.hset(
+                DEAD_LETTER_KEY,
+                action["id"],
+                orjson.dumps({**action, "dead_reason": reason}).decode(),
+            )
+            await pipe.execute()
+        ACTIONS_TOTAL.labels(outcome="dead").inc()
+        logger.warning(
+            "Scheduled action dead-lettered",
+            action_id=action["id"],
+            type=action["type"],
+            reason=reason,
+        )
+
+    async def _release(self, actions: List[Dict[str, Any]]) -> None:
+        """Hand claimed-but-unstarted actions back to the due sets."""
+        redis = await get_redis()
+        async with redis.pipeline(transaction=False) as pipe:
+            for action in actions:
+                shard = self._held.pop(action["id"], shard_for(action["id"]))
+                due_key, lease_key, _ = shard_keys(shard)
+                pipe.zrem(lease_key, action["id"])
+                pipe.zadd(due_key, {action["id"]: action["due_ms"]})
+            await pipe.execute()
+
+
+# Global scheduler for this worker
+scheduler = Scheduler()
@@ -0,0 +1,3 @@
+"""
+Notification services: email, SMS and webhooks.
+"""
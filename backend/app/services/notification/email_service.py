@@ -0,0 +1,462 @@
+"""
+Email service for the AI Multi-Agent Content Creation & Marketing System.
+
+Campaign emails are sent through the SendGrid v3 Mail Send API in batches of
+up to `EMAIL_BATCH_SIZE` personalizations (1000 is the provider maximum) per
+request. A campaign's subject and body templates are compiled once: the body
+is sent once per batch with substitution tags in place of its `{{ field }}`
+placeholders, and only the personalized values (subject, substitutions) are
+rendered per recipient, inline: a full batch renders in a few milliseconds,
+less than shipping it to a process pool and back costs. Recipients are
+streamed from the database with a server-side cursor and batches are sent
+concurrently over one pooled HTTP client; throttled or failed batches are
+retried and recipients rejected by the provider are dropped from the retry
+instead of failing the whole batch.
+
+Sends are idempotent per `send_id`: the recipient range of every finished
+batch is checkpointed in Redis, and a retried send (scheduler retry, drain
+requeue) skips recipients inside those ranges. Requests whose outcome is
+unknown (the connection failed after the request went out, or the send was
+cancelled mid-request) are not retried and count as done, so a recipient may
+miss an email but never gets it twice.
+
+Point `SENDGRID_API_URL` at `scripts/sendgrid_standin.py` to measure sending
+throughput offline.
+"""
+
+import asyncio
+import bisect
+import html
+import random
+import re
+import time
+from functools import lru_cache
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import httpx
+import structlog
+from fastapi import status
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.redis import get_redis
+from app.models.marketing import Subscriber
+
+logger = structlog.get_logger()
+
+MAIL_SEND_PATH = "/v3/mail/send"
+
+_FIELD_RE = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+_REJECTED_RE = re.compile(r"^personalizations\.(\d+)\b")
+
+# (email, display name, template fields)
+Recipient = Tuple[str, Optional[str], Dict[str, Any]]
+
+# Failures after which the provider may already have accepted the request
+_AMBIGUOUS_ERRORS = (httpx.ReadError, httpx.ReadTimeout, httpx.RemoteProtocolError)
+
+
+class EmailSendError(Exception):
+    """Raised when the email provider refuses every request (e.g. bad API key)."""
+
+    status_code = status.HTTP_502_BAD_GATEWAY
+
+
+class CompiledTemplate(NamedTuple):
+    """A template split into literal text and the fields between it."""
+
+    literals: Tuple[str, ...]
+    fields: Tuple[str, ...]
+
+    def render(self, values: Dict[str, Any], escape: bool = False) -> str:
+        parts = [self.literals[0]]
+        for field, literal in zip(self.fields, self.literals[1:]):
+            value = str(values.get(field) or "")
+            parts.append(html.escape(value) if escape else value)
+            parts.append(literal)
+        return "".join(parts)
+
+    def with_tags(self) -> str:
+        """The template with every field replaced by its substitution tag."""
+        return self.render({field: substitution_tag(field) for field in self.fields})
+
+
+def substitution_tag(field: str) -> str:
+    return f"-{field}-"
+
+
+@lru_cache(maxsize=256)
+def compile_template(source: str) -> CompiledTemplate:
+    """Parse a `{{ field }}` template once."""
+    pieces = _FIELD_RE.split(source)
+    return CompiledTemplate(literals=tuple(pieces[0::2]), fields=tuple(pieces[1::2]))
+
+
+class EmailCampaign(NamedTuple):
+    """Everything needed to send one campaign email to many recipients."""
+
+    campaign_id: str
+    subject: CompiledTemplate
+    body: CompiledTemplate
+
+    @classmethod
+    def from_sources(cls, campaign_id: str, subject: str, body: str) -> "EmailCampaign":
+        return cls(campaign_id, compile_template(subject), compile_template(body))
+
+
+def _render_personalizations(
+    subject: CompiledTemplate,
+    body_fields: Sequence[str],
+    recipients: Sequence[Recipient],
+) -> List[Dict[str, Any]]:
+    """The per-recipient part of a batch request."""
+    personalizations = []
+    for email, name, fields in recipients:
+        values = {"email": email, **fields}
+        to = {"email": email, "name": name} if name else {"email": email}
+        personalization = {"to": [to], "subject": subject.render(values)}
+        if body_fields:
+            personalization["substitutions"] = {
+                substitution_tag(field): html.escape(str(values.get(field) or ""))
+                for field in body_fields
+            }
+        personalizations.append(personalization)
+    return personalizations
+
+
+class BatchResult(NamedTuple):
+    """Outcome of one batch request."""
+
+    sent: int
+    rejected: int  # Refused by the provider; retrying will not help
+    failed: int  # Not delivered after every retry
+    uncertain: int = 0  # Outcome unknown; not retried
+
+    @property
+    def settled(self) -> bool:
+        """Whether resending the batch could only duplicate emails."""
+        return self.failed == 0
+
+
+class SendCheckpoint:
+    """
+    Recipient ranges of a campaign send whose batches are settled.
+
+    Recipients are sent in email order, so each settled batch is stored as
+    its first and last email in a Redis hash (`email-send:{send_id}:batches`).
+    A retried send skips every recipient inside a stored range; subscribers
+    added inside one since the first attempt are skipped too.
+    """
+
+    def __init__(self, send_id: str):
+        self.key = f"email-send:{send_id}:batches"
+        self._firsts: List[str] = []
+        self._lasts: List[str] = []
+
+    async def load(self) -> None:
+        redis = await get_redis()
+        # Merged into disjoint ranges; a later batch may span an earlier one
+        self._firsts, self._lasts = [], []
+        for first, last in sorted((await redis.hgetall(self.key)).items()):
+            if self._lasts and first <= self._lasts[-1]:
+                self._lasts[-1] = max(self._lasts[-1], last)
+            else:
+                self._firsts.append(first)
+                self._lasts.append(last)
+
+    def __len__(self) -> int:
+        return len(self._firsts)
+
+    def is_done(self, email: str) -> bool:
+        i = bisect.bisect_right(self._firsts, email) - 1
+        return i >= 0 and email <= self._lasts[i]
+
+    async def mark(self, first: str, last: str) -> None:
+        redis = await get_redis()
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self.key, first, last)
+            pipe.expire(self.key, settings.EMAIL_CHECKPOINT_TTL_SECONDS)
+            await pipe.execute()
+
+
+def _retry_delay(response: Optional[httpx.Response], attempt: int) -> float:
+    if response is not None:
+        retry_after = response.headers.get("retry-after")
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+    return min(0.5 * 2**attempt, 30.0) * random.uniform(0.5, 1.0)
+
+
+def _rejected_indexes(response: httpx.Response) -> Set[int]:
+    """Personalizations the provider named in a 400 response."""
+    try:
+        errors = response.json().get("errors") or []
+    except ValueError:
+        return set()
+    rejected = set()
+    for error in errors:
+        match = _REJECTED_RE.match(error.get("field") or "")
+        if match:
+            rejected.add(int(match.group(1)))
+    return rejected
+
+
+class EmailService:
+    """Pooled HTTP client for batched email sending."""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            if not settings.SENDGRID_API_KEY:
+                raise EmailSendError("SENDGRID_API_KEY is not configured")
+            self._client = httpx.AsyncClient(
+                base_url=settings.SENDGRID_API_URL,
+                headers={"Authorization": f"Bearer {settings.SENDGRID_API_KEY}"},
+                timeout=settings.EMAIL_REQUEST_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=settings.EMAIL_SEND_CONCURRENCY,
+                    max_keepalive_connections=settings.EMAIL_SEND_CONCURRENCY,
+                ),
+            )
+        return self._client
+
+    def render_batch(
+        self, campaign: EmailCampaign, recipients: Sequence[Recipient]
+    ) -> List[Dict[str, Any]]:
+        return _render_personalizations(
+            campaign.subject, tuple(dict.fromkeys(campaign.body.fields)), recipients
+        )
+
+    def _request_body(
+        self, campaign: EmailCampaign, personalizations: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        return {
+            "personalizations": personalizations,
+            "from": {"email": settings.EMAIL_FROM},
+            "content": [{"type": "text/html", "value": campaign.body.with_tags()}],
+            "custom_args": {"campaign_id": campaign.campaign_id},
+        }
+
+    async def send_batch(
+        self, campaign: EmailCampaign, personalizations: List[Dict[str, Any]]
+    ) -> BatchResult:
+        """
+        Send one batch, retrying throttled and failed requests.
+
+        Requests that may have reached the provider before the connection
+        failed are not retried.
+
+        Raises:
+            EmailSendError: The provider rejected the credentials
+        """
+        client = self._get_client()
+        rejected_count = 0
+
+        for attempt in range(settings.EMAIL_MAX_RETRIES + 1):
+            response = None
+            try:
+                response = await client.post(
+                    MAIL_SEND_PATH, json=self._request_body(campaign, personalizations)
+                )
+            except _AMBIGUOUS_ERRORS as e:
+                logger.error(
+                    "Email batch outcome unknown, not retried",
+                    campaign_id=campaign.campaign_id,
+                    recipients=len(personalizations),
+                    error=str(e) or type(e).__name__,
+                )
+                return BatchResult(0, rejected_count, 0, len(personalizations))
+            except httpx.TransportError as e:
+                # Connecting failed, so nothing was sent
+                logger.warning(
+                    "Email batch request failed",
+                    campaign_id=campaign.campaign_id,
+                    error=str(e) or type(e).__name__,
+                )
+            else:
+                if response.status_code < 300:
+                    return BatchResult(len(personalizations), rejected_count, 0)
+                if response.status_code in (401, 403):
+                    raise EmailSendError(
+                        f"Email provider rejected credentials ({response.status_code})"
+                    )
+                if response.status_code == 400:
+                    rejected = _rejected_indexes(response)
+                    if not rejected:
+                        break
+                    # Resend everyone the provider did not object to
+                    rejected_count += len(rejected)
+                    personalizations = [
+                        p for i, p in enumerate(personalizations) if i not in rejected
+                    ]
+                    if not personalizations:
+                        return BatchResult(0, rejected_count, 0)
+                    continue
+
+            if attempt < settings.EMAIL_MAX_RETRIES:
+                await asyncio.sleep(_retry_delay(response, attempt))
+
+        logger.error(
+            "Email batch failed",
+            campaign_id=campaign.campaign_id,
+            recipients=len(personalizations),
+            status=response.status_code if response is not None else None,
+        )
+        return BatchResult(0, rejected_count, len(personalizations))
+
+    async def send_campaign(
+        self,
+        campaign: EmailCampaign,
+        batches: AsyncIterator[List[Recipient]],
+        send_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Send a campaign to every recipient produced by `batches`.
+
+        Up to `EMAIL_SEND_CONCURRENCY` batches are rendered and sent at once;
+        reading more recipients waits until a batch finishes.
+
+        Args:
+            campaign: The email to send
+            batches: Recipients, in ascending email order when `send_id` is set
+            send_id: Makes the send resumable: recipients of batches settled by
+                an earlier attempt with the same id are skipped
+
+        Returns:
+            Send report (recipients, batches, sent, failed, uncertain, skipped,
+            throughput)
+        """
+        report = {
+            "recipients": 0,
+            "batches": 0,
+            "sent": 0,
+            "failed": 0,
+            "uncertain": 0,
+            "skipped": 0,
+        }
+        started = time.perf_counter()
+        in_flight: set = set()
+        checkpoint = SendCheckpoint(send_id) if send_id else None
+        if checkpoint is not None:
+            await checkpoint.load()
+
+        async def process(recipients: List[Recipient]) -> None:
+            personalizations = self.render_batch(campaign, recipients)
+            try:
+                result = await self.send_batch(campaign, personalizations)
+            except asyncio.CancelledError:
+                # Interrupted (e.g. by a drain) while the request may already
+                # be with the provider: settle the batch so a resumed send
+                # does not email these recipients twice
+                if checkpoint is not None:
+                    await checkpoint.mark(recipients[0][0], recipients[-1][0])
+                raise
+            report["sent"] += result.sent
+            report["failed"] += result.rejected + result.failed
+            report["uncertain"] += result.uncertain
+            if checkpoint is not None and result.settled:
+                await checkpoint.mark(recipients[0][0], recipients[-1][0])
+
+        try:
+            async for recipients in batches:
+                if checkpoint:
+                    pending = [r for r in recipients if not checkpoint.is_done(r[0])]
+                    report["skipped"] += len(recipients) - len(pending)
+                    recipients = pending
+                for start in range(0, len(recipients), settings.EMAIL_BATCH_SIZE):
+                    if len(in_flight) >= settings.EMAIL_SEND_CONCURRENCY:
+                        done, in_flight = await asyncio.wait(
+                            in_flight, return_when=asyncio.FIRST_COMPLETED
+                        )
+                        for task in done:
+                            task.result()
+                    chunk = recipients[start : start + settings.EMAIL_BATCH_SIZE]
+                    report["recipients"] += len(chunk)
+                    report["batches"] += 1
+                    in_flight.add(asyncio.create_task(process(chunk)))
+            if in_flight:
+                await asyncio.gather(*in_flight)
+        except BaseException:
+            for task in in_flight:
+                task.cancel()
+            # Let cancelled batches save their checkpoints before giving up
+            await asyncio.gather(*in_flight, return_exceptions=True)
+            raise
+
+        elapsed = time.perf_counter() - started
+        report["elapsed_seconds"] = round(elapsed, 3)
+        report["recipients_per_second"] = (
+            round(report["recipients"] / elapsed, 1) if elapsed else None
+        )
+        logger.info("Email campaign sent", campaign_id=campaign.campaign_id, **report)
+        return report
+
+    async def shutdown(self) -> None:
+        """Close the HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+async def stream_recipients(
+    tags: Sequence[str] = (), batch_size: Optional[int] = None
+) -> AsyncIterator[List[Recipient]]:
+    """
+    Stream subscribed recipients from the database in batches.
+
+    Rows are read through a server-side cursor, so memory use does not grow
+    with the size of the list, in email order so sends can be checkpointed.
+
+    Args:
+        tags: Only recipients having at least one of these tags (all if empty)
+        batch_size: Rows fetched per round trip
+    """
+    batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+    query = (
+        select(
+            Subscriber.email,
+            Subscriber.first_name,
+            Subscriber.last_name,
+            Subscriber.attributes,
+        )
+        .where(Subscriber.unsubscribed_at.is_(None))
+        # Byte order, which the checkpoint's string comparisons assume; a
+        # locale collation ignores case and punctuation
+        .order_by(Subscriber.email.collate("C"))
+        .execution_options(yield_per=batch_size)
+    )
+    if tags:
+        query = query.where(Subscriber.tags.overlap(list(tags)))
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            yield [
+                (
+                    row.email,
+                    " ".join(filter(None, (row.first_name, row.last_name))) or None,
+                    {
+                        **(row.attributes or {}),
+                        "first_name": row.first_name,
+                        "last_name": row.last_name,
+                    },
+                )
+                for row in rows
+            ]
+
+
+# Global email service (the HTTP client is created lazily)
+email_service = EmailService()
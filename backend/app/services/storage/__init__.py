@@ -0,0 +1,3 @@
+"""
+Storage services: file uploads, cloud storage and caching.
+"""
@@ -0,0 +1,239 @@
+"""
+Cloud storage integration for the AI Multi-Agent Content Creation & Marketing System.
+
+This module wraps the boto3 S3 client. boto3 is synchronous, so every call is
+dispatched to a worker thread to keep the event loop responsive. Setting
+`AWS_S3_ENDPOINT_URL` points the client at an S3-compatible stand-in such as
+MinIO for local development.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import boto3
+import structlog
+from botocore.config import Config
+
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+# S3 rejects multipart parts smaller than 5 MiB (except the last one)
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+# Global S3 client (boto3 clients are thread-safe)
+_s3_client: Optional[Any] = None
+
+
+def get_s3_client():
+    """
+    Get the shared S3 client, creating it on first use.
+    """
+    global _s3_client
+
+    if _s3_client is None:
+        _s3_client = boto3.client(
+            "s3",
+            region_name=settings.AWS_REGION,
+            endpoint_url=settings.AWS_S3_ENDPOINT_URL,
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            config=Config(max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS),
+        )
+    return _s3_client
+
+
+def close_s3_client() -> None:
+    """Close the shared S3 client's connection pool."""
+    global _s3_client
+
+    if _s3_client is not None:
+        _s3_client.close()
+        _s3_client = None
+
+
+async def put_object(
+    key: str,
+    data: bytes,
+    content_type: str = "application/octet-stream",
+    content_encoding: Optional[str] = None,
+    bucket: Optional[str] = None,
+) -> None:
+    """Store a small object in a single request."""
+    extra = {"ContentEncoding": content_encoding} if content_encoding else {}
+    await asyncio.to_thread(
+        get_s3_client().put_object,
+        Bucket=bucket or settings.AWS_S3_BUCKET,
+        Key=key,
+        Body=data,
+        ContentType=content_type,
+        **extra,
+    )
+
+
+async def get_object(key: str, bucket: Optional[str] = None) -> bytes:
+    """Fetch a whole object."""
+
+    def _read() -> bytes:
+        response = get_s3_client().get_object(
+            Bucket=bucket or settings.AWS_S3_BUCKET, Key=key
+        )
+        return response["Body"].read()
+
+    return await asyncio.to_thread(_read)
+
+
+async def delete_object(key: str, bucket: Optional[str] = None) -> None:
+    """Delete one object; deleting a missing key is not an error."""
+    await asyncio.to_thread(
+        get_s3_client().delete_object,
+        Bucket=bucket or settings.AWS_S3_BUCKET,
+        Key=key,
+    )
+
+
+async def list_prefixes(prefix: str, bucket: Optional[str] = None) -> List[str]:
+    """Common prefixes one `/`-separated level below `prefix` ("folders")."""
+
+    def _list() -> List[str]:
+        paginator = get_s3_client().get_paginator("list_objects_v2")
+        return [
+            item["Prefix"]
+            for page in paginator.paginate(
+                Bucket=bucket or settings.AWS_S3_BUCKET, Prefix=prefix, Delimiter="/"
+            )
+            for item in page.get("CommonPrefixes", [])
+        ]
+
+    return await asyncio.to_thread(_list)
+
+
+async def delete_prefix(prefix: str, bucket: Optional[str] = None) -> int:
+    """
+    Delete every object whose key starts with `prefix`.
+
+    Returns:
+        Number of objects deleted
+    """
+
+    def _delete() -> int:
+        client = get_s3_client()
+        bucket_name = bucket or settings.AWS_S3_BUCKET
+        deleted = 0
+        for page in client.get_paginator("list_objects_v2").paginate(
+            Bucket=bucket_name, Prefix=prefix
+        ):
+            # A listing page holds at most 1000 keys, the DeleteObjects limit
+            objects = [{"Key": item["Key"]} for item in page.get("Contents", [])]
+            if not objects:
+                continue
+            response = client.delete_objects(
+                Bucket=bucket_name, Delete={"Objects": objects, "Quiet": True}
+            )
+            errors = response.get("Errors", [])
+            if errors:
+                raise RuntimeError(
+                    f"Failed to delete {len(errors)} objects under {prefix}: "
+                    f"{errors[0].get('Message')}"
+                )
+            deleted += len(objects)
+        return deleted
+
+    return await asyncio.to_thread(_delete)
+
+
+class S3MultipartUpload:
+    """
+    Incremental S3 multipart upload.
+
+    Chunks passed to `write()` are accumulated until a full part is available
+    and then uploaded, so at most one part (plus the incoming chunk) is held in
+    memory regardless of the object size.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        content_type: str,
+        bucket: Optional[str] = None,
+        part_size: Optional[int] = None,
+    ):
+        self.key = key
+        self.content_type = content_type
+        self.bucket = bucket or settings.AWS_S3_BUCKET
+        self.part_size = max(
+            part_size or settings.S3_MULTIPART_PART_SIZE, MIN_PART_SIZE
+        )
+        self.size = 0
+        self._client = get_s3_client()
+        self._upload_id: Optional[str] = None
+        self._parts: List[Dict[str, Any]] = []
+        self._buffer = bytearray()
+
+    async def start(self) -> None:
+        """Create the multipart upload on S3."""
+        response = await asyncio.to_thread(
+            self._client.create_multipart_upload,
+            Bucket=self.bucket,
+            Key=self.key,
+            ContentType=self.content_type,
+        )
+        self._upload_id = response["UploadId"]
+
+    async def write(self, chunk: bytes) -> None:
+        """Buffer a chunk, flushing complete parts to S3."""
+        self._buffer += chunk
+        self.size += len(chunk)
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[: self.part_size])
+            del self._buffer[: self.part_size]
+            await self._upload_part(part)
+
+    async def _upload_part(self, data: bytes) -> None:
+        part_number = len(self._parts) + 1
+        response = await asyncio.to_thread(
+            self._client.upload_part,
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=data,
+        )
+        self._parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+
+    async def complete(self) -> Dict[str, Any]:
+        """Upload the trailing part and finalize the object."""
+        if self._buffer or not self._parts:
+            data = bytes(self._buffer)
+            self._buffer.clear()
+            await self._upload_part(data)
+
+        response = await asyncio.to_thread(
+            self._client.complete_multipart_upload,
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            MultipartUpload={"Parts": self._parts},
+        )
+        return {
+            "bucket": self.bucket,
+            "key": self.key,
+            "size": self.size,
+            "etag": response.get("ETag"),
+            "content_type": self.content_type,
+        }
+
+    async def abort(self) -> None:
+        """Abort the upload so S3 discards any parts already stored."""
+        self._buffer.clear()
+        if self._upload_id is None:
+            return
+        try:
+            await asyncio.to_thread(
+                self._client.abort_multipart_upload,
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self._upload_id,
+            )
+        except Exception as e:
+            logger.error("Failed to abort multipart upload", key=self.key, error=str(e))
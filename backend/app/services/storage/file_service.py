@@ -0,0 +1,127 @@
+"""
+File upload service for the AI Multi-Agent Content Creation & Marketing System.
+
+This module validates and stores uploaded files without ever buffering a whole
+file: the MIME type is sniffed from the first bytes of the stream, the size
+limit is enforced as chunks arrive, and data is piped straight into an S3
+multipart upload.
+"""
+
+import os
+import re
+import uuid
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+
+import magic
+import structlog
+from fastapi import status
+
+from app.core.config import settings
+from app.services.storage.cloud_storage import S3MultipartUpload
+
+logger = structlog.get_logger()
+
+# Number of leading bytes handed to libmagic for type detection
+SNIFF_BYTES = 2048
+
+_UNSAFE_FILENAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+class UploadError(Exception):
+    """Base error for rejected uploads."""
+
+    status_code = status.HTTP_400_BAD_REQUEST
+
+
+class FileTooLargeError(UploadError):
+    """Raised when an upload exceeds `MAX_FILE_SIZE`."""
+
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+
+class UnsupportedFileTypeError(UploadError):
+    """Raised when the sniffed MIME type is not in `ALLOWED_FILE_TYPES`."""
+
+    status_code = status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+
+
+class StorageNotConfiguredError(UploadError):
+    """Raised when no upload bucket (`AWS_S3_BUCKET`) is configured."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+def sanitize_filename(filename: str) -> str:
+    """Reduce a client-supplied filename to a safe object key component."""
+    name = _UNSAFE_FILENAME_RE.sub("_", os.path.basename(filename)).strip("._")
+    return name[:255] or "upload"
+
+
+async def stream_upload(
+    chunks: AsyncIterator[bytes],
+    filename: str,
+    max_size: Optional[int] = None,
+    allowed_types: Optional[Iterable[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Validate and upload a file from an async chunk stream.
+
+    Args:
+        chunks: Async iterator of raw body chunks (e.g. `request.stream()`)
+        filename: Client-supplied filename
+        max_size: Size limit in bytes (defaults to `MAX_FILE_SIZE`)
+        allowed_types: Accepted MIME types (defaults to `ALLOWED_FILE_TYPES`)
+
+    Returns:
+        Stored object metadata
+
+    Raises:
+        FileTooLargeError: The stream exceeded the size limit
+        UnsupportedFileTypeError: The sniffed type is not allowed
+        StorageNotConfiguredError: `AWS_S3_BUCKET` is not set
+        UploadError: The stream was empty
+    """
+    if not settings.AWS_S3_BUCKET:
+        raise StorageNotConfiguredError("File storage is not configured")
+
+    max_size = max_size or settings.MAX_FILE_SIZE
+    allowed_types = set(allowed_types or settings.ALLOWED_FILE_TYPES)
+
+    # Read just enough of the stream to identify the file type
+    head = bytearray()
+    async for chunk in chunks:
+        head += chunk
+        if len(head) > max_size:
+            raise FileTooLargeError(f"File exceeds the {max_size} byte limit")
+        if len(head) >= SNIFF_BYTES:
+            break
+
+    if not head:
+        raise UploadError("Empty upload")
+
+    content_type = magic.from_buffer(bytes(head[:SNIFF_BYTES]), mime=True)
+    if content_type not in allowed_types:
+        raise UnsupportedFileTypeError(f"File type {content_type} is not allowed")
+
+    key = f"uploads/{uuid.uuid4().hex}/{sanitize_filename(filename)}"
+    upload = S3MultipartUpload(key=key, content_type=content_type)
+    await upload.start()
+
+    try:
+        await upload.write(bytes(head))
+        del head
+
+        async for chunk in chunks:
+            if upload.size + len(chunk) > max_size:
+                raise FileTooLargeError(f"File exceeds the {max_size} byte limit")
+            await upload.write(chunk)
+
+        stored = await upload.complete()
+    except BaseException:
+        await upload.abort()
+        raise
+
+    logger.info(
+        "File uploaded", key=key, size=stored["size"], content_type=content_type
+    )
+    return {"filename": filename, **stored}
@@ -5,29 +5,44 @@ This module initializes the FastAPI application with all necessary middleware,
 routers, and configuration for the multi-agent content creation platform.
 """
 
+import time
+from contextlib import asynccontextmanager
+
+import structlog
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
-import time
-import structlog
-from contextlib import asynccontextmanager
+from fastapi.responses import ORJSONResponse
 
+from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.database import close_db, init_db, start_replica_monitor
 from app.core.logging import setup_logging
-from app.api.v1.api import api_router
-from app.core.database import init_db
-from app.core.redis import init_redis
+from app.core.metrics import metrics_app
+from app.core.profiling import ProfilingMiddleware, loop_monitor
+from app.core.redis import close_redis, init_redis
+from app.core.shutdown import DrainMiddleware, drain_controller
+from app.services.ai.job_history_service import (
+    start_retention_task,
+    stop_retention_task,
+)
+from app.services.ai.job_status_service import job_status_hub
+from app.services.content.collaboration_service import collaboration_manager
+from app.services.content.scoring_service import scoring_service
+from app.services.marketing.scheduler_service import scheduler
+from app.services.notification.email_service import email_service
+from app.services.storage.cloud_storage import close_s3_client
 
 # Setup structured logging
 setup_logging()
 logger = structlog.get_logger()
 
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Application lifespan manager for startup and shutdown events.
-    
+
     Handles:
     - Database initialization
     - Redis connection setup
@@ -35,26 +50,70 @@ async def lifespan(app: FastAPI):
     """
     # Startup
     logger.info("Starting AI Multi-Agent Content Creation & Marketing System")
-    
+
     try:
         # Initialize database connection
         await init_db()
         logger.info("Database connection established")
-        
+
         # Initialize Redis connection
         await init_redis()
         logger.info("Redis connection established")
-        
+
+        if not settings.AWS_S3_BUCKET:
+            logger.warning(
+                "AWS_S3_BUCKET is not set; file uploads and agent output "
+                "archival are disabled"
+            )
+
+        # Start read replica health checks
+        await start_replica_monitor()
+
+        # Start job status fan-out
+        await job_status_hub.start()
+
+        # Reach collaboration sessions owned by other workers
+        await collaboration_manager.start()
+
+        # Keep job history partitions and retention up to date
+        await start_retention_task()
+
+        # Start running scheduled actions
+        await scheduler.start()
+
+        # Watch event loop lag and slow callbacks
+        await loop_monitor.start()
+
+        # On shutdown: stop claiming scheduled actions, release status
+        # waiters and send editors away with jittered reconnect hints
+        drain_controller.on_drain(scheduler.pause)
+        drain_controller.on_drain(job_status_hub.stop)
+        drain_controller.on_drain(collaboration_manager.drain)
+
         logger.info("Application startup completed successfully")
     except Exception as e:
         logger.error("Failed to initialize application", error=str(e))
         raise
-    
+
     yield
-    
+
     # Shutdown
     logger.info("Shutting down AI Multi-Agent Content Creation & Marketing System")
-    # Add any cleanup logic here
+    # Usually already done by the server on SIGTERM, before connections closed
+    await drain_controller.drain()
+    await loop_monitor.stop()
+    await scheduler.stop()
+    await stop_retention_task()
+    await job_status_hub.stop()
+    await collaboration_manager.shutdown()
+    await scoring_service.shutdown()
+
+    # Close connection pools last; the steps above may still use them
+    await email_service.shutdown()
+    close_s3_client()
+    await close_db()
+    await close_redis()
+
 
 # Create FastAPI application instance
 app = FastAPI(
@@ -84,9 +143,13 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
 )
 
+# Request profiling and loop monitoring (added first so it is the innermost middleware)
+app.add_middleware(ProfilingMiddleware)
+
 # Add CORS middleware for frontend communication
 app.add_middleware(
     CORSMiddleware,
@@ -102,12 +165,13 @@ app.add_middleware(
     allowed_hosts=settings.ALLOWED_HOSTS,
 )
 
+
 # Request timing middleware
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
     """
     Middleware to add request processing time to response headers.
-    
+
     This helps with performance monitoring and debugging.
     """
     start_time = time.time()
@@ -116,6 +180,7 @@ async def add_process_time_header(request: Request, call_next):
     response.headers["X-Process-Time"] = str(process_time)
     return response
 
+
 # Request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -123,7 +188,7 @@ async def log_requests(request: Request, call_next):
     Middleware to log all incoming requests for monitoring and debugging.
     """
     start_time = time.time()
-    
+
     # Log request details
     logger.info(
         "Incoming request",
@@ -132,9 +197,9 @@ async def log_requests(request: Request, call_next):
         client_ip=request.client.host if request.client else None,
         user_agent=request.headers.get("user-agent"),
     )
-    
+
     response = await call_next(request)
-    
+
     # Log response details
     process_time = time.time() - start_time
     logger.info(
@@ -144,15 +209,25 @@ async def log_requests(request: Request, call_next):
         status_code=response.status_code,
         process_time=process_time,
     )
-    
+
     return response
 
+
+# Refuse new requests while draining (added last so it is the outermost middleware)
+app.add_middleware(DrainMiddleware)
+
+
+# Prometheus scrape endpoint (aggregated over workers in multiprocess mode)
+if settings.ENABLE_METRICS:
+    app.mount("/metrics", metrics_app())
+
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """
     Global exception handler for unhandled errors.
-    
+
     Logs the error and returns a generic error response to avoid exposing
     sensitive information in production.
     """
@@ -163,8 +238,8 @@ async def global_exception_handler(request: Request, exc: Exception):
         url=str(request.url),
         exc_info=True,
     )
-    
-    return JSONResponse(
+
+    return ORJSONResponse(
         status_code=500,
         content={
             "detail": "Internal server error",
@@ -172,12 +247,13 @@ async def global_exception_handler(request: Request, exc: Exception):
         },
     )
 
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     """
     Health check endpoint for monitoring and load balancers.
-    
+
     Returns basic system status information.
     """
     return {
@@ -187,6 +263,7 @@ async def health_check():
         "timestamp": time.time(),
     }
 
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -200,15 +277,17 @@ async def root():
         "health": "/health",
     }
 
+
 # Include API router with versioning
 app.include_router(api_router, prefix="/api/v1")
 
+
 # WebSocket endpoint for real-time features
 @app.websocket("/ws")
 async def websocket_endpoint(websocket):
     """
     WebSocket endpoint for real-time features like live collaboration.
-    
+
     This is a placeholder - actual WebSocket logic will be implemented
     in the WebSocket manager.
     """
@@ -223,13 +302,14 @@ async def websocket_endpoint(websocket):
     finally:
         await websocket.close()
 
+
 if __name__ == "__main__":
-    import uvicorn
-    
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=settings.DEBUG,
-        log_level="info" if not settings.DEBUG else "debug",
-    )
+    if settings.server_processes > 1:
+        # Prefork multi-process serving for production
+        from app.core.server import run_prefork
+
+        run_prefork("main:app")
+    else:
+        from app.core.server import run_server
+
+        run_server("main:app")
@@ -0,0 +1,62 @@
+"""Shared fixtures for the backend tests."""
+
+import os
+import uuid
+
+import fakeredis
+import pytest
+from fakeredis import aioredis as fake_aioredis
+
+from app.core import redis as redis_module
+from app.core.config import settings
+from app.services.storage import cloud_storage
+
+
+@pytest.fixture
+async def redis(monkeypatch):
+    """
+    In-memory Redis (with Lua) behind both the text and the binary client.
+
+    Yields the text client; `app.core.redis.get_binary_redis()` returns a
+    bytes client on the same server.
+    """
+    server = fakeredis.FakeServer()
+    text_client = fake_aioredis.FakeRedis(server=server, decode_responses=True)
+    binary_client = fake_aioredis.FakeRedis(server=server)
+    monkeypatch.setattr(redis_module, "redis_client", text_client)
+    monkeypatch.setattr(redis_module, "binary_redis_client", binary_client)
+    yield text_client
+    await text_client.aclose()
+    await binary_client.aclose()
+
+
+def _s3_reachable() -> bool:
+    if not os.environ.get("AWS_S3_ENDPOINT_URL"):
+        return False
+    try:
+        cloud_storage.get_s3_client().list_buckets()
+    except Exception:
+        return False
+    return True
+
+
+@pytest.fixture
+def s3_bucket(monkeypatch):
+    """
+    A fresh bucket on the S3 stand-in from docker-compose, set as
+    `AWS_S3_BUCKET` and deleted afterwards.
+
+    Skips the test unless `AWS_S3_ENDPOINT_URL` points at a reachable endpoint.
+    """
+    if not _s3_reachable():
+        pytest.skip("S3 stand-in not reachable (set AWS_S3_ENDPOINT_URL)")
+
+    client = cloud_storage.get_s3_client()
+    bucket = f"upload-tests-{uuid.uuid4().hex[:8]}"
+    client.create_bucket(Bucket=bucket)
+    monkeypatch.setattr(settings, "AWS_S3_BUCKET", bucket)
+    yield bucket
+
+    for item in client.list_objects_v2(Bucket=bucket).get("Contents", []):
+        client.delete_object(Bucket=bucket, Key=item["Key"])
+    client.delete_bucket(Bucket=bucket)
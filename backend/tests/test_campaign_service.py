@@ -0,0 +1,139 @@
+"""Tests for campaign scheduling and retention."""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.schemas.marketing import CampaignCreate, CampaignSchedule
+from app.services.marketing import campaign_service
+from app.services.marketing.scheduler_service import _handlers
+
+UTC = timezone.utc
+
+
+def make_campaign(start: datetime, end: datetime, frequency: str) -> CampaignCreate:
+    return CampaignCreate(
+        name="Launch",
+        content_ids=["content_1"],
+        channels=["social"],
+        schedule=CampaignSchedule(start_date=start, end_date=end, frequency=frequency),
+    )
+
+
+def test_monthly_sends_keep_the_anchor_day():
+    schedule = CampaignSchedule(
+        start_date=datetime(2027, 1, 31, 9, tzinfo=UTC),
+        end_date=datetime(2027, 5, 31, 9, tzinfo=UTC),
+        frequency="monthly",
+    )
+
+    assert [
+        when.date().isoformat() for when in campaign_service.occurrences(schedule)
+    ] == [
+        "2027-01-31",
+        "2027-02-28",
+        "2027-03-31",
+        "2027-04-30",
+        "2027-05-31",
+    ]
+
+
+def test_weekly_sends_include_the_end_date():
+    start = datetime(2027, 1, 1, 9, tzinfo=UTC)
+    schedule = CampaignSchedule(
+        start_date=start, end_date=start + timedelta(weeks=2), frequency="weekly"
+    )
+
+    assert len(campaign_service.occurrences(schedule)) == 3
+
+
+def test_occurrences_stop_at_the_limit():
+    start = datetime(2027, 1, 1, 9, tzinfo=UTC)
+    schedule = CampaignSchedule(
+        start_date=start, end_date=start.replace(year=9000), frequency="daily"
+    )
+
+    assert len(campaign_service.occurrences(schedule, limit=10)) == 10
+
+
+async def test_oversized_campaign_is_rejected(redis):
+    start = datetime.now(UTC) + timedelta(days=1)
+
+    with pytest.raises(campaign_service.CampaignError, match="more than"):
+        await campaign_service.create_campaign(
+            make_campaign(start, start.replace(year=9000), "daily")
+        )
+
+
+async def test_campaign_starting_in_the_past_is_rejected(redis):
+    start = datetime.now(UTC) - timedelta(days=30)
+
+    with pytest.raises(campaign_service.CampaignError, match="in the past"):
+        await campaign_service.create_campaign(
+            make_campaign(start, start + timedelta(days=60), "daily")
+        )
+
+
+async def test_campaign_expires_after_its_last_send(redis):
+    start = datetime.now(UTC) + timedelta(days=1)
+    end = start + timedelta(days=2)
+
+    campaign = await campaign_service.create_campaign(
+        make_campaign(start, end, "daily")
+    )
+
+    expected = end.timestamp() + settings.CAMPAIGN_RETENTION_SECONDS - time.time()
+    for key in (
+        campaign_service.campaign_key(campaign["id"]),
+        campaign_service.actions_key(campaign["id"]),
+    ):
+        assert abs(await redis.ttl(key) - expected) < 5
+    assert [c["id"] for c in await campaign_service.list_campaigns()] == [
+        campaign["id"]
+    ]
+
+
+async def test_cancelled_campaign_keeps_a_ttl(redis):
+    start = datetime.now(UTC) + timedelta(days=1)
+    campaign = await campaign_service.create_campaign(
+        make_campaign(start, start + timedelta(days=400), "monthly")
+    )
+
+    assert await campaign_service.cancel_campaign(campaign["id"]) == 15
+    cancelled = await campaign_service.get_campaign(campaign["id"])
+
+    assert cancelled["status"] == "cancelled"
+    ttl = await redis.ttl(campaign_service.campaign_key(campaign["id"]))
+    assert 0 < ttl <= settings.CAMPAIGN_RETENTION_SECONDS
+
+
+async def test_expired_campaigns_are_pruned_from_the_index(redis):
+    start = datetime.now(UTC) + timedelta(days=1)
+    campaign = await campaign_service.create_campaign(
+        make_campaign(start, start, "once")
+    )
+    # As if the retention period had passed
+    await redis.delete(campaign_service.campaign_key(campaign["id"]))
+    await redis.zadd(campaign_service.CAMPAIGN_EXPIRY_KEY, {campaign["id"]: 1})
+
+    assert await campaign_service.list_campaigns() == []
+    assert await redis.zcard(campaign_service.CAMPAIGN_INDEX_KEY) == 0
+    assert await redis.zcard(campaign_service.CAMPAIGN_EXPIRY_KEY) == 0
+
+
+async def test_publish_is_skipped_for_cancelled_campaign(redis, monkeypatch):
+    start = datetime.now(UTC) + timedelta(days=1)
+    campaign = await campaign_service.create_campaign(
+        make_campaign(start, start, "once")
+    )
+    await campaign_service.cancel_campaign(campaign["id"])
+    # The publish was claimed before the cancellation removed it
+    monkeypatch.setattr(
+        campaign_service.content_service, "publish_content", pytest.fail
+    )
+
+    await _handlers["publish_content"](
+        {"campaign_id": campaign["id"], "content_id": "content_1"}
+    )
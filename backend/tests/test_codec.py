@@ -0,0 +1,151 @@
+"""Tests for the cache value codec."""
+
+import zlib
+from datetime import datetime, timezone
+from decimal import Decimal
+from uuid import UUID
+
+import pytest
+
+from app.core import codec
+from app.core.config import settings
+
+LARGE_TEXT = "The quick brown fox jumps over the lazy dog. " * 100
+
+VALUES = [
+    None,
+    0,
+    -(2**40),
+    3.5,
+    True,
+    "",
+    "short text",
+    LARGE_TEXT,
+    b"",
+    b"\x00\xff" * 2000,
+    [1, "two", [3.0]],
+    {"nested": {"list": [1, 2, 3], "text": LARGE_TEXT}, "bytes": b"\x01\x02"},
+]
+
+
+@pytest.mark.parametrize(
+    "compressor", list(codec.compressors.values()), ids=lambda c: c.name
+)
+@pytest.mark.parametrize("value", VALUES, ids=range(len(VALUES)))
+def test_round_trip(value, compressor):
+    encoded = codec.encode(value, compressor=compressor, min_compress_bytes=64)
+
+    assert encoded[0] == codec.VERSION
+    assert codec.decode(encoded) == value
+    assert type(codec.decode(encoded)) is type(value)
+
+
+def test_int_map_keys_round_trip():
+    value = {1: "one", 2: {3: [4]}, "name": "mixed"}
+
+    assert codec.decode(codec.encode(value, min_compress_bytes=1)) == value
+
+
+def test_large_values_are_compressed_small_ones_are_not():
+    small = codec.encode("tiny", min_compress_bytes=64)
+    large = codec.encode(LARGE_TEXT, min_compress_bytes=64)
+
+    assert small[1] & 0xF0 == codec.COMPRESSION_NONE
+    assert large[1] & 0xF0 == codec.default_compressor().flag
+    assert len(large) < len(LARGE_TEXT) / 4
+
+
+def test_incompressible_payloads_are_stored_as_is():
+    noise = bytes(range(256))
+
+    encoded = codec.encode(noise, min_compress_bytes=1)
+
+    assert encoded == bytes((codec.VERSION, codec.SERIALIZER_BYTES)) + noise
+
+
+def test_values_written_with_any_compressor_decode(monkeypatch):
+    # Written by a worker configured for one compressor, read by one using another
+    encoded = {
+        name: codec.encode(LARGE_TEXT, compressor=compressor, min_compress_bytes=1)
+        for name, compressor in ((c.name, c) for c in codec.compressors.values())
+    }
+    monkeypatch.setattr(settings, "CACHE_COMPRESSION", "zlib")
+
+    assert {name: codec.decode(data) for name, data in encoded.items()} == {
+        name: LARGE_TEXT for name in encoded
+    }
+
+
+def test_unknown_compression_setting_falls_back_to_zlib(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_COMPRESSION", "brotli")
+
+    assert codec.default_compressor().name == "zlib"
+
+
+def test_json_like_types_come_back_as_strings():
+    moment = datetime(2026, 10, 19, 12, 30, tzinfo=timezone.utc)
+    uid = UUID("12345678-1234-5678-1234-567812345678")
+
+    decoded = codec.decode(
+        codec.encode({"at": moment, "price": Decimal("9.99"), "id": uid, "tags": {"a"}})
+    )
+
+    assert decoded == {
+        "at": moment.isoformat(),
+        "price": "9.99",
+        "id": str(uid),
+        "tags": ["a"],
+    }
+
+
+def test_unserializable_values_are_rejected():
+    with pytest.raises(TypeError):
+        codec.encode({"value": object()})
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"\x01",
+        b"\x02\x01payload",
+        bytes((codec.VERSION, 0x0F)) + b"x",
+        bytes((codec.VERSION, codec.SERIALIZER_MSGPACK | 0x70)) + b"x",
+        bytes((codec.VERSION, codec.SERIALIZER_MSGPACK | codec.COMPRESSION_ZLIB))
+        + b"not zlib",
+        bytes((codec.VERSION, codec.SERIALIZER_TEXT)) + b"\xff\xfe",
+    ],
+    ids=[
+        "empty",
+        "header-only",
+        "future-version",
+        "unknown-serializer",
+        "unknown-compressor",
+        "corrupt-payload",
+        "invalid-utf8",
+    ],
+)
+def test_undecodable_values_raise_codec_error(data):
+    with pytest.raises(codec.CodecError):
+        codec.decode(data)
+
+
+def test_none_stays_none():
+    assert codec.decode(None) is None
+
+
+def test_registered_compressor_is_used_for_decoding(monkeypatch):
+    # Undone after the test, so the registry is left as it was
+    monkeypatch.setitem(codec.compressors, 0x70, None)
+    codec.register_compressor(
+        codec.Compressor(
+            "zlib9", 0x70, lambda data: zlib.compress(data, 9), zlib.decompress
+        )
+    )
+
+    encoded = codec.encode(
+        LARGE_TEXT, compressor=codec.compressors[0x70], min_compress_bytes=1
+    )
+
+    assert encoded[1] & 0xF0 == 0x70
+    assert codec.decode(encoded) == LARGE_TEXT
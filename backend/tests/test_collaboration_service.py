@@ -0,0 +1,251 @@
+"""Tests for the real-time collaboration engine."""
+
+import asyncio
+from typing import Dict, List
+
+import orjson
+import pytest
+
+from app.core.config import settings
+from app.models.content import Content
+from app.services.content import collaboration_service
+from app.services.content.collaboration_service import (
+    CollaborationManager,
+    DocumentSession,
+    Operation,
+    RelaySession,
+    StaleRevisionError,
+)
+
+CONTENT_ID = "content_1"
+
+
+def insert(position: int, text: str, user_id: str = "a") -> Operation:
+    return Operation("insert", position, text=text, user_id=user_id)
+
+
+def delete(position: int, length: int, user_id: str = "a") -> Operation:
+    return Operation("delete", position, length=length, user_id=user_id)
+
+
+# -- Operational transformation ---------------------------------------------
+
+
+def test_insert_after_concurrent_insert_shifts():
+    op = insert(5, "X")
+    op.transform(insert(2, "abc", user_id="b"))
+    assert op.position == 8
+
+
+def test_inserts_at_same_position_are_ordered_by_user():
+    first, second = insert(3, "A", user_id="a"), insert(3, "B", user_id="b")
+    first.transform(insert(3, "B", user_id="b"))
+    second.transform(insert(3, "A", user_id="a"))
+    assert (first.position, second.position) == (3, 4)
+
+
+def test_insert_inside_deleted_range_is_dropped():
+    op = insert(4, "X")
+    op.transform(delete(2, 5, user_id="b"))
+    assert (op.position, op.text) == (2, "")
+
+
+def test_delete_grows_around_concurrent_insert():
+    op = delete(2, 4)
+    op.transform(insert(3, "XY", user_id="b"))
+    assert (op.position, op.length) == (2, 6)
+
+
+def test_overlapping_deletes_remove_text_once():
+    op = delete(2, 4)
+    op.transform(delete(4, 4, user_id="b"))
+    assert (op.position, op.length) == (2, 2)
+
+
+def test_concurrent_edits_converge():
+    session = DocumentSession(content_id=CONTENT_ID, text="hello world")
+    # Both based on revision 0
+    session.apply(insert(5, ",", user_id="a"), 0)
+    session.apply(delete(6, 5, user_id="b"), 0)
+    session.apply(insert(11, "!", user_id="c"), 0)
+    assert session.text == "hello, !"
+    assert session.revision == 3
+
+
+def test_stale_revision_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "COLLAB_HISTORY_LIMIT", 2)
+    session = DocumentSession(content_id=CONTENT_ID, text="")
+    for i in range(3):
+        session.apply(insert(i, "x"), i)
+
+    with pytest.raises(StaleRevisionError):
+        session.apply(insert(0, "y"), 0)
+    with pytest.raises(StaleRevisionError):
+        session.apply(insert(0, "y"), 4)
+
+
+# -- Sessions ----------------------------------------------------------------
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.frames: List[Dict] = []
+        self.closed = False
+
+    async def send_text(self, text: str) -> None:
+        self.frames.append(orjson.loads(text))
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        self.closed = True
+
+    def last(self, frame_type: str) -> Dict:
+        return [frame for frame in self.frames if frame["type"] == frame_type][-1]
+
+
+class FakeDatabase:
+    """Stands in for Postgres: one table of content rows, versioned on commit."""
+
+    def __init__(self, body: str):
+        self.content = Content(id=CONTENT_ID, body=body, version=1)
+        self._locked = False
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._locked = False
+
+    async def get(self, model, content_id, with_for_update=False):
+        self._locked = with_for_update
+        return self.content if content_id == CONTENT_ID else None
+
+    async def commit(self):
+        if self._locked:
+            self.content.version += 1
+        self._locked = False
+
+    async def rollback(self):
+        self._locked = False
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = FakeDatabase("hello")
+    monkeypatch.setattr(collaboration_service, "AsyncSessionLocal", database)
+    return database
+
+
+@pytest.fixture
+async def workers(redis, database):
+    managers = [CollaborationManager(), CollaborationManager()]
+    for manager in managers:
+        await manager.start()
+    yield managers
+    for manager in managers:
+        await manager.shutdown()
+
+
+async def wait_for(condition, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def update(action: str, **fields) -> Dict:
+    return {"type": "collaboration_update", "action": action, **fields}
+
+
+async def test_operation_without_revision_is_rejected(workers):
+    manager = workers[0]
+    socket = FakeWebSocket()
+    session = await manager.join(CONTENT_ID, socket, "alice")
+
+    await manager.handle_message(
+        session, socket, update("insert", position=0, text="X")
+    )
+
+    assert socket.last("error")["message"] == "Operations require a revision"
+    assert session.text == "hello"
+
+
+async def test_message_from_dropped_socket_closes_it(workers):
+    manager = workers[0]
+    socket = FakeWebSocket()
+    session = await manager.join(CONTENT_ID, socket, "alice")
+    session.connections.pop(socket)
+
+    await manager.handle_message(
+        session, socket, update("insert", position=0, text="X", revision=0)
+    )
+
+    assert socket.closed
+    assert session.text == "hello"
+
+
+async def test_editors_on_two_workers_share_one_document(workers, database):
+    owner, other = workers
+    alice, bob = FakeWebSocket(), FakeWebSocket()
+
+    session = await owner.join(CONTENT_ID, alice, "alice")
+    relay = await other.join(CONTENT_ID, bob, "bob")
+    assert isinstance(session, DocumentSession)
+    assert isinstance(relay, RelaySession)
+    await wait_for(lambda: bob.frames)
+    assert bob.last("collaboration_state")["content"] == "hello"
+
+    await other.handle_message(
+        relay, bob, update("insert", position=5, text=" world", revision=0)
+    )
+    await wait_for(lambda: session.text == "hello world")
+    await owner.handle_message(
+        session, alice, update("insert", position=0, text=">", revision=0)
+    )
+
+    await wait_for(lambda: any(f["type"] == "collaboration_batch" for f in bob.frames))
+    await wait_for(lambda: session.pending_ops == [])
+    assert session.text == ">hello world"
+
+    # The last editor out snapshots the document
+    await other.leave(relay, bob)
+    await owner.leave(session, alice)
+    await wait_for(lambda: CONTENT_ID not in owner.sessions)
+    assert database.content.body == ">hello world"
+    assert CONTENT_ID not in other.relays
+
+
+async def test_snapshot_does_not_overwrite_concurrent_edit(workers, database):
+    manager = workers[0]
+    socket = FakeWebSocket()
+    session = await manager.join(CONTENT_ID, socket, "alice")
+    await manager.handle_message(
+        session, socket, update("insert", position=5, text="!", revision=0)
+    )
+
+    # Saved through the API while the session was open
+    database.content.body = "rewritten"
+    database.content.version += 1
+    await manager._snapshot(session)
+
+    assert database.content.body == "rewritten"
+    assert session.text == "rewritten"
+    assert socket.last("collaboration_state")["content"] == "rewritten"
+
+
+async def test_snapshot_keeps_edits_after_metadata_change(workers, database):
+    manager = workers[0]
+    socket = FakeWebSocket()
+    session = await manager.join(CONTENT_ID, socket, "alice")
+    await manager.handle_message(
+        session, socket, update("insert", position=5, text="!", revision=0)
+    )
+
+    # Published (version bump) without touching the body
+    database.content.version += 1
+    await manager._snapshot(session)
+
+    assert database.content.body == "hello!"
+    assert session.version == database.content.version
@@ -0,0 +1,18 @@
+"""Tests for settings derived from the worker count."""
+
+from app.core.config import Settings
+
+
+def test_budgets_are_split_across_prefork_workers():
+    settings = Settings(WORKERS=4, DEBUG=False)
+
+    assert settings.server_processes == 4
+    assert settings.per_worker(80) == 20
+    assert settings.per_worker(2) == 1
+
+
+def test_debug_serves_from_one_process_with_the_whole_budget():
+    settings = Settings(WORKERS=4, DEBUG=True)
+
+    assert settings.server_processes == 1
+    assert settings.per_worker(80) == 80
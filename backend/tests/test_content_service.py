@@ -0,0 +1,150 @@
+"""Tests for the content service's response cache."""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import orjson
+from sqlalchemy.dialects import postgresql
+
+from app.core.database import ReplicaSession
+from app.models.content import Content
+from app.services.content import content_service
+from app.services.content.scoring_service import score_text
+
+CONTENT_ID = "content_1"
+
+
+def make_content(version: int, title: str) -> Content:
+    now = datetime.now(timezone.utc)
+    return Content(
+        id=CONTENT_ID,
+        title=title,
+        type="blog_post",
+        status="draft",
+        body="Body",
+        keywords=[],
+        version=version,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+class FakeSession:
+    """Stands in for the AsyncSession; `on_get` runs during the read."""
+
+    def __init__(self, content: Content, on_get=None):
+        self.content = content
+        self.on_get = on_get
+        self.reads = 0
+
+    async def get(self, model, content_id):
+        self.reads += 1
+        if self.on_get is not None:
+            await self.on_get()
+        return self.content
+
+
+async def test_response_is_cached_with_its_etag(redis):
+    db = FakeSession(make_content(3, "First"))
+
+    body, etag = await content_service.get_content_response(db, CONTENT_ID)
+    cached_body, cached_etag = await content_service.get_content_response(
+        db, CONTENT_ID
+    )
+
+    assert etag == f'"{CONTENT_ID}-v3"'
+    assert (cached_body, cached_etag) == (body, etag)
+    assert orjson.loads(body)["data"]["content"]["title"] == "First"
+    assert db.reads == 1
+    assert await content_service.get_cached_etag(CONTENT_ID) == etag
+
+
+class FakeReplicaSession(FakeSession, ReplicaSession):
+    """FakeSession that the service sees as bound to a replica."""
+
+
+async def test_replica_reads_are_not_cached(redis):
+    replica = FakeReplicaSession(make_content(3, "Replayed late"))
+
+    _, etag = await content_service.get_content_response(replica, CONTENT_ID)
+
+    assert etag == f'"{CONTENT_ID}-v3"'
+    assert await content_service.get_cached_etag(CONTENT_ID) is None
+
+
+async def test_invalidation_during_a_read_is_not_overwritten(redis):
+    # A concurrent update commits and invalidates while the old row is read
+    async def concurrent_update():
+        await content_service.invalidate_content_cache(CONTENT_ID)
+
+    stale = FakeSession(make_content(3, "Old"), on_get=concurrent_update)
+    _, etag = await content_service.get_content_response(stale, CONTENT_ID)
+
+    assert etag == f'"{CONTENT_ID}-v3"'
+    assert await content_service.get_cached_etag(CONTENT_ID) is None
+
+    fresh = FakeSession(make_content(4, "New"))
+    body, etag = await content_service.get_content_response(fresh, CONTENT_ID)
+    assert etag == f'"{CONTENT_ID}-v4"'
+    assert await content_service.get_cached_etag(CONTENT_ID) == etag
+
+
+def test_etag_matching():
+    etag = '"content_1-v2"'
+
+    assert content_service.etag_matches(etag, etag)
+    assert content_service.etag_matches(f'"other", {etag}', etag)
+    assert content_service.etag_matches("*", etag)
+    assert not content_service.etag_matches('"content_1-v1"', etag)
+    assert not content_service.etag_matches(None, etag)
+
+
+class RecordingSession:
+    """Async session stand-in recording executed statements."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def execute(self, statement, params=None):
+        self.statements.append((statement, params))
+        rows = self.rows
+
+        class Result:
+            def all(self):
+                return rows
+
+        return Result()
+
+    async def commit(self):
+        pass
+
+
+async def test_batch_scoring_bumps_the_version(redis, monkeypatch):
+    row = SimpleNamespace(id=CONTENT_ID, body="Short text here.", keywords=[])
+    db = RecordingSession([row])
+    monkeypatch.setattr(content_service, "AsyncSessionLocal", lambda: db)
+
+    async def score_many(items):
+        return [score_text(body, keywords) for body, keywords in items]
+
+    monkeypatch.setattr(content_service.scoring_service, "score_many", score_many)
+    await content_service.get_content_response(
+        FakeSession(make_content(1, "Cached")), CONTENT_ID
+    )
+
+    await content_service.score_content_batch([CONTENT_ID])
+
+    update, params = db.statements[-1]
+    sql = str(update.compile(dialect=postgresql.dialect()))
+    assert "version=(content.version + " in sql
+    assert params == [
+        {"b_id": CONTENT_ID, "b_score": score_text(row.body).readability_score}
+    ]
+    assert await content_service.get_cached_etag(CONTENT_ID) is None
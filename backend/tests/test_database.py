@@ -0,0 +1,54 @@
+"""Tests for read-replica routing."""
+
+import asyncio
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.requests import Request
+
+from app.core import database
+from app.core.config import settings
+
+
+def make_request(headers=()) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "headers": [(name.encode(), value.encode()) for name, value in headers],
+            "client": ("203.0.113.7", 50000),
+        }
+    )
+
+
+def test_requests_without_identity_are_not_sticky():
+    assert database.sticky_key_for(make_request()) is None
+
+
+def test_token_and_session_cookie_make_requests_sticky():
+    token = database.sticky_key_for(make_request([("authorization", "Bearer abc")]))
+    cookie = database.sticky_key_for(
+        make_request([("cookie", f"{settings.SESSION_COOKIE_NAME}=s1")])
+    )
+    other_cookie = database.sticky_key_for(
+        make_request([("cookie", f"{settings.SESSION_COOKIE_NAME}=s2")])
+    )
+
+    assert token and cookie and other_cookie
+    assert len({token, cookie, other_cookie}) == 3
+
+
+async def test_replica_check_timeout_covers_connecting(monkeypatch):
+    monkeypatch.setattr(settings, "REPLICA_HEALTH_CHECK_TIMEOUT", 0.05)
+    replica = database.Replica(
+        engine=create_async_engine("postgresql+asyncpg://replica/db"),
+        sessionmaker=None,
+        healthy=True,
+    )
+
+    async def hanging_lag(replica):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(database, "_replica_lag", hanging_lag)
+    await asyncio.wait_for(database._check_replica(replica), timeout=1)
+
+    assert replica.healthy is False
+    assert replica.lag_seconds is None
@@ -0,0 +1,226 @@
+"""Tests for batched, resumable campaign email sending."""
+
+import asyncio
+from typing import List
+
+import httpx
+import orjson
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.services.notification import email_service as email_module
+from app.services.notification.email_service import (
+    EmailCampaign,
+    EmailService,
+    SendCheckpoint,
+)
+
+CAMPAIGN = EmailCampaign.from_sources(
+    "campaign_1", "Hello {{ first_name }}", "<p>Hi {{ first_name }}</p>"
+)
+EMAILS = [f"user{i}@example.com" for i in range(5)]
+
+
+def recipients(emails=EMAILS):
+    return [(email, None, {"first_name": email[:5]}) for email in emails]
+
+
+async def batches_of(items):
+    yield items
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "EMAIL_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "EMAIL_MAX_RETRIES", 2)
+    monkeypatch.setattr(email_module, "_retry_delay", lambda response, attempt: 0)
+    return EmailService()
+
+
+def serve(service: EmailService, handler) -> List[List[str]]:
+    """Route the service's requests to `handler`; returns the recipients sent."""
+    delivered = []
+
+    def transport(request: httpx.Request) -> httpx.Response:
+        to = [
+            p["to"][0]["email"]
+            for p in orjson.loads(request.content)["personalizations"]
+        ]
+        response = handler(to)
+        if response.status_code < 300:
+            delivered.append(to)
+        return response
+
+    service._client = httpx.AsyncClient(
+        base_url="http://sendgrid.test", transport=httpx.MockTransport(transport)
+    )
+    return delivered
+
+
+def test_personalizations_are_rendered_inline(service):
+    [personalization] = service.render_batch(CAMPAIGN, recipients(EMAILS[:1]))
+
+    assert personalization["to"] == [{"email": EMAILS[0]}]
+    assert personalization["subject"] == "Hello user0"
+    assert personalization["substitutions"] == {"-first_name-": "user0"}
+
+
+async def test_retried_send_skips_settled_batches(service, redis):
+    failing = {EMAILS[2]}
+    delivered = serve(
+        service,
+        lambda to: httpx.Response(500 if failing & set(to) else 202),
+    )
+
+    first = await service.send_campaign(
+        CAMPAIGN, batches_of(recipients()), send_id="campaign_1:c:0"
+    )
+    assert (first["sent"], first["failed"]) == (3, 2)
+
+    failing.clear()
+    second = await service.send_campaign(
+        CAMPAIGN, batches_of(recipients()), send_id="campaign_1:c:0"
+    )
+
+    assert (second["sent"], second["skipped"]) == (2, 3)
+    assert sorted(email for batch in delivered for email in batch) == sorted(EMAILS)
+
+
+async def test_resume_with_mixed_case_and_punctuated_addresses(service, redis):
+    # Byte order, as stream_recipients reads them; a locale collation would
+    # interleave these differently and break the checkpoint ranges
+    emails = sorted(
+        [
+            "Zoe@example.com",
+            "alice@example.com",
+            "a.b@example.com",
+            "a-b@example.com",
+            "a_b@example.com",
+            "a+b@example.com",
+            "Bob@example.com",
+        ]
+    )
+    failing = {emails[3]}
+    delivered = serve(
+        service,
+        lambda to: httpx.Response(500 if failing & set(to) else 202),
+    )
+
+    first = await service.send_campaign(
+        CAMPAIGN, batches_of(recipients(emails)), send_id="campaign_1:c:3"
+    )
+    failing.clear()
+    second = await service.send_campaign(
+        CAMPAIGN, batches_of(recipients(emails)), send_id="campaign_1:c:3"
+    )
+
+    assert (first["sent"], second["sent"], second["skipped"]) == (5, 2, 5)
+    sent = [email for batch in delivered for email in batch]
+    assert sorted(sent) == emails
+
+
+async def test_recipients_are_streamed_in_byte_order(monkeypatch):
+    queries = []
+
+    class Result:
+        async def partitions(self):
+            return
+            yield
+
+    class Session:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc_info):
+            return False
+
+        async def stream(self, query):
+            queries.append(query)
+            return Result()
+
+    monkeypatch.setattr(email_module, "AsyncSessionLocal", Session)
+
+    assert [batch async for batch in email_module.stream_recipients()] == []
+    sql = str(queries[0].compile(dialect=postgresql.dialect()))
+    assert 'ORDER BY subscribers.email COLLATE "C"' in sql
+
+
+async def test_ambiguous_failure_is_not_retried(service, redis):
+    attempts = []
+
+    def handler(to):
+        attempts.append(to)
+        raise httpx.ReadTimeout("timed out")
+
+    serve(service, handler)
+    report = await service.send_campaign(
+        CAMPAIGN, batches_of(recipients(EMAILS[:2])), send_id="campaign_1:c:1"
+    )
+
+    assert len(attempts) == 1
+    assert (report["sent"], report["uncertain"]) == (0, 2)
+    checkpoint = SendCheckpoint("campaign_1:c:1")
+    await checkpoint.load()
+    assert all(checkpoint.is_done(email) for email in EMAILS[:2])
+
+
+async def test_connection_failures_are_retried(service, redis):
+    calls = []
+
+    def handler(to):
+        calls.append(to)
+        if len(calls) == 1:
+            raise httpx.ConnectError("refused")
+        return httpx.Response(202)
+
+    serve(service, handler)
+    result = await service.send_batch(
+        CAMPAIGN, service.render_batch(CAMPAIGN, recipients(EMAILS[:2]))
+    )
+
+    assert len(calls) == 2
+    assert result.sent == 2 and result.settled
+
+
+async def test_checkpoint_merges_overlapping_ranges(redis):
+    checkpoint = SendCheckpoint("campaign_1:c:2")
+    await checkpoint.mark("b", "d")
+    await checkpoint.mark("a", "c")
+    await checkpoint.mark("m", "p")
+    await checkpoint.load()
+
+    assert len(checkpoint) == 2
+    assert [checkpoint.is_done(e) for e in ("a", "d", "e", "n", "q")] == [
+        True,
+        True,
+        False,
+        True,
+        False,
+    ]
+
+
+async def test_batches_in_flight_when_cancelled_are_settled(service, redis):
+    in_flight = asyncio.Event()
+
+    async def hanging(request):
+        in_flight.set()
+        await asyncio.sleep(10)
+
+    service._client = httpx.AsyncClient(
+        base_url="http://sendgrid.test", transport=httpx.MockTransport(hanging)
+    )
+    send = asyncio.create_task(
+        service.send_campaign(
+            CAMPAIGN, batches_of(recipients(EMAILS[:2])), send_id="campaign_1:c:3"
+        )
+    )
+    await in_flight.wait()
+
+    send.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await send
+
+    checkpoint = SendCheckpoint("campaign_1:c:3")
+    await checkpoint.load()
+    assert all(checkpoint.is_done(email) for email in EMAILS[:2])
@@ -0,0 +1,114 @@
+"""
+Tests for streaming file uploads.
+
+The integration tests run the multipart upload against the S3 stand-in from
+docker-compose (`docker-compose --profile storage up minio`) and are skipped
+unless `AWS_S3_ENDPOINT_URL` points at a reachable endpoint.
+"""
+
+import os
+import struct
+import zlib
+from typing import AsyncIterator, List
+
+import pytest
+
+from app.core.config import settings
+from app.services.storage import cloud_storage
+from app.services.storage.file_service import (
+    FileTooLargeError,
+    StorageNotConfiguredError,
+    UnsupportedFileTypeError,
+    UploadError,
+    sanitize_filename,
+    stream_upload,
+)
+
+MiB = 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+def png_bytes() -> bytes:
+    """A small, valid PNG image."""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        crc = struct.pack(">I", zlib.crc32(kind + data))
+        return struct.pack(">I", len(data)) + kind + data + crc
+
+    header = struct.pack(">IIBBBBB", 16, 16, 8, 2, 0, 0, 0)
+    pixels = b"".join(b"\0" + b"\xff" * 48 for _ in range(16))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(pixels))
+        + chunk(b"IEND", b"")
+    )
+
+
+async def chunked(data: bytes, size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def test_sanitize_filename():
+    assert sanitize_filename("../../etc/passwd") == "passwd"
+    assert sanitize_filename("my photo (1).png") == "my_photo_1_.png"
+    assert sanitize_filename("...") == "upload"
+
+
+async def test_missing_bucket_is_reported(monkeypatch):
+    monkeypatch.setattr(settings, "AWS_S3_BUCKET", None)
+
+    with pytest.raises(StorageNotConfiguredError) as error:
+        await stream_upload(chunked(png_bytes()), "image.png")
+    assert error.value.status_code == 503
+
+
+async def test_sniffed_type_is_checked_before_uploading(monkeypatch):
+    monkeypatch.setattr(settings, "AWS_S3_BUCKET", "unused")
+    # Rejected uploads must not reach S3
+    monkeypatch.setattr(cloud_storage, "get_s3_client", pytest.fail)
+
+    with pytest.raises(UnsupportedFileTypeError):
+        await stream_upload(chunked(b"MZ\x90\x00" + b"\0" * 4096), "setup.png")
+    with pytest.raises(UploadError):
+        await stream_upload(chunked(b""), "empty.png")
+
+
+def _pending_uploads(bucket: str) -> List[dict]:
+    response = cloud_storage.get_s3_client().list_multipart_uploads(Bucket=bucket)
+    return response.get("Uploads", [])
+
+
+@pytest.mark.integration
+async def test_chunked_upload_is_stored_in_parts(s3_bucket):
+    # Three parts: two full 5 MiB parts and a trailing one
+    data = png_bytes() + os.urandom(11 * MiB)
+
+    stored = await stream_upload(chunked(data), "large image.png", max_size=len(data))
+
+    assert stored["size"] == len(data)
+    assert stored["content_type"] == "image/png"
+    assert stored["key"].endswith("/large_image.png")
+    assert stored["etag"].strip('"').endswith("-3")
+    assert await cloud_storage.get_object(stored["key"]) == data
+
+
+@pytest.mark.integration
+async def test_size_limit_aborts_the_multipart_upload(s3_bucket):
+    data = png_bytes() + os.urandom(8 * MiB)
+
+    with pytest.raises(FileTooLargeError):
+        await stream_upload(chunked(data), "too-big.png", max_size=6 * MiB)
+
+    assert _pending_uploads(s3_bucket) == []
+    response = cloud_storage.get_s3_client().list_objects_v2(Bucket=s3_bucket)
+    assert response.get("KeyCount", 0) == 0
+
+
+@pytest.mark.integration
+async def test_content_sniff_rejects_disguised_file(s3_bucket):
+    with pytest.raises(UnsupportedFileTypeError):
+        await stream_upload(chunked(b"MZ\x90\x00" + os.urandom(1 * MiB)), "holiday.png")
+
+    assert _pending_uploads(s3_bucket) == []
@@ -0,0 +1,275 @@
+"""
+Tests for job history partitioning and retention.
+
+Statements are recorded instead of run, since the partition DDL needs
+Postgres; the archive tests run against the S3 stand-in when it is reachable.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from app.core.config import settings
+from app.models.agent import AgentJob
+from app.services.ai import job_history_service
+from app.services.storage import cloud_storage
+
+
+class Result(list):
+    def all(self):
+        return list(self)
+
+
+class RecordingSession:
+    """Async session stand-in recording SQL; `results` feeds the SELECTs."""
+
+    def __init__(self, results=(), scalar=False):
+        self.results = list(results)
+        self.scalar_result = scalar
+        self.sql = []
+
+    async def execute(self, statement, params=None):
+        self.sql.append(str(statement))
+        return Result(self.results.pop(0) if self.results else [])
+
+    async def scalar(self, statement, params=None):
+        self.sql.append(str(statement))
+        return self.scalar_result
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        self.sql.append("ROLLBACK")
+
+
+def months_ago(months: int) -> date:
+    today = datetime.now(timezone.utc).date().replace(day=1)
+    return job_history_service._add_months(today, -months)
+
+
+def test_archival_index_only_covers_unarchived_jobs():
+    index = next(
+        index
+        for index in AgentJob.__table__.indexes
+        if index.name == "ix_agent_jobs_unarchived_created_at_id"
+    )
+    sql = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+
+    assert "(created_at, id)" in sql
+    assert "WHERE agent_outputs IS NOT NULL" in sql
+
+
+async def test_default_partition_is_created(monkeypatch):
+    async def list_partitions(db):
+        return {}
+
+    monkeypatch.setattr(job_history_service, "list_partitions", list_partitions)
+    db = RecordingSession()
+
+    await job_history_service.ensure_partitions(db, months_ahead=0)
+
+    assert 'agent_jobs_default" PARTITION OF "agent_jobs" DEFAULT' in db.sql[0]
+    assert 'PARTITION OF "agent_jobs" FOR VALUES' in db.sql[-1]
+
+
+async def test_rows_in_the_default_partition_move_to_a_new_partition(monkeypatch):
+    async def list_partitions(db):
+        return {}
+
+    monkeypatch.setattr(job_history_service, "list_partitions", list_partitions)
+    db = RecordingSession(scalar=True)
+
+    await job_history_service.ensure_partitions(db, months_ahead=0)
+
+    create, move, attach = db.sql[-3:]
+    assert 'LIKE "agent_jobs"' in create
+    assert 'DELETE FROM "agent_jobs_default"' in move and "INSERT INTO" in move
+    assert "ATTACH PARTITION" in attach
+
+
+async def test_dropping_partitions_deletes_their_archives(monkeypatch):
+    monkeypatch.setattr(settings, "AWS_S3_BUCKET", "archive-bucket")
+    monkeypatch.setattr(settings, "ANALYTICS_RETENTION_DAYS", 90)
+    monkeypatch.setattr(settings, "JOB_RETENTION_MODE", "drop")
+    expired, kept = months_ago(6), months_ago(0)
+
+    async def list_partitions(db):
+        return {
+            job_history_service.partition_name(month): month
+            for month in (expired, kept)
+        }
+
+    async def list_prefixes(prefix):
+        return [
+            job_history_service.archive_prefix(job_history_service.partition_name(m))
+            for m in (expired, kept)
+        ]
+
+    deleted = []
+
+    async def delete_prefix(prefix):
+        deleted.append(prefix)
+        return 1
+
+    monkeypatch.setattr(job_history_service, "list_partitions", list_partitions)
+    monkeypatch.setattr(job_history_service, "list_prefixes", list_prefixes)
+    monkeypatch.setattr(job_history_service, "delete_prefix", delete_prefix)
+    db = RecordingSession()
+
+    removed = await job_history_service.drop_expired_partitions(db)
+
+    expired_name = job_history_service.partition_name(expired)
+    assert removed == [expired_name]
+    assert f'DROP TABLE "{expired_name}"' in db.sql
+    assert any('DELETE FROM "agent_jobs_default"' in sql for sql in db.sql)
+    assert deleted == [job_history_service.archive_prefix(expired_name)]
+
+
+async def test_dropping_partitions_without_a_bucket_skips_archives(monkeypatch):
+    monkeypatch.setattr(settings, "AWS_S3_BUCKET", None)
+    monkeypatch.setattr(settings, "ANALYTICS_RETENTION_DAYS", 90)
+    monkeypatch.setattr(settings, "JOB_RETENTION_MODE", "drop")
+    expired = months_ago(6)
+
+    async def list_partitions(db):
+        return {job_history_service.partition_name(expired): expired}
+
+    monkeypatch.setattr(job_history_service, "list_partitions", list_partitions)
+    monkeypatch.setattr(job_history_service, "list_prefixes", pytest.fail)
+    db = RecordingSession()
+
+    removed = await job_history_service.drop_expired_partitions(db)
+
+    assert removed == [job_history_service.partition_name(expired)]
+
+
+async def test_archival_failure_does_not_block_expiry(monkeypatch):
+    monkeypatch.setattr(settings, "AWS_S3_BUCKET", "archive-bucket")
+    db = RecordingSession()
+    calls = []
+
+    class Session:
+        async def __aenter__(self):
+            return db
+
+        async def __aexit__(self, *exc_info):
+            return False
+
+    async def ensure_partitions(session):
+        calls.append("ensure")
+
+    async def archive_agent_outputs(session):
+        raise ConnectionError("S3 unreachable")
+
+    async def drop_expired_partitions(session):
+        calls.append("drop")
+
+    monkeypatch.setattr(job_history_service, "AsyncSessionLocal", Session)
+    monkeypatch.setattr(job_history_service, "ensure_partitions", ensure_partitions)
+    monkeypatch.setattr(
+        job_history_service, "archive_agent_outputs", archive_agent_outputs
+    )
+    monkeypatch.setattr(
+        job_history_service, "drop_expired_partitions", drop_expired_partitions
+    )
+
+    await job_history_service.run_retention()
+
+    assert calls == ["ensure", "drop"]
+    assert db.sql == ["ROLLBACK"]
+
+
+async def test_failed_archive_update_deletes_the_object(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_OUTPUT_HOT_DAYS", 0)
+    row = SimpleNamespace(
+        id="job_a",
+        created_at=datetime(2026, 1, 5, tzinfo=timezone.utc),
+        agent_outputs={"n": 1},
+    )
+
+    class FailingSession(RecordingSession):
+        async def commit(self):
+            raise ConnectionError("database went away")
+
+    db = FailingSession([[row]])
+    stored, deleted = [], []
+
+    async def put_object(key, data, **kwargs):
+        stored.append(key)
+
+    async def delete_object(key):
+        deleted.append(key)
+
+    monkeypatch.setattr(job_history_service, "put_object", put_object)
+    monkeypatch.setattr(job_history_service, "delete_object", delete_object)
+
+    with pytest.raises(ConnectionError):
+        await job_history_service.archive_agent_outputs(db)
+
+    assert (
+        deleted == stored == ["job-archive/agent_jobs_p202601/outputs-job_a.jsonl.gz"]
+    )
+    assert db.sql[-1] == "ROLLBACK"
+
+
+async def test_archive_mode_keeps_archives(monkeypatch):
+    monkeypatch.setattr(settings, "ANALYTICS_RETENTION_DAYS", 90)
+    monkeypatch.setattr(settings, "JOB_RETENTION_MODE", "archive")
+    expired = months_ago(6)
+
+    async def list_partitions(db):
+        return {job_history_service.partition_name(expired): expired}
+
+    monkeypatch.setattr(job_history_service, "list_partitions", list_partitions)
+    monkeypatch.setattr(job_history_service, "list_prefixes", pytest.fail)
+    db = RecordingSession()
+
+    await job_history_service.drop_expired_partitions(db)
+
+    assert not any(sql.startswith("DROP") for sql in db.sql)
+
+
+async def test_archive_batches_do_not_span_months(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_OUTPUT_HOT_DAYS", 0)
+    end_of_month = datetime(2026, 1, 31, 23, 59, tzinfo=timezone.utc)
+    january = [
+        SimpleNamespace(id="job_a", created_at=end_of_month, agent_outputs={"n": 1})
+    ]
+    february = [
+        SimpleNamespace(
+            id="job_b",
+            created_at=end_of_month + timedelta(minutes=2),
+            agent_outputs={"n": 2},
+        )
+    ]
+    # The first SELECT returns both months; only January is archived from it
+    db = RecordingSession([january + february, [], february, []])
+    stored = []
+
+    async def put_object(key, data, **kwargs):
+        stored.append(key)
+
+    monkeypatch.setattr(job_history_service, "put_object", put_object)
+
+    assert await job_history_service.archive_agent_outputs(db) == 2
+    assert stored == [
+        "job-archive/agent_jobs_p202601/outputs-job_a.jsonl.gz",
+        "job-archive/agent_jobs_p202602/outputs-job_b.jsonl.gz",
+    ]
+
+
+@pytest.mark.integration
+async def test_prefix_listing_and_deletion(s3_bucket):
+    for key in ("job-archive/a/1", "job-archive/a/2", "job-archive/b/1"):
+        await cloud_storage.put_object(key, b"{}")
+
+    assert await cloud_storage.list_prefixes("job-archive/") == [
+        "job-archive/a/",
+        "job-archive/b/",
+    ]
+    assert await cloud_storage.delete_prefix("job-archive/a/") == 2
+    assert await cloud_storage.list_prefixes("job-archive/") == ["job-archive/b/"]
@@ -0,0 +1,73 @@
+"""Tests for job status publishing and long-polling."""
+
+import asyncio
+import time
+
+import httpx
+import orjson
+import pytest
+from fastapi import FastAPI
+
+from app.api.v1.endpoints import agents
+from app.services.ai import job_status_service
+from app.services.ai.job_status_service import JobStatusHub, publish_job_status
+
+
+@pytest.fixture
+async def hub(redis):
+    hub = JobStatusHub()
+    await hub.start()
+    yield hub
+    await hub.stop()
+
+
+async def test_sequence_and_snapshot_are_written_together(redis):
+    first = await publish_job_status("job_1", {"status": "running", "progress": 10})
+    second = await publish_job_status("job_1", {"status": "running", "progress": 50})
+
+    assert (first["seq"], second["seq"]) == (1, 2)
+    stored = orjson.loads(await redis.get(job_status_service.status_key("job_1")))
+    assert stored == second
+    assert await redis.get(job_status_service.sequence_key("job_1")) == "2"
+    assert await redis.ttl(job_status_service.sequence_key("job_1")) > 0
+
+
+async def test_concurrent_publishers_get_distinct_sequence_numbers(redis):
+    snapshots = await asyncio.gather(
+        *(publish_job_status("job_1", {"status": "running"}) for _ in range(10))
+    )
+
+    assert sorted(snapshot["seq"] for snapshot in snapshots) == list(range(1, 11))
+
+
+async def test_long_poll_on_unknown_job_returns_immediately(hub):
+    started = time.monotonic()
+
+    assert await hub.wait("missing", since=0, timeout=5) is None
+    assert time.monotonic() - started < 1
+
+
+async def test_long_poll_returns_the_next_update(hub):
+    await publish_job_status("job_1", {"status": "running", "progress": 10})
+
+    async def progress():
+        await asyncio.sleep(0.1)
+        await publish_job_status("job_1", {"status": "completed", "progress": 100})
+
+    publisher = asyncio.create_task(progress())
+    snapshot = await hub.wait("job_1", since=1, timeout=5)
+    await publisher
+
+    assert snapshot["seq"] == 2
+    assert snapshot["status"] == "completed"
+
+
+async def test_stream_of_unknown_job_is_not_found(redis):
+    app = FastAPI()
+    app.include_router(agents.router)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/status/job_missing/stream")
+
+    assert response.status_code == 404
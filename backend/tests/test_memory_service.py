@@ -0,0 +1,114 @@
+"""Tests for windowed, summarized conversation memory."""
+
+import pytest
+
+from app.core.config import settings
+from app.core.redis import get_binary_redis
+from app.services.ai.memory_service import ConversationMemory, memory_key, unpack
+
+
+@pytest.fixture
+def compact_batch(monkeypatch):
+    monkeypatch.setattr(settings, "MEMORY_COMPACT_BATCH", 2)
+    return 2
+
+
+async def test_window_is_kept_verbatim_until_it_overflows(redis, compact_batch):
+    memory = ConversationMemory(window_turns=3)
+    for i in range(4):
+        await memory.append("s1", "user", f"message {i}")
+
+    loaded = await memory.load("s1")
+
+    assert loaded["summary"] is None
+    assert [turn["content"] for turn in loaded["turns"]] == [
+        "message 1",
+        "message 2",
+        "message 3",
+    ]
+
+
+async def test_overflowing_turns_are_folded_into_the_summary(redis, compact_batch):
+    folded = []
+
+    async def summarizer(summary, turns):
+        folded.append([turn["content"] for turn in turns])
+        return " | ".join(filter(None, [summary, *(t["content"] for t in turns)]))
+
+    memory = ConversationMemory(window_turns=3, summarizer=summarizer)
+    for i in range(8):
+        await memory.append("s1", "assistant", f"m{i}", name="writer")
+
+    loaded = await memory.load("s1")
+    assert folded == [["m0", "m1"], ["m2", "m3"]]
+    assert loaded["summary"] == "m0 | m1 | m2 | m3"
+    assert [turn["content"] for turn in loaded["turns"]] == ["m5", "m6", "m7"]
+    assert loaded["turns"][0]["name"] == "writer"
+
+    # Folded turns are gone from Redis, not just hidden
+    fields = await redis.hkeys(memory_key("s1"))
+    assert sorted(field for field in fields if field.startswith("t:")) == [
+        "t:4",
+        "t:5",
+        "t:6",
+        "t:7",
+    ]
+    assert {"next", "start", "summary"} <= set(fields)
+
+
+async def test_compaction_is_skipped_while_another_worker_holds_the_lock(
+    redis, compact_batch
+):
+    memory = ConversationMemory(window_turns=2)
+    await redis.set(f"{memory_key('s1')}:compact", "1")
+    for i in range(6):
+        await memory.append("s1", "user", f"m{i}")
+
+    loaded = await memory.load("s1", last_n=10)
+    assert loaded["summary"] is None
+    assert len(loaded["turns"]) == 6
+
+    await redis.delete(f"{memory_key('s1')}:compact")
+    await memory.append("s1", "user", "m6")
+    loaded = await memory.load("s1", last_n=10)
+    assert [turn["content"] for turn in loaded["turns"]] == ["m5", "m6"]
+    assert "user: m4" in loaded["summary"]
+
+
+async def test_expired_lock_taken_over_by_another_worker_is_kept(redis, compact_batch):
+    lock_key = f"{memory_key('s1')}:compact"
+
+    async def slow_summarizer(summary, turns):
+        # The lock expired mid-summary and another worker took it
+        await redis.set(lock_key, "other-worker")
+        return "summary"
+
+    memory = ConversationMemory(window_turns=2, summarizer=slow_summarizer)
+    for i in range(4):
+        await memory.append("s1", "user", f"m{i}")
+
+    assert await redis.get(lock_key) == "other-worker"
+
+
+async def test_default_summary_is_truncated(redis, compact_batch, monkeypatch):
+    monkeypatch.setattr(settings, "MEMORY_SUMMARY_MAX_CHARS", 50)
+    memory = ConversationMemory(window_turns=1)
+    for i in range(5):
+        await memory.append("s1", "user", f"{i}" * 300)
+
+    summary = (await memory.load("s1"))["summary"]
+    assert len(summary) == 50
+    assert summary.endswith("3" * 40)
+
+
+async def test_large_turns_are_compressed(redis, monkeypatch):
+    monkeypatch.setattr(settings, "MEMORY_COMPRESS_MIN_BYTES", 64)
+    memory = ConversationMemory()
+    number = await memory.append("s1", "user", "repeat " * 200)
+
+    binary = await get_binary_redis()
+    raw = await binary.hget(memory_key("s1"), f"t:{number}")
+
+    assert len(raw) < 200
+    assert unpack(raw)["content"] == "repeat " * 200
+    assert (await memory.load("s1"))["turns"][0]["content"] == "repeat " * 200
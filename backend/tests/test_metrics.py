@@ -0,0 +1,72 @@
+"""Tests for Prometheus metrics export."""
+
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+
+from app.core import metrics
+from app.services.marketing import scheduler_service
+
+WORKER = """
+from prometheus_client import Counter, Gauge
+
+Counter("test_requests", "Requests").inc()
+Gauge("test_parked", "Parked", multiprocess_mode="livesum").set(5)
+import os
+print(os.getpid())
+"""
+
+
+def run_worker(directory) -> int:
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(directory)}
+    result = subprocess.run(
+        [sys.executable, "-c", WORKER], env=env, capture_output=True, check=True
+    )
+    return int(result.stdout)
+
+
+def sample(registry, name: str) -> float:
+    return next(
+        s.value
+        for metric in registry.collect()
+        for s in metric.samples
+        if s.name == name
+    )
+
+
+async def test_metrics_are_served():
+    app = FastAPI()
+    app.mount("/metrics", metrics.metrics_app())
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/metrics/")
+
+    assert response.status_code == 200
+    assert scheduler_service.SCHEDULING_LAG._name in response.text
+
+
+def test_multiprocess_metrics_sum_workers(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    first, second = run_worker(tmp_path), run_worker(tmp_path)
+
+    assert sample(metrics.metrics_registry(), "test_requests_total") == 2
+    assert sample(metrics.metrics_registry(), "test_parked") == 10
+
+    # The exited worker's counters stay, its live gauges go
+    metrics.child_exit(None, SimpleNamespace(pid=first))
+    assert sample(metrics.metrics_registry(), "test_requests_total") == 2
+    assert sample(metrics.metrics_registry(), "test_parked") == 5
+
+
+def test_reset_removes_files_of_a_previous_run(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    run_worker(tmp_path)
+
+    metrics.reset_multiprocess_dir()
+
+    assert list(tmp_path.iterdir()) == []
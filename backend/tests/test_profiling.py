@@ -0,0 +1,42 @@
+"""Tests for request profiling."""
+
+import os
+from collections import Counter
+from types import SimpleNamespace
+
+from app.core import profiling
+from app.core.config import settings
+
+
+def test_unmatched_requests_share_one_route_label():
+    matched = profiling._Request(
+        {
+            "method": "GET",
+            "path": "/content/c1",
+            "route": SimpleNamespace(path="/content/{id}"),
+        },
+        profiled=False,
+    )
+    probe = profiling._Request({"method": "GET", "path": "/wp-admin/x.php"}, False)
+
+    assert matched.route == "GET /content/{id}"
+    assert probe.route == "GET unmatched"
+
+
+def test_only_the_newest_profiles_are_kept(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_MAX_FILES", 3)
+    (tmp_path / "notes.txt").write_text("not a profile")
+    samples = Counter({(profiling.fold.__code__,): 2})
+
+    for second in range(5):
+        profiling.write_profile(
+            str(tmp_path / f"20261019T00000{second}-abc-GET_x.folded"), samples
+        )
+
+    assert sorted(os.listdir(tmp_path)) == [
+        "20261019T000002-abc-GET_x.folded",
+        "20261019T000003-abc-GET_x.folded",
+        "20261019T000004-abc-GET_x.folded",
+        "notes.txt",
+    ]
+    assert (tmp_path / "20261019T000004-abc-GET_x.folded").read_text().endswith(" 2\n")
@@ -0,0 +1,59 @@
+"""Tests for the content scoring service."""
+
+import asyncio
+
+import pytest
+
+from app.services.content.scoring_service import (
+    ScoringService,
+    _score_batch,
+    score_text,
+)
+
+TEXT = (
+    "Content marketing works when every post answers a real question. "
+    "Plan the calendar, write the draft and measure what readers do."
+)
+
+
+def test_score_text_counts_words_and_picks_hashtags():
+    score = score_text(TEXT, ["marketing"])
+
+    assert score.word_count == 21
+    assert 0.0 <= score.readability_score <= 100.0
+    assert dict(score.keyword_density)["marketing"] > 0
+    assert score.hashtags == ("#Marketing",)
+
+
+def test_score_batch_returns_plain_tuples():
+    rows = _score_batch([(TEXT, ("marketing",)), ("", ())], True)
+
+    assert all(type(row) is tuple for row in rows)
+    assert rows[1][0] == 0
+
+
+async def test_score_many_preserves_order():
+    service = ScoringService(max_workers=1, batch_size=2)
+    try:
+        texts = [TEXT, "One two.", TEXT + " More words here."]
+        scores = await service.score_many((text, ()) for text in texts)
+    finally:
+        await service.shutdown()
+
+    assert [score.word_count for score in scores] == [
+        score_text(text).word_count for text in texts
+    ]
+
+
+async def test_shutdown_waits_for_pending_batches_and_stays_closed():
+    service = ScoringService(max_workers=1, batch_window_ms=50)
+    pending = asyncio.ensure_future(service.score(TEXT))
+    await asyncio.sleep(0)
+
+    await service.shutdown()
+
+    assert (await pending).word_count == 21
+    assert service._executor is None
+    with pytest.raises(RuntimeError):
+        await service.score(TEXT)
+    assert service._executor is None
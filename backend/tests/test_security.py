@@ -0,0 +1,71 @@
+"""Tests for access tokens and the authenticated collaboration socket."""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.v1.endpoints import websocket
+from app.core.config import settings
+from app.core.security import (
+    AuthenticationError,
+    can_edit_content,
+    create_access_token,
+    decode_access_token,
+)
+
+
+def test_access_token_round_trip():
+    claims = decode_access_token(create_access_token("user_1", ["content:write"]))
+
+    assert claims["sub"] == "user_1"
+    assert can_edit_content(claims, "content_1")
+
+
+def test_content_scope_is_per_item():
+    claims = decode_access_token(
+        create_access_token("user_1", ["content:content_1:write"])
+    )
+
+    assert can_edit_content(claims, "content_1")
+    assert not can_edit_content(claims, "content_2")
+    assert not can_edit_content(decode_access_token(create_access_token("u")), "c")
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        None,
+        "not-a-token",
+        create_access_token("user_1", expires_minutes=-1),
+        jwt.encode({"sub": "user_1", "type": "access"}, "other-key", "HS256"),
+        jwt.encode({"sub": "user_1", "type": "refresh"}, settings.SECRET_KEY, "HS256"),
+    ],
+)
+def test_invalid_tokens_are_rejected(token):
+    with pytest.raises(AuthenticationError):
+        decode_access_token(token)
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(websocket.router)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "",
+        "?user_id=someone",
+        "?token=invalid",
+        f"?token={create_access_token('user_1', ['content:content_2:write'])}",
+    ],
+)
+def test_collaboration_socket_requires_edit_access(client, query):
+    with pytest.raises(WebSocketDisconnect) as error:
+        with client.websocket_connect(f"/collaboration/content_1{query}"):
+            pass
+    assert error.value.code == 1008
@@ -0,0 +1,225 @@
+"""Tests for draining shutdown and requeueing of interrupted work."""
+
+import asyncio
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+from uvicorn import Config
+
+from app.core import server as server_module
+from app.core import shutdown
+from app.core.config import settings
+from app.core.shutdown import DrainController
+from app.services.marketing import scheduler_service
+from app.services.marketing.scheduler_service import (
+    DEAD_LETTER_KEY,
+    Scheduler,
+    register_handler,
+    schedule_action,
+    shard_for,
+    shard_keys,
+)
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    monkeypatch.setattr(settings, "DRAIN_DEADLINE_SECONDS", 0.2)
+    monkeypatch.setattr(settings, "DRAIN_CHECKPOINT_SECONDS", 0.5)
+    return DrainController()
+
+
+async def test_drain_runs_hooks_waits_cancels_then_requeues(controller):
+    events = []
+    finishing_started = asyncio.Event()
+
+    async def hook():
+        events.append("hook")
+
+    async def finishing():
+        async with controller.track("finishing", requeue=requeue_finishing):
+            finishing_started.set()
+            await asyncio.sleep(0.05)
+            events.append("finishing done")
+
+    async def requeue_finishing():
+        events.append("finishing requeued")
+
+    async def stuck():
+        async with controller.track("stuck", requeue=requeue_stuck):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                await asyncio.sleep(0.05)
+                events.append("stuck checkpointed")
+                raise
+
+    async def requeue_stuck():
+        events.append("stuck requeued")
+
+    controller.on_drain(hook)
+    tasks = [asyncio.create_task(finishing()), asyncio.create_task(stuck())]
+    await finishing_started.wait()
+
+    await controller.drain()
+
+    assert events == [
+        "hook",
+        "finishing done",
+        "stuck checkpointed",
+        "stuck requeued",
+    ]
+    assert controller.draining
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def test_second_drain_waits_for_the_first(controller):
+    async def slow_hook():
+        await asyncio.sleep(0.05)
+
+    controller.on_drain(slow_hook)
+    first = asyncio.create_task(controller.drain())
+    await asyncio.sleep(0)
+
+    await controller.drain()
+    assert first.done()
+
+
+async def test_failing_requeue_does_not_stop_the_drain(controller):
+    requeued = []
+
+    async def broken():
+        raise RuntimeError("redis down")
+
+    async def fine():
+        requeued.append("fine")
+
+    async def work(requeue):
+        async with controller.track("work", requeue=requeue):
+            await asyncio.sleep(10)
+
+    tasks = [asyncio.create_task(work(broken)), asyncio.create_task(work(fine))]
+    await asyncio.sleep(0)
+
+    await controller.drain()
+
+    assert requeued == ["fine"]
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def test_request_limit_drains_before_exiting(controller, monkeypatch):
+    monkeypatch.setattr(server_module, "drain_controller", controller)
+    drained = []
+
+    async def hook():
+        drained.append(server.should_exit)
+
+    controller.on_drain(hook)
+    server = server_module.DrainingServer(Config(app=None, limit_max_requests=3))
+    server.started = True
+    server.server_state.total_requests = 3
+
+    # The limit is reached but the worker keeps ticking while it drains
+    assert await server.on_tick(1) is False
+    await server._drain_task
+
+    assert drained == [False]
+    assert await server.on_tick(2) is True
+
+
+@pytest.fixture
+async def interrupted_scheduler(redis, controller, monkeypatch):
+    """A scheduler whose running actions are interrupted by `drain()`."""
+    monkeypatch.setattr(scheduler_service, "drain_controller", controller)
+    started = asyncio.Event()
+
+    async def long_running(payload):
+        started.set()
+        await asyncio.sleep(10)
+
+    register_handler("test_idempotent", idempotent=True)(long_running)
+    register_handler("test_once")(long_running)
+    yield Scheduler(), started
+    for action_type in ("test_idempotent", "test_once"):
+        scheduler_service._handlers.pop(action_type, None)
+        scheduler_service._idempotent.discard(action_type)
+
+
+async def claimed(redis, action_type):
+    action_id = await schedule_action(
+        action_type, {}, datetime.now(timezone.utc), action_id=f"a-{action_type}"
+    )
+    due_key, lease_key, payload_key = shard_keys(shard_for(action_id))
+    # As the claim script leaves it
+    await redis.zrem(due_key, action_id)
+    await redis.zadd(lease_key, {action_id: 1})
+    return action_id, orjson.loads(await redis.hget(payload_key, action_id))
+
+
+async def test_interrupted_idempotent_action_is_requeued(
+    redis, controller, interrupted_scheduler
+):
+    scheduler, started = interrupted_scheduler
+    action_id, action = await claimed(redis, "test_idempotent")
+    task = asyncio.create_task(scheduler._run(action, action["due_ms"]))
+    await started.wait()
+
+    await controller.drain()
+    await asyncio.gather(task, return_exceptions=True)
+
+    due_key, lease_key, _ = shard_keys(shard_for(action_id))
+    assert await redis.zscore(due_key, action_id) == action["due_ms"]
+    assert await redis.zscore(lease_key, action_id) is None
+    assert not await redis.hexists(DEAD_LETTER_KEY, action_id)
+
+
+async def test_interrupted_action_that_is_not_idempotent_is_dead_lettered(
+    redis, controller, interrupted_scheduler
+):
+    scheduler, started = interrupted_scheduler
+    action_id, action = await claimed(redis, "test_once")
+    task = asyncio.create_task(scheduler._run(action, action["due_ms"]))
+    await started.wait()
+
+    await controller.drain()
+    await asyncio.gather(task, return_exceptions=True)
+
+    due_key, lease_key, payload_key = shard_keys(shard_for(action_id))
+    assert await redis.zscore(due_key, action_id) is None
+    assert await redis.zscore(lease_key, action_id) is None
+    assert not await redis.hexists(payload_key, action_id)
+    dead = orjson.loads(await redis.hget(DEAD_LETTER_KEY, action_id))
+    assert dead["dead_reason"] == "interrupted by drain"
+
+
+async def test_paused_scheduler_keeps_renewing_leases(redis, monkeypatch):
+    monkeypatch.setattr(settings, "SCHEDULER_LEASE_SECONDS", 0.3)
+    scheduler = Scheduler()
+    await scheduler.start()
+    await scheduler.pause()
+    # Still running through the drain
+    action_id, _ = await claimed(redis, "test_running")
+    shard = shard_for(action_id)
+    scheduler._held[action_id] = shard
+    lease_key = shard_keys(shard)[1]
+
+    await asyncio.sleep(0.25)
+    renewed = await redis.zscore(lease_key, action_id)
+    await scheduler.stop()
+
+    assert renewed > datetime.now(timezone.utc).timestamp() * 1000
+    assert scheduler._lease_task is None
+
+
+def test_campaign_handlers_are_requeueable():
+    from app.services.marketing import campaign_service  # noqa: F401
+
+    assert {"publish_content", "campaign_send"} <= scheduler_service._idempotent
+
+
+def test_reconnect_delay_is_jittered(monkeypatch):
+    monkeypatch.setattr(settings, "RECONNECT_MIN_DELAY_MS", 100)
+    monkeypatch.setattr(settings, "RECONNECT_MAX_DELAY_MS", 200)
+
+    delays = {shutdown.reconnect_delay_ms() for _ in range(50)}
+    assert len(delays) > 1 and all(100 <= delay <= 200 for delay in delays)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Throughput benchmark for content scoring, serial vs. the process pool.
+
+Scores the same synthetic library three ways and reports documents per
+second for each:
+
+    serial        score_text() in a loop in this process
+    pool          ScoringService.score_many(), batches spread over the pool
+    micro-batch   concurrent ScoringService.score() calls, grouped by the
+                  batching window as API requests are
+
+    python scripts/bench_scoring.py --documents 5000 --words 800 --workers 4
+
+Pool start-up (spawning the workers) is excluded with a warm-up batch, so the
+numbers compare steady-state throughput.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+VOCABULARY = (
+    "content marketing campaign audience engagement strategy brand social media "
+    "growth analytics conversion customer journey value story search traffic "
+    "optimize quality publish schedule channel insight metric reach trend"
+).split()
+
+
+def make_document(rng: random.Random, words: int) -> str:
+    sentences = []
+    while words > 0:
+        length = min(rng.randint(8, 20), words)
+        words -= length
+        sentence = " ".join(rng.choice(VOCABULARY) for _ in range(length))
+        sentences.append(sentence.capitalize() + ".")
+    return " ".join(sentences)
+
+
+def report(name: str, documents: int, elapsed: float, baseline: float = None) -> None:
+    line = f"{name:<12} {documents / elapsed:>10.0f} docs/s  {elapsed:>8.3f}s"
+    if baseline:
+        line += f"  x{baseline / elapsed:.2f} vs serial"
+    print(line)
+
+
+async def run(args: argparse.Namespace) -> None:
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+    from app.services.content.scoring_service import ScoringService, score_text
+
+    rng = random.Random(args.seed)
+    keywords = ("content", "marketing", "campaign")
+    library = [
+        (make_document(rng, args.words), keywords) for _ in range(args.documents)
+    ]
+    print(
+        f"{args.documents} documents of {args.words} words, "
+        f"{args.workers} workers, batches of {args.batch_size}"
+    )
+
+    started = time.perf_counter()
+    serial = [score_text(text, kw) for text, kw in library]
+    serial_elapsed = time.perf_counter() - started
+    report("serial", len(library), serial_elapsed)
+
+    service = ScoringService(max_workers=args.workers, batch_size=args.batch_size)
+    try:
+        await service.score_many(library[: args.workers * args.batch_size])
+
+        started = time.perf_counter()
+        pooled = await service.score_many(library)
+        report("pool", len(library), time.perf_counter() - started, serial_elapsed)
+
+        started = time.perf_counter()
+        batched = await asyncio.gather(
+            *(service.score(text, kw) for text, kw in library)
+        )
+        report(
+            "micro-batch", len(library), time.perf_counter() - started, serial_elapsed
+        )
+    finally:
+        await service.shutdown()
+
+    if pooled != serial or list(batched) != serial:
+        raise SystemExit("Pool results differ from serial scoring")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=800)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
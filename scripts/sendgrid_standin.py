@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+"""
+Local stand-in for the SendGrid v3 Mail Send API, for offline throughput tests.
+
+Start the stand-in:
+
+    python scripts/sendgrid_standin.py serve --port 8025 --latency-ms 50 --fail-rate 0.02
+
+Send a synthetic campaign through the real email service against it:
+
+    SENDGRID_API_URL=http://127.0.0.1:8025 SENDGRID_API_KEY=test \\
+        python scripts/sendgrid_standin.py send --recipients 500000
+
+The stand-in enforces the 1000-personalization limit, answers 202 like the
+real API, and can inject latency, throttling (429), server errors (500) and
+rejected recipients (400 naming the offending personalizations).
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+MAX_PERSONALIZATIONS = 1000
+
+
+def create_app(
+    latency_ms: float, fail_rate: float, throttle_rate: float, reject_rate: float
+):
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse, Response
+
+    app = FastAPI()
+    stats = {
+        "requests": 0,
+        "accepted": 0,
+        "rejected": 0,
+        "started": time.perf_counter(),
+    }
+
+    @app.post("/v3/mail/send")
+    async def mail_send(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+        if latency_ms:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * latency_ms / 1000)
+
+        personalizations = body.get("personalizations") or []
+        if not personalizations or len(personalizations) > MAX_PERSONALIZATIONS:
+            return JSONResponse(
+                {
+                    "errors": [
+                        {
+                            "field": "personalizations",
+                            "message": "must contain 1-1000 items",
+                        }
+                    ]
+                },
+                status_code=400,
+            )
+
+        roll = random.random()
+        if roll < throttle_rate:
+            return JSONResponse(
+                {"errors": [{"message": "too many requests"}]},
+                status_code=429,
+                headers={"Retry-After": "1"},
+            )
+        if roll < throttle_rate + fail_rate:
+            return JSONResponse(
+                {"errors": [{"message": "internal error"}]}, status_code=500
+            )
+
+        rejected = [
+            i for i in range(len(personalizations)) if random.random() < reject_rate
+        ]
+        if rejected:
+            stats["rejected"] += len(rejected)
+            errors = [
+                {"field": f"personalizations.{i}.to", "message": "invalid email"}
+                for i in rejected
+            ]
+            return JSONResponse({"errors": errors}, status_code=400)
+
+        stats["accepted"] += len(personalizations)
+        return Response(status_code=202)
+
+    @app.get("/stats")
+    async def get_stats():
+        elapsed = time.perf_counter() - stats["started"]
+        return {**stats, "emails_per_second": round(stats["accepted"] / elapsed, 1)}
+
+    return app
+
+
+def serve(args) -> None:
+    import uvicorn
+
+    app = create_app(
+        args.latency_ms, args.fail_rate, args.throttle_rate, args.reject_rate
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+async def send(args) -> None:
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+    from app.core.config import settings
+    from app.services.notification.email_service import EmailCampaign, email_service
+
+    campaign = EmailCampaign.from_sources(
+        "campaign_loadtest",
+        "{{ first_name }}, your weekly digest",
+        "<p>Hi {{ first_name }},</p>" + "<p>Lorem ipsum dolor sit amet.</p>" * 200,
+    )
+
+    async def recipients():
+        for start in range(0, args.recipients, settings.EMAIL_BATCH_SIZE):
+            end = min(start + settings.EMAIL_BATCH_SIZE, args.recipients)
+            yield [
+                (f"user{i}@example.com", f"User {i}", {"first_name": f"User{i}"})
+                for i in range(start, end)
+            ]
+
+    try:
+        report = await email_service.send_campaign(campaign, recipients())
+    finally:
+        await email_service.shutdown()
+    print(report)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="run the stand-in API")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8025)
+    serve_parser.add_argument("--latency-ms", type=float, default=0)
+    serve_parser.add_argument("--fail-rate", type=float, default=0)
+    serve_parser.add_argument("--throttle-rate", type=float, default=0)
+    serve_parser.add_argument("--reject-rate", type=float, default=0)
+
+    send_parser = commands.add_parser("send", help="send a synthetic campaign")
+    send_parser.add_argument("--recipients", type=int, default=100_000)
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        serve(args)
+    else:
+        asyncio.run(send(args))
+
+
+if __name__ == "__main__":
+    main()